@@ -0,0 +1,149 @@
+﻿"""
+Local rule-based planner: turns we can already parse with regexes never
+pay for an LLM planning round trip.
+
+    plan = fast_plan(user_text, grounding, affect)
+    if plan and plan.confidence >= cfg.FAST_PLANNER_THRESHOLD:
+        ...use it...
+
+Rules reuse intent's labels and canned replies, and only emit tools that
+exist in the skill registry. Time/date questions, reminders and "remember
+my X is Y" facts are not planned here: handle_turn answers or writes those
+(_maybe_local_answer, the memory catcher) before any planning happens.
+
+Confidence is a hand-tuned heuristic, not a calibrated probability: it
+starts from the rule's base score and is discounted for leftover text the
+rule did not explain, questions, and "complex" phrasing, so long or
+compound utterances fall through to the LLM planner. Run FAST_PLANNER=shadow
+to check it against the LLM's plans before trusting a threshold.
+"""
+from __future__ import annotations
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .schemas import Plan, ToolCall
+from .skills.registry import SKILLS
+
+from intent import (classify_intent, maybe_greeting_reply, maybe_empathy_reply,
+                    COMPLEX_PAT, INT_GREETING, INT_COMPLEX)
+
+_ASSISTANT_NAME = [
+    re.compile(r"\byour\s+name\s+(?:is|will\s+be)\s+([A-Za-z][\w'\-]{1,30})\s*[.!]?$", re.I),
+    re.compile(r"\b(?:i'?ll|i\s+will|let\s+me)\s+call\s+you\s+([A-Za-z][\w'\-]{1,30})\s*[.!]?$", re.I),
+    re.compile(r"\bcall\s+yourself\s+([A-Za-z][\w'\-]{1,30})\s*[.!]?$", re.I),
+]
+_THANKS = re.compile(r"^(?:ok(?:ay)?\s+)?(?:thanks|thank\s+you|thx|cheers)(?:\s+(?:a\s+lot|so\s+much|very\s+much))?\s*[.!]?$", re.I)
+_FILLER = re.compile(r"\b(?:please|now|ok(?:ay)?|hey|so|just|can\s+you|could\s+you)\b", re.I)
+
+
+def _coverage(text: str, matched: str) -> float:
+    """Share of the utterance's words explained by the rule's match."""
+    words = len(text.split()) or 1
+    left = _FILLER.sub(" ", text.replace(matched, " ", 1))
+    return max(0.0, 1.0 - len(left.split()) / words)
+
+
+def _confidence(base: float, text: str, matched: str, tool: bool) -> float:
+    conf = base * (0.7 + 0.3 * _coverage(text, matched))
+    if tool and "?" in text:
+        conf -= 0.15                 # "should I set a reminder to...?" is not a command
+    if COMPLEX_PAT.search(text):
+        conf -= 0.2
+    if len(text) > 160:
+        conf -= 0.2
+    return round(max(0.0, min(1.0, conf)), 3)
+
+
+def _tool(name: str, args: Dict[str, Any]) -> Optional[ToolCall]:
+    return ToolCall(name=name, args=args) if name in SKILLS else None
+
+
+def fast_plan(user_text: str, grounding: Dict[str, Any] | None = None, affect: Any = None) -> Optional[Plan]:
+    """Best local Plan for `user_text`, or None when no rule applies."""
+    text = (user_text or "").strip()
+    if not text:
+        return None
+
+    for p in _ASSISTANT_NAME:
+        m = p.search(text)
+        if m:
+            tc = _tool("set_assistant_name", {"name": m.group(1)})
+            if tc:
+                return Plan(intent="set_assistant_name", tool_call=tc,
+                            confidence=_confidence(0.95, text, m.group(0), tool=True))
+
+    m = _THANKS.search(text)
+    if m:
+        return Plan(intent="thanks", response_hint="You're welcome!",
+                    confidence=_confidence(0.9, text, m.group(0), tool=False))
+
+    intent = classify_intent(text)
+    if intent == INT_COMPLEX:
+        return None
+    canned = maybe_greeting_reply(text) if intent == INT_GREETING else maybe_empathy_reply(text, intent)
+    if canned:
+        # greetings/feelings often come with a real request attached; short utterances only
+        words = len(text.split())
+        base = 0.9 if intent == INT_GREETING else 0.82
+        conf = base if words <= 4 else base - 0.08 * (words - 4)
+        return Plan(intent=intent, response_hint=canned, confidence=round(max(0.0, conf), 3))
+    return None
+
+
+def same_plan(a: Optional[Plan], b: Optional[Plan]) -> bool:
+    """Shadow-mode agreement: same tool (and key args), or both plain replies."""
+    ta = a.tool_call if a else None
+    tb = b.tool_call if b else None
+    if ta is None or tb is None:
+        return ta is None and tb is None
+    if ta.name != tb.name:
+        return False
+    keys = {"set_assistant_name": ("name",), "save_fact": ("key",), "add_reminder": ("text",)}.get(ta.name, ())
+    norm = lambda v: re.sub(r"\W+", " ", str(v or "")).strip().lower()
+    return all(norm(ta.args.get(k)) == norm(tb.args.get(k)) for k in keys)
+
+
+# ----------------------------
+# Stats
+# ----------------------------
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.turns = 0
+        self.local = 0
+        self.shadow = 0
+        self.shadow_agree = 0
+        self.llm_plan_ms = deque(maxlen=100)     # what a local plan saves
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            xs = list(self.llm_plan_ms)
+            avg = sum(xs) / len(xs) if xs else None
+            return {
+                "turns": self.turns,
+                "local": self.local,
+                "local_share": round(self.local / self.turns, 3) if self.turns else None,
+                "saved_ms_est": round(avg * self.local) if avg is not None else None,
+                "shadow_compared": self.shadow,
+                "shadow_agreement": round(self.shadow_agree / self.shadow, 3) if self.shadow else None,
+            }
+
+
+stats = _Stats()
+
+
+def record_turn(local: bool, llm_plan_ms: float = None, shadow_agree: Optional[bool] = None):
+    with stats.lock:
+        stats.turns += 1
+        stats.local += 1 if local else 0
+        if llm_plan_ms is not None:
+            stats.llm_plan_ms.append(llm_plan_ms)
+        if shadow_agree is not None:
+            stats.shadow += 1
+            stats.shadow_agree += 1 if shadow_agree else 0
+
+
+def fast_planner_stats() -> dict:
+    return stats.snapshot()
@@ -1,9 +1,13 @@
-﻿import json
-from typing import Dict, Any, Optional
+﻿import time
+from typing import Callable, Dict, Any, Optional
 
 from .schemas import Plan, ToolCall
-from .utils import extract_first_json
-from llm import ask_llm_full  # ensure your app/ is on PYTHONPATH
+from .utils import extract_first_json, StreamingJSON
+from .skills.registry import SKILLS
+from thinker.prompt import render_grounding
+from llm import ask_llm_full, stream_llm, cached_reply, remember_reply  # ensure your app/ is on PYTHONPATH
+from config import cfg
+from telemetry.logger import log_event
 
 SYSTEM = (
     'You are a planning controller for a voice assistant. '
@@ -18,14 +22,59 @@ SYSTEM = (
     '- JSON ONLY, no markdown.'
 )
 
-def plan_turn(user_text: str, grounding: Dict[str, Any], affect: str = 'neutral') -> Plan:
-    g = json.dumps(grounding, ensure_ascii=False)
-    prompt = f"{SYSTEM}\nGROUNDING:{g}\nAFFECT:{affect}\nUSER:{user_text}\nPLAN:"
-    raw = ask_llm_full(prompt) or '{}'
-    obj = extract_first_json(raw)
-    
-    tool = obj.get('tool_call')
-    tc = ToolCall(**tool) if isinstance(tool, dict) and 'name' in tool else None
+def _tool_call(value: Any) -> Optional[ToolCall]:
+    """A validated ToolCall for a registered skill, else None."""
+    if not isinstance(value, dict) or value.get('name') not in SKILLS:
+        return None
+    try:
+        return ToolCall(**value)
+    except ValueError:
+        return None
+
+def _stream_plan(prompt: str, on_tool_call: Callable[[ToolCall], None]) -> Dict[str, Any]:
+    """
+    Stream the plan and hand `tool_call` to `on_tool_call` as soon as its
+    object is complete, while "response_hint" is still being generated.
+    Stops reading at the plan's closing brace. The plan is deterministic
+    (temperature 0), so a cached one is replayed instead of streamed and
+    a streamed one is cached.
+    """
+    p = StreamingJSON()
+    t0 = time.perf_counter()
+    hit = cached_reply(prompt, temperature=0.0, site='planner')
+    gen = iter([hit]) if hit is not None else stream_llm(prompt, temperature=0.0, site='planner')
+    try:
+        for delta in gen:
+            for key, value in p.feed(delta):
+                tc = _tool_call(value) if key == 'tool_call' else None
+                if tc:
+                    log_event("plan_tool_early", {"tool": tc.name, "ms": round((time.perf_counter() - t0) * 1000)})
+                    on_tool_call(tc)
+            if p.done:
+                break
+    finally:
+        if hit is None:
+            gen.close()
+    if hit is None and p.done:
+        remember_reply(prompt, p.buf[:p.pos], temperature=0.0)
+    return p.obj if isinstance(p.obj, dict) else p.fields
+
+def plan_turn(user_text: str, grounding: Dict[str, Any], affect: str = 'neutral',
+              on_tool_call: Optional[Callable[[ToolCall], None]] = None) -> Plan:
+    """
+    JSON plan for the turn. With `on_tool_call` (and PLANNER_STREAM on) the
+    plan is streamed and a valid tool call is passed to it before the
+    completion ends; the returned Plan carries the same tool call.
+    """
+    g = render_grounding(grounding, user_text)   # budgeted, most relevant items first
+    prompt = f"{SYSTEM}\n{g}\nAFFECT:{affect}\nUSER:{user_text}\nPLAN:"
+    if on_tool_call is not None and getattr(cfg, 'PLANNER_STREAM', True):
+        obj = _stream_plan(prompt, on_tool_call)
+    else:
+        raw = ask_llm_full(prompt, temperature=0.0, site='planner') or '{}'  # deterministic: cacheable
+        obj = extract_first_json(raw)
+
+    tc = _tool_call(obj.get('tool_call'))
 
     # Fix: Make sure response_hint is optional-safe
     hint = obj.get('response_hint')
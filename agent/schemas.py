@@ -12,6 +12,7 @@ class Plan(BaseModel):
     confidence: float = 0.5
     tool_call: Optional[ToolCall] = None
     response_hint: Optional[str] = None  # 🔧 Fix: allow None safely
+    spoken: bool = False                 # response_hint was already spoken while streaming
 
     @validator("confidence")
     def _clamp(cls, v):
@@ -8,6 +8,11 @@ except Exception:
     def add_reminder(t, when): ...
     def set_assistant_name(n): ...
 
+try:
+    from reminder_audio import prepare_reminder  # from app/
+except Exception:
+    def prepare_reminder(t, when): ...
+
 @register('save_fact')
 def save_fact_tool(args: Dict[str, Any]) -> Dict[str, Any]:
     key = (args.get('key') or '').strip().lower().replace(' ', '_')
@@ -20,7 +25,7 @@ def add_reminder_tool(args: Dict[str, Any]) -> Dict[str, Any]:
     text = (args.get('text') or '').strip()
     when_iso = (args.get('when_iso') or '').strip()
     if not text or not when_iso: return {'ok': False, 'error': 'missing text/when'}
-    add_reminder(text, when_iso); return {'ok': True}
+    add_reminder(text, when_iso); prepare_reminder(text, when_iso); return {'ok': True}
 
 @register('set_assistant_name')
 def set_assistant_name_tool(args: Dict[str, Any]) -> Dict[str, Any]:
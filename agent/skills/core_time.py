@@ -7,7 +7,7 @@ try:
 except Exception:
     def get_timezone(): return 'Asia/Kolkata'
 
-@register('get_time')
+@register('get_time', read_only=True)
 def get_time(_: Dict[str, Any]) -> Dict[str, Any]:
     try:
         from zoneinfo import ZoneInfo
@@ -1,14 +1,20 @@
 ﻿from typing import Callable, Dict, Any
 
 _SKILLS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+_READ_ONLY: set = set()      # no side effects: safe to run before the plan is final
 
-def register(name: str):
+def register(name: str, read_only: bool = False):
     def deco(fn: Callable[[Dict[str, Any]], Dict[str, Any]]):
         _SKILLS[name] = fn
+        if read_only:
+            _READ_ONLY.add(name)
         return fn
     return deco
 
 def get(name: str):
     return _SKILLS.get(name)
 
+def is_read_only(name: str) -> bool:
+    return name in _READ_ONLY
+
 SKILLS = _SKILLS
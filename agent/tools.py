@@ -1,6 +1,7 @@
 # agent/tools.py
 from datetime import datetime
 from firebase_db import save_fact, add_reminder, get_reminders
+from reminder_audio import prepare_reminder
 from config import cfg
 
 def get_time() -> str:
@@ -24,6 +25,7 @@ def add_reminder_tool(args: dict) -> str:
     if not what:
         return "What should I remind you about?"
     add_reminder(what, when)
+    prepare_reminder(what, when)
     if when:
         return f"Okay, I’ve set a reminder for: {what} at {when}."
     return f"Reminder added: {what}."
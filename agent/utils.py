@@ -1,9 +1,123 @@
 ﻿import json
+from typing import Any, List, Optional, Tuple
+
+
+class StreamingJSON:
+    """
+    Incremental parser for the first JSON object in a streamed completion.
+
+        p = StreamingJSON()
+        for delta in stream:
+            for key, value in p.feed(delta):    # top-level fields as they complete
+                ...
+        p.obj                                   # whole object once p.done
+
+    Text before the first "{" (markdown fences, "Sure! Here is the plan:")
+    and anything after the closing "}" is ignored. A "{" in the prefix that
+    does not start a valid object is skipped on close and scanning resumes
+    at the next one. Each character is scanned once.
+    """
+
+    def __init__(self):
+        self.buf = ""
+        self.done = False
+        self.obj: Optional[dict] = None
+        self.fields: dict = {}
+        self._reset(0)
+
+    def _reset(self, start: int):
+        self.start = self.buf.find("{", start)
+        self.pos = self.start if self.start >= 0 else len(self.buf)
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+        self.expect = "key"         # at depth 1: "key" | "colon" | "value" | "comma"
+        self.key = None
+        self.val_start = -1
+        self.fields = {}
+
+    def _field(self, end: int, out: List[Tuple[str, Any]]):
+        try:
+            value = json.loads(self.buf[self.val_start:end])
+        except ValueError:
+            return
+        self.fields[self.key] = value
+        out.append((self.key, value))
+
+    def partial(self, key: str) -> Optional[str]:
+        """Raw (still escaped) text so far of top-level string `key` while it streams, else None."""
+        if self.depth == 1 and self.in_str and self.expect == "value" and self.key == key:
+            return self.buf[self.val_start + 1:self.pos]
+        return None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Add text; returns the top-level (key, value) pairs completed by it."""
+        out: List[Tuple[str, Any]] = []
+        if self.done or not chunk:
+            return out
+        self.buf += chunk
+        if self.start < 0:
+            self._reset(max(0, len(self.buf) - len(chunk)))
+        buf = self.buf
+        i = self.pos
+        while 0 <= self.start and i < len(buf):
+            c = buf[i]
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif c == "\\":
+                    self.esc = True
+                elif c == '"':
+                    self.in_str = False
+                    if self.depth == 1:
+                        if self.expect == "key":
+                            try:
+                                self.key = json.loads(buf[self.val_start:i + 1])
+                            except ValueError:
+                                self.key = buf[self.val_start + 1:i]
+                            self.expect = "colon"
+                        elif self.expect == "value":
+                            self._field(i + 1, out)
+                            self.expect = "comma"
+            elif c == '"':
+                self.in_str = True
+                if self.depth == 1 and self.expect in ("key", "value"):
+                    self.val_start = i
+            elif c in "{[":
+                if self.depth == 1 and self.expect == "value":
+                    self.val_start = i
+                self.depth += 1
+            elif c in "}]":
+                self.depth -= 1
+                if self.depth == 1 and self.expect == "value":
+                    self._field(i + 1, out)         # nested object/array value just closed
+                    self.expect = "comma"
+                elif self.depth == 0:
+                    if self.expect == "value":
+                        self._field(i, out)         # trailing literal: ..., "x": null}
+                    try:
+                        self.obj = json.loads(buf[self.start:i + 1])
+                    except ValueError:
+                        self._reset(self.start + 1)  # not the object after all: try the next "{"
+                        i = self.pos
+                        continue
+                    self.done = True
+                    self.pos = i + 1
+                    return out
+            elif self.depth == 1:
+                if c == ":" and self.expect == "colon":
+                    self.expect, self.val_start = "value", i + 1
+                elif c == ",":
+                    if self.expect == "value":
+                        self._field(i, out)         # literal value (null, number, true/false)
+                    self.expect, self.key = "key", None
+            i += 1
+        self.pos = i
+        return out
+
 
 def extract_first_json(s: str) -> dict:
-    start = s.find('{'); end = s.rfind('}')
-    if start == -1 or end == -1 or end <= start: return {}
-    try:
-        return json.loads(s[start:end+1])
-    except Exception:
-        return {}
+    """First complete JSON object in `s`; surrounding prose and fences are ignored. {} if none."""
+    p = StreamingJSON()
+    p.feed(s or "")
+    return p.obj if isinstance(p.obj, dict) else {}
@@ -23,6 +23,48 @@ class Config:
     LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
     LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "180"))
     LLM_HEALTHCHECK_SECONDS = int(os.getenv("LLM_HEALTHCHECK_SECONDS", "10"))
+    # Router: heavy model only if its recent p90 latency fits this per-turn budget
+    TURN_LATENCY_BUDGET_S = float(os.getenv("TURN_LATENCY_BUDGET_S", "6.0"))
+    # Router: per-model stats forget samples older than this; a skipped heavy model gets 1 in N queries
+    ROUTER_STATS_MAX_AGE_S = float(os.getenv("ROUTER_STATS_MAX_AGE_S", "600"))
+    ROUTER_PROBE_EVERY = int(os.getenv("ROUTER_PROBE_EVERY", "10"))
+    # Circuit breaker: open after N consecutive failed calls (0 = no slow-call limit)
+    LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+    LLM_BREAKER_SLOW_S = float(os.getenv("LLM_BREAKER_SLOW_S", "0"))
+    # OpenAI-compatible endpoint (point at a local stub/server for testing)
+    LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1").strip().rstrip("/")
+    # Extra rounds over the backends after all of them failed (backoff 0.5s, 1s, ...)
+    LLM_RETRIES = int(os.getenv("LLM_RETRIES", "1"))
+    # Async client: connections per event loop / prompts in flight for ask_llm_many()
+    LLM_ASYNC_MAX_CONNECTIONS = int(os.getenv("LLM_ASYNC_MAX_CONNECTIONS", "8"))
+    LLM_ASYNC_CONCURRENCY = int(os.getenv("LLM_ASYNC_CONCURRENCY", "4"))
+    # Streaming: max silence between two SSE events before we give up
+    LLM_STREAM_IDLE_TIMEOUT = float(os.getenv("LLM_STREAM_IDLE_TIMEOUT", "20"))
+    # Response cache: "auto" = temperature-0 calls only, "1" = any temperature, "0" = off
+    LLM_CACHE = os.getenv("LLM_CACHE", "auto").strip().lower()
+    LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", "86400"))
+    LLM_CACHE_MAX_ITEMS = int(os.getenv("LLM_CACHE_MAX_ITEMS", "512"))
+    LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "").strip()   # blank = memory only
+    # One LLM call per turn returning a tool call or the reply (0 = planner call + thinker call)
+    TURN_SINGLE_PASS = os.getenv("TURN_SINGLE_PASS", "1").strip().lower() in ("1", "true", "yes")
+    # The single pass is the turn's plan, so it samples like the planner: 0 keeps it cacheable (LLM_CACHE=auto)
+    SINGLE_PASS_TEMPERATURE = float(os.getenv("SINGLE_PASS_TEMPERATURE", "0"))
+    # Rule-based planner: "on" skips the LLM planner above the threshold, "shadow" only compares, "off"
+    FAST_PLANNER = os.getenv("FAST_PLANNER", "on").strip().lower()
+    FAST_PLANNER_THRESHOLD = float(os.getenv("FAST_PLANNER_THRESHOLD", "0.8"))
+    # Two-pass planner: stream the JSON plan and start its tool call before the completion ends
+    PLANNER_STREAM = os.getenv("PLANNER_STREAM", "1").strip().lower() in ("1", "true", "yes")
+    # Speculation: start the turn's LLM call once the streaming transcript is stable this long (opt-in)
+    SPECULATIVE = os.getenv("SPECULATIVE", "0").strip().lower() in ("1", "true", "yes")
+    SPECULATIVE_STABLE_MS = int(os.getenv("SPECULATIVE_STABLE_MS", "350"))
+    # Prompt assembly: estimated-token budget per section (thinker/prompt.py)
+    PROMPT_BUDGET_SYSTEM = int(os.getenv("PROMPT_BUDGET_SYSTEM", "400"))
+    PROMPT_BUDGET_GROUNDING = int(os.getenv("PROMPT_BUDGET_GROUNDING", "250"))
+    PROMPT_BUDGET_HISTORY = int(os.getenv("PROMPT_BUDGET_HISTORY", "300"))
+    PROMPT_BUDGET_PASSAGES = int(os.getenv("PROMPT_BUDGET_PASSAGES", "300"))
+    # Reply length: max_tokens from intent/affect/channel instead of LLM_MAX_TOKENS (thinker/budget.py)
+    REPLY_BUDGET = os.getenv("REPLY_BUDGET", "1").strip().lower() in ("1", "true", "yes")
+    REPLY_BUDGET_SCALE = float(os.getenv("REPLY_BUDGET_SCALE", "1.0"))
     SYSTEM_PROMPT = os.getenv("SYSTEM_PROMPT", "You are a concise, helpful assistant.")
 
     # -----------------------------
@@ -30,7 +72,12 @@ class Config:
     # -----------------------------
     SPACE_URL = os.getenv("SPACE_URL", "").strip()
     HF_TOKEN = os.getenv("HF_TOKEN", "").strip()
+    # Backends to use, in order, from configs/models.yaml (blank = all enabled ones)
     LLM_ROUTE = os.getenv("LLM_ROUTE", "").strip()
+    LLM_MODELS_PATH = os.getenv("LLM_MODELS_PATH", "").strip()     # blank = configs/models.yaml
+    LLM_BACKEND_TIMEOUT_S = float(os.getenv("LLM_BACKEND_TIMEOUT_S", "20"))
+    # Rate governor: share of a backend's rpm/tpm that background calls leave for live turns
+    LLM_GOVERNOR_RESERVE = float(os.getenv("LLM_GOVERNOR_RESERVE", "0.25"))
 
     # -----------------------------
     # Audio / STT / TTS
@@ -43,11 +90,40 @@ class Config:
     AUDIO_DIR = os.getenv("AUDIO_DIR", "audio").strip()
     # 🔄 Changed default to True so we skip deleting TTS temp files (reduces lag)
     KEEP_TTS = os.getenv("KEEP_TTS", "1").strip().lower() in ("1", "true", "yes")
+    TTS_RATE = os.getenv("TTS_RATE", "+0%").strip()
+
+    # Content-addressed TTS cache (replaces the tts_<uuid>.mp3 pile-up)
+    TTS_CACHE = os.getenv("TTS_CACHE", "1").strip().lower() in ("1", "true", "yes")
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "").strip()
+    TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "100"))
+    TTS_PREWARM = os.getenv("TTS_PREWARM", "0").strip().lower() in ("1", "true", "yes")
+    # Reminder scheduler: poll interval, and how overdue a reminder may be and still be announced
+    REMINDER_POLL_S = float(os.getenv("REMINDER_POLL_S", "15"))
+    REMINDER_GRACE_S = float(os.getenv("REMINDER_GRACE_S", "600"))
+    # Play the first synthesized chunk while the rest is still streaming in
+    TTS_STREAMING = os.getenv("TTS_STREAMING", "0").strip().lower() in ("1", "true", "yes")
+    # Speak the LLM reply while it is still being generated (streaming.speak_while_generating)
+    SPEAK_STREAMING = os.getenv("SPEAK_STREAMING", "0").strip().lower() in ("1", "true", "yes")
+    # Split replies into sentences and synthesize N+1 while N is playing
+    TTS_PIPELINE = os.getenv("TTS_PIPELINE", "1").strip().lower() in ("1", "true", "yes")
+    # Synthesizer: "edge" (network) or "local" (Piper voice model, pip install piper-tts)
+    TTS_BACKEND = os.getenv("TTS_BACKEND", "edge").strip().lower()
+    TTS_LOCAL_MODEL = os.getenv("TTS_LOCAL_MODEL", "").strip()          # path to a Piper .onnx voice
+    TTS_LOCAL_FALLBACK = os.getenv("TTS_LOCAL_FALLBACK", "1").strip().lower() in ("1", "true", "yes")
+    TTS_REMOTE_BUDGET_S = float(os.getenv("TTS_REMOTE_BUDGET_S", "2.0"))
+    # One long-lived asyncio loop for edge_tts instead of asyncio.run() per utterance
+    TTS_WORKER = os.getenv("TTS_WORKER", "1").strip().lower() in ("1", "true", "yes")
+    # Output device for the persistent playback engine (blank = system default)
+    PLAYBACK_DEVICE = os.getenv("PLAYBACK_DEVICE", "").strip()
 
     CHANNELS = int(os.getenv("CHANNELS", "1"))  # mono
     DTYPE = os.getenv("DTYPE", "float32").strip()  # sounddevice dtype
     VAD_SAMPLING_RATE = int(os.getenv("VAD_SAMPLING_RATE", "16000"))
 
+    # Shared STT service (micro-batching across streams)
+    STT_BATCH_MAX = int(os.getenv("STT_BATCH_MAX", "8"))
+    STT_BATCH_WAIT_MS = float(os.getenv("STT_BATCH_WAIT_MS", "40"))
+
     # -----------------------------
     # Hotword & Aliases
     # -----------------------------
@@ -85,6 +161,10 @@ class Config:
     # -----------------------------
     FILLER_LATENCY_GATE_S = float(os.getenv("FILLER_LATENCY_GATE_S", "1.2"))
     FILLER_COOLDOWN_S = float(os.getenv("FILLER_COOLDOWN_S", "30"))
+    # Past the filler gate, also race a second request on a faster model
+    # (blank = GROQ_MODEL); no hedge when that is the model already in flight
+    LLM_HEDGE = os.getenv("LLM_HEDGE", "0").strip().lower() in ("1", "true", "yes")
+    LLM_HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL", "").strip()
 
     # -----------------------------
     # 🔥 Firestore Toggle
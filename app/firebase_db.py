@@ -124,6 +124,11 @@ def delete_reminder_by_text(message_or_substring: str):
         return
     kept = [r for r in current if sub not in (r.get("message", "").lower())]
     db.collection(COLL).document(DOC).update({"reminders": kept})
+    # drop pre-rendered announcements for the removed reminders
+    from reminder_audio import forget_reminder
+    for r in current:
+        if sub in (r.get("message", "").lower()):
+            forget_reminder(r.get("message", ""), r.get("time", ""))
 
 
 # === 📅 Events ===
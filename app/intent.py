@@ -289,3 +289,15 @@ def maybe_greeting_reply(text: str) -> str | None:
 
 def processing_lines() -> List[str]:
     return _empathy.get("question_processing", DEFAULT_EMPATHY["question_processing"])[:]
+
+
+def canned_replies() -> List[str]:
+    """Every fixed line we can speak without the LLM (used to pre-warm the TTS cache)."""
+    lines: List[str] = []
+    for v in _empathy.values():
+        lines.extend(x for x in v if isinstance(x, str))
+    for probe in ("how are you", "hi", "good morning", "good afternoon", "good evening"):
+        g = maybe_greeting_reply(probe)
+        if g:
+            lines.append(g)
+    return list(dict.fromkeys(lines))
@@ -1,12 +1,37 @@
 # app/llm.py
 
+import os
 import time
 import json
+import asyncio
+import hashlib
 import logging
+import weakref
+import threading
 import requests
-from typing import Optional
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import AsyncIterator, Callable, Iterator, List, Optional
 
 from config import cfg
+from llm_backends import CircuitBreaker, OpenAIBackend, get_pool, _sse_deltas, _is_failure_status  # noqa: F401
+
+try:
+    from infra.http_client import get_session, prewarm
+except Exception:               # repo root not on sys.path: plain requests, no pooling stats
+    get_session = lambda name="default": requests
+    prewarm = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from telemetry.ledger import record as ledger_record, aggregates as ledger_aggregates
+except Exception:               # repo root not on sys.path: no usage ledger
+    ledger_record = None
+    ledger_aggregates = lambda: {}
 
 _last_llm_fail: float = 0.0
 
@@ -21,6 +46,81 @@ def _headers() -> dict:
     }
 
 
+def _http():
+    return get_session("llm")
+
+
+def prewarm_llm_connection(background: bool = True):
+    """Open keep-alive connections to the LLM hosts before the first turn."""
+    if prewarm is None:
+        return None
+    out = None
+    for b in get_pool().backends:
+        if isinstance(b, OpenAIBackend):
+            out = prewarm(f"{b.base_url}/models", session="llm", headers=b.headers(), background=background)
+    return out
+
+
+def _chat_url() -> str:
+    base = getattr(cfg, "LLM_BASE_URL", "") or "https://api.groq.com/openai/v1"
+    return f"{base.rstrip('/')}/chat/completions"
+
+
+def _payload(user_text: str, stream: bool = False, model: str = None,
+             temperature: float = None, max_tokens: int = None) -> dict:
+    """Chat payload; model/temperature/max_tokens default to the cfg values."""
+    payload = {
+        "model": model or cfg.GROQ_MODEL,
+        "temperature": float(temperature if temperature is not None else getattr(cfg, "LLM_TEMPERATURE", 0.3)),
+        "max_tokens": int(max_tokens or getattr(cfg, "LLM_MAX_TOKENS", 512)),
+        "messages": [
+            {"role": "system", "content": cfg.SYSTEM_PROMPT},
+            {"role": "user", "content": user_text}
+        ]
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _ledger(site: str, payload: dict, info: dict, outcome: str, t0: float,
+            ttft_s: float = None, text: str = None):
+    """One telemetry.ledger record: tokens from the server's `usage` block, else estimated."""
+    if ledger_record is None:
+        return
+    usage = info.get("usage") or {}
+    cached = outcome == "cache"
+    prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+    est = not cached and prompt is None
+    if prompt is None:
+        prompt = 0 if cached else sum(len(str(m.get("content") or "")) for m in payload.get("messages") or []) // 4
+    if completion is None:
+        completion = 0 if cached else (len(text or "") + 3) // 4
+    ledger_record(site, model=info.get("model") or payload.get("model", ""), backend=info.get("backend", ""),
+                  outcome=outcome, prompt_tokens=prompt, completion_tokens=completion,
+                  ttft_ms=ttft_s * 1000 if ttft_s is not None else None,
+                  total_ms=(time.perf_counter() - t0) * 1000, est=est)
+
+
+def llm_usage() -> dict:
+    """Rolling per-call-site latency / token aggregates (telemetry.ledger)."""
+    return ledger_aggregates()
+
+
+def llm_available() -> bool:
+    """In-memory health gate for the turn path (no network): any backend not circuit-open."""
+    return get_pool().available()
+
+
+def backend_stats() -> dict:
+    return get_pool().stats()
+
+
+def rate_governor_stats() -> dict:
+    """Queue depth, admissions, waits and 429s per backend (see infra.rate_limit.RateGovernor)."""
+    return {b.name: b.governor.stats() for b in get_pool().backends if b.governor is not None}
+
+
 def llm_is_up(retries: int = 3, wait_per_try: int = 10) -> bool:
     """Check if Groq LLM is available by sending a ping."""
     global _last_llm_fail
@@ -30,7 +130,7 @@ def llm_is_up(retries: int = 3, wait_per_try: int = 10) -> bool:
         logging.debug("⏳ Skipping LLM check (within cooldown)")
         return False
 
-    url = "https://api.groq.com/openai/v1/chat/completions"
+    url = _chat_url()
     payload = {
         "model": cfg.GROQ_MODEL,
         "messages": [{"role": "user", "content": "ping"}],
@@ -41,16 +141,20 @@ def llm_is_up(retries: int = 3, wait_per_try: int = 10) -> bool:
     headers = _headers()
 
     for attempt in range(1, retries + 1):
+        t0 = time.perf_counter()
         try:
             print(f"⏳ Checking LLM backend... (try {attempt}/{retries})")
-            r = requests.post(url, headers=headers, json=payload, timeout=(5, 10))
+            r = _http().post(url, headers=headers, json=payload, timeout=(5, 10))
             if r.status_code == 200:
                 print("✅ Groq LLM backend is awake.")
+                get_pool().primary().breaker.record(True)
+                _ledger("health", payload, {"usage": r.json().get("usage"), "backend": "groq"}, "ok", t0)
                 return True
             else:
                 logging.warning(f"⚠️ Healthcheck HTTP {r.status_code}: {r.text}")
         except Exception as e:
             logging.warning(f"❌ Healthcheck error: {e}")
+        _ledger("health", payload, {"backend": "groq"}, "error", t0)
 
         time.sleep(wait_per_try)
 
@@ -62,39 +166,502 @@ def llm_is_up(retries: int = 3, wait_per_try: int = 10) -> bool:
 # ----------------------------
 # Main Ask Functions
 # ----------------------------
-def ask_llm_latency_gated(user_text: str, gate_seconds: float) -> Optional[str]:
-    return _post_llm(user_text, gate_seconds)
+# model / temperature / max_tokens may be given per call; unset ones use cfg.
+# cache=True/False overrides LLM_CACHE for one call (see ResponseCache).
+# priority="background" (summaries, eval, learner) queues behind live turns
+# in the backends' rate governor (infra.rate_limit.RateGovernor).
+# site="planner" / "thinker" / "summarizer" / ... labels the call in the
+# usage ledger (telemetry.ledger; llm_usage() for the rolling aggregates).
+def ask_llm_latency_gated(user_text: str, gate_seconds: float, **opts) -> Optional[str]:
+    return _post_llm(user_text, gate_seconds, **opts)
 
 
-def ask_llm_full(user_text: str) -> Optional[str]:
+def ask_llm_full(user_text: str, **opts) -> Optional[str]:
     timeout = float(getattr(cfg, "LLM_READ_TIMEOUT", 180.0))
-    return _post_llm(user_text, timeout)
+    return _post_llm(user_text, timeout, **opts)
+
+
+def stream_llm(user_text: str, idle_timeout: float = None, priority: str = "interactive",
+               site: str = "unlabeled", **opts) -> Iterator[str]:
+    """
+    Stream the reply as text deltas from the server-sent events of the
+    OpenAI-compatible endpoint ("stream": true). `idle_timeout` bounds the
+    silence between two events rather than the whole reply. Errors are
+    logged and end the iteration, like _post_llm() returning None; closing
+    the generator early closes the HTTP response. If a backend fails
+    before its first token the next one (llm_backends) is tried.
+    """
+    idle = float(idle_timeout or getattr(cfg, "LLM_STREAM_IDLE_TIMEOUT", 20.0))
+    payload, info = _payload(user_text, **opts), {}
+    t0, first, parts, outcome = time.perf_counter(), None, [], "error"
+    gen = get_pool().stream(payload, idle, priority=priority, info=info)
+    try:
+        for delta in gen:
+            if first is None:
+                first = time.perf_counter() - t0
+            parts.append(delta)
+            yield delta
+        outcome = "ok" if first is not None else "error"
+    except GeneratorExit:
+        outcome = "stopped"             # consumer closed early (barge-in, reply budget, hedge loser)
+        raise
+    finally:
+        gen.close()
+        _ledger(site, payload, info, outcome, t0, first, "".join(parts))
 
 
 # ----------------------------
-# Core Request Logic
+# Latency-gated, hedged requests
 # ----------------------------
-def _post_llm(user_text: str, read_timeout: float) -> Optional[str]:
-    url = "https://api.groq.com/openai/v1/chat/completions"
+_hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="LLM_Hedge")
+_hedge_lock = threading.Lock()
+_hedge_counts = {"calls": 0, "gated": 0, "hedged": 0, "hedge_wins": 0}
+_hedge_saved_s: deque = deque(maxlen=200)
 
-    payload = {
-        "model": cfg.GROQ_MODEL,
-        "temperature": float(getattr(cfg, "LLM_TEMPERATURE", 0.3)),
-        "max_tokens": int(getattr(cfg, "LLM_MAX_TOKENS", 512)),
-        "messages": [
-            {"role": "system", "content": cfg.SYSTEM_PROMPT},
-            {"role": "user", "content": user_text}
-        ]
-    }
 
+def _count(key: str):
+    with _hedge_lock:
+        _hedge_counts[key] += 1
+
+
+def ask_llm_cancellable(user_text: str, cancel: threading.Event, progress: dict = None,
+                        **opts) -> Optional[str]:
+    """
+    Whole reply via the SSE stream, so the request can be dropped at its
+    next event once `cancel` is set (returns None). `progress["chars"]`
+    counts the text received, e.g. to account for wasted tokens.
+    """
+    parts = []
+    gen = stream_llm(user_text, **opts)
+    try:
+        for delta in gen:
+            if progress is not None:
+                progress["chars"] = progress.get("chars", 0) + len(delta)
+            if cancel.is_set():
+                return None
+            parts.append(delta)
+    finally:
+        gen.close()
+    return "".join(parts) or None
+
+
+def ask_llm_hedged(user_text: str, gate_s: float = None, on_gate: Callable[[], None] = None,
+                   hedge_model: str = None, outcome: dict = None, **opts) -> Optional[str]:
+    """
+    Like ask_llm_full(), but if no answer arrives within `gate_s`
+    (FILLER_LATENCY_GATE_S) it calls `on_gate()` (e.g. speak a filler line)
+    and, with LLM_HEDGE on, fires a second request to `hedge_model`
+    (LLM_HEDGE_MODEL, default the light model). The first non-empty answer
+    wins; the other request is cancelled at its next stream event. No
+    hedge is sent when it would go to the primary's own model.
+    `outcome`, if given, is filled with winner/model/gated/hedged.
+    """
+    gate = float(gate_s if gate_s is not None else getattr(cfg, "FILLER_LATENCY_GATE_S", 1.2))
+    total = float(getattr(cfg, "LLM_READ_TIMEOUT", 180.0))
+    out = outcome if outcome is not None else {}
+    out.update(winner=None, model=opts.get("model") or cfg.GROQ_MODEL, gated=False, hedged=False)
+    t0 = time.perf_counter()
+    cancels = {"primary": threading.Event(), "hedge": threading.Event()}
+    _count("calls")
+
+    primary = _hedge_pool.submit(ask_llm_cancellable, user_text, cancels["primary"], **opts)
     try:
-        r = requests.post(url, headers=_headers(), json=payload, timeout=(5, read_timeout))
-        if r.status_code == 200:
-            j = r.json()
-            return j.get("choices", [{}])[0].get("message", {}).get("content", None)
-        else:
-            logging.warning(f"⚠️ Groq LLM error {r.status_code}: {r.text}")
+        text = primary.result(timeout=gate)
+        out["winner"] = "primary" if text else None
+        return text
+    except FutureTimeout:
+        pass
     except Exception as e:
-        logging.warning(f"❌ Exception during Groq LLM call: {e}")
+        logging.warning(f"❌ LLM request failed: {e}")
+        return None
+
+    out["gated"] = True
+    _count("gated")
+    if on_gate is not None:
+        try:
+            on_gate()
+        except Exception as e:
+            logging.debug(f"on_gate callback failed: {e}")
+
+    pending = {primary: "primary"}
+    hmodel = hedge_model or getattr(cfg, "LLM_HEDGE_MODEL", "") or cfg.GROQ_MODEL
+    if hmodel == out["model"]:
+        # a second copy of the same request queues behind the same slow model
+        logging.debug(f"LLM hedge skipped: hedge model is the primary model ({hmodel})")
+    elif getattr(cfg, "LLM_HEDGE", True) and llm_available():
+        hopts = {**opts, "model": hmodel, "site": f"{opts.get('site', 'unlabeled')}_hedge"}
+        pending[_hedge_pool.submit(ask_llm_cancellable, user_text, cancels["hedge"], **hopts)] = "hedge"
+        out["hedged"] = True
+        _count("hedged")
+
+    text, winner = None, None
+    while pending and winner is None:
+        left = total - (time.perf_counter() - t0)
+        done, _ = wait(list(pending), timeout=max(0.0, left), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for f in done:
+            name = pending.pop(f)
+            try:
+                r = f.result()
+            except Exception as e:
+                logging.warning(f"❌ LLM {name} request failed: {e}")
+                r = None
+            if r and winner is None:
+                text, winner = r, name
+    for ev in cancels.values():
+        ev.set()
+
+    won_at = time.perf_counter()
+    out["winner"] = winner
+    if winner == "hedge":
+        out["model"] = hmodel
+        _count("hedge_wins")
+
+        def _saved(_f):
+            # primary stops at its next event after cancel: a lower bound on what it would have taken
+            with _hedge_lock:
+                _hedge_saved_s.append(time.perf_counter() - won_at)
+        primary.add_done_callback(_saved)
+    logging.info(f"LLM gated request: winner={winner} after {(won_at - t0) * 1000:.0f} ms "
+                 f"(gate {gate * 1000:.0f} ms, hedged={out['hedged']})")
+    return text
+
+
+def hedge_stats() -> dict:
+    """Gate/hedge rates and (lower-bound) latency saved when the hedge won."""
+    with _hedge_lock:
+        c = dict(_hedge_counts)
+        xs = sorted(_hedge_saved_s)
+    calls = max(1, c["calls"])
+    return {
+        **c,
+        "gate_rate": round(c["gated"] / calls, 3),
+        "hedge_rate": round(c["hedged"] / calls, 3),
+        "hedge_win_rate": round(c["hedge_wins"] / max(1, c["hedged"]), 3),
+        "saved_ms_p50": round(xs[len(xs) // 2] * 1000) if xs else None,
+        "saved_ms_total": round(sum(xs) * 1000),
+    }
+
+
+# ----------------------------
+# Response cache (deterministic calls)
+# ----------------------------
+class ResponseCache:
+    """
+    LRU of completed replies keyed by model, normalized messages and
+    sampling params. Entries expire after `ttl_s`; past `max_items` the
+    least recently used is dropped. With `root` set, entries are also
+    written there as one JSON file per key and read back on a miss, so
+    repeated eval runs and restarts start warm.
+    """
+
+    def __init__(self, max_items: int = 512, ttl_s: float = 86400.0, root: str = ""):
+        self.max_items = max(1, int(max_items))
+        self.ttl_s = float(ttl_s)
+        self.root = os.path.abspath(root) if root else ""
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # key -> (wall time, text), oldest first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.root:
+            os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key(payload: dict) -> str:
+        msgs = [[m.get("role", ""), " ".join(str(m.get("content") or "").split())]
+                for m in payload.get("messages") or []]
+        raw = json.dumps([payload.get("model"), msgs,
+                          round(float(payload.get("temperature") or 0), 3),
+                          payload.get("max_tokens")], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key + ".json")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit and now - hit[0] < self.ttl_s:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit[1]
+            self._entries.pop(key, None)
+        hit = self._load(key, now)
+        with self._lock:
+            if hit is None:
+                self.misses += 1
+                return None
+            self._put_locked(key, hit)
+            self.hits += 1
+            return hit[1]
+
+    def put(self, key: str, text: str):
+        if not text:
+            return
+        entry = (time.time(), text)
+        with self._lock:
+            self._put_locked(key, entry)
+        if self.root:
+            try:
+                tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"ts": entry[0], "text": text}, f, ensure_ascii=False)
+                os.replace(tmp, self._path(key))
+            except OSError as e:
+                logging.debug(f"LLM cache write failed: {e}")
+
+    def _put_locked(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            old, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self.root:
+                try:
+                    os.remove(self._path(old))
+                except OSError:
+                    pass
+
+    def _load(self, key: str, now: float):
+        if not self.root:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                j = json.load(f)
+            if now - float(j["ts"]) < self.ttl_s and j.get("text"):
+                return float(j["ts"]), j["text"]
+            os.remove(path)                     # expired
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.root:
+            for name in os.listdir(self.root):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.root, name))
+                    except OSError:
+                        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "items": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+            }
+
+
+response_cache = ResponseCache(
+    max_items=int(getattr(cfg, "LLM_CACHE_MAX_ITEMS", 512)),
+    ttl_s=float(getattr(cfg, "LLM_CACHE_TTL_S", 86400)),
+    root=getattr(cfg, "LLM_CACHE_DIR", ""),
+)
+
+
+def _use_cache(payload: dict, cache: Optional[bool]) -> bool:
+    """Per-call `cache` wins; otherwise LLM_CACHE: "auto" = temperature 0 only, "1" = always, "0" = never."""
+    if cache is not None:
+        return bool(cache)
+    mode = str(getattr(cfg, "LLM_CACHE", "auto")).lower()
+    if mode in ("1", "true", "yes", "always"):
+        return True
+    if mode == "auto":
+        return float(payload.get("temperature") or 0) == 0.0
+    return False
+
+
+def llm_cache_stats() -> dict:
+    return response_cache.stats()
+
+
+def cached_reply(user_text: str, cache: bool = None, site: str = "unlabeled", **opts) -> Optional[str]:
+    """
+    The cached reply for this call, if any: lets a caller that streams
+    (stream_llm() never reads the cache) skip the request on a hit.
+    """
+    payload = _payload(user_text, **opts)
+    t0 = time.perf_counter()
+    _, hit = _cache_lookup(payload, cache)
+    if hit is not None:
+        _ledger(site, payload, {}, "cache", t0, text=hit)
+    return hit
+
+
+def remember_reply(user_text: str, text: str, cache: bool = None, **opts):
+    """
+    Store a reply the caller streamed and read to its own end (e.g. a JSON
+    plan cut at its closing brace), for the same call made later.
+    """
+    payload = _payload(user_text, **opts)
+    if text and _use_cache(payload, cache):
+        response_cache.put(ResponseCache.key(payload), text)
+
+
+# ----------------------------
+# Core Request Logic
+# ----------------------------
+def _cache_lookup(payload: dict, cache: Optional[bool]):
+    """(key, cached reply) — key is None when this call is not cacheable."""
+    key = ResponseCache.key(payload) if _use_cache(payload, cache) else None
+    hit = response_cache.get(key) if key else None
+    if hit is not None:
+        logging.debug(f"LLM cache hit {key[:10]}")
+    return key, hit
+
+
+def _post_llm(user_text: str, read_timeout: float, model: str = None,
+              temperature: float = None, max_tokens: int = None,
+              cache: bool = None, priority: str = "interactive",
+              site: str = "unlabeled") -> Optional[str]:
+    payload = _payload(user_text, model=model, temperature=temperature, max_tokens=max_tokens)
+    t0, info = time.perf_counter(), {}
+    key, hit = _cache_lookup(payload, cache)
+    if hit is not None:
+        _ledger(site, payload, info, "cache", t0, text=hit)
+        return hit
+    text = get_pool().complete(payload, deadline_s=read_timeout, priority=priority, info=info)
+    _ledger(site, payload, info, "ok" if text else "error", t0, text=text)
+    if key and text:
+        response_cache.put(key, text)
+    return text
+
+
+# ----------------------------
+# Asyncio client
+# ----------------------------
+# Same semantics as the blocking calls (deadline, failover, retries, cache),
+# but concurrent prompts share one aiohttp connection pool per event loop
+# instead of holding a thread each. Sync code can use submit_llm() /
+# ask_llm_many(), which run on a shared background loop.
+_async_sessions: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+async def _asession():
+    """This loop's shared aiohttp session, or None without aiohttp (blocking calls in threads)."""
+    if aiohttp is None:
+        return None
+    loop = asyncio.get_running_loop()
+    s = _async_sessions.get(loop)
+    if s is None or s.closed:
+        limit = int(getattr(cfg, "LLM_ASYNC_MAX_CONNECTIONS", 8))
+        s = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit, ttl_dns_cache=600,
+                                                                 keepalive_timeout=60))
+        _async_sessions[loop] = s
+    return s
+
+
+async def close_llm_async():
+    """Close this loop's session (call before the loop ends, e.g. at the end of asyncio.run)."""
+    s = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if s is not None:
+        await s.close()
+
+
+async def ask_llm_async(user_text: str, read_timeout: float = None, cache: bool = None,
+                        priority: str = "interactive", site: str = "unlabeled", **opts) -> Optional[str]:
+    """Awaitable ask_llm_full(); model / temperature / max_tokens per call as usual."""
+    timeout = float(read_timeout or getattr(cfg, "LLM_READ_TIMEOUT", 180.0))
+    payload = _payload(user_text, **opts)
+    t0, info = time.perf_counter(), {}
+    key, hit = _cache_lookup(payload, cache)
+    if hit is not None:
+        _ledger(site, payload, info, "cache", t0, text=hit)
+        return hit
+    outcome, text = "error", None
+    try:
+        text = await get_pool().acomplete(await _asession(), payload, deadline_s=timeout,
+                                          priority=priority, info=info)
+        outcome = "ok" if text else "error"
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        _ledger(site, payload, info, outcome, t0, text=text if outcome == "ok" else None)
+    if key and text:
+        response_cache.put(key, text)
+    return text
+
+
+async def stream_llm_async(user_text: str, idle_timeout: float = None, priority: str = "interactive",
+                           site: str = "unlabeled", **opts) -> AsyncIterator[str]:
+    """Async stream_llm(): text deltas; breaking out of the loop closes the response."""
+    idle = float(idle_timeout or getattr(cfg, "LLM_STREAM_IDLE_TIMEOUT", 20.0))
+    payload, info = _payload(user_text, **opts), {}
+    t0, first, parts, outcome = time.perf_counter(), None, [], "error"
+    gen = get_pool().astream(await _asession(), payload, idle, priority=priority, info=info)
+    try:
+        async for delta in gen:
+            if first is None:
+                first = time.perf_counter() - t0
+            parts.append(delta)
+            yield delta
+        outcome = "ok" if first is not None else "error"
+    except GeneratorExit:
+        outcome = "stopped"
+        raise
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        await gen.aclose()
+        _ledger(site, payload, info, outcome, t0, first, "".join(parts))
+
+
+class _AsyncRuntime:
+    """One daemon thread running an event loop for the sync wrappers."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                ready = threading.Event()
+
+                def _run():
+                    self._loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(self._loop)
+                    ready.set()
+                    self._loop.run_forever()
+
+                threading.Thread(target=_run, name="LLM_Async", daemon=True).start()
+                ready.wait(timeout=5)
+            return self._loop
+
+    def submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop())
+
+
+_runtime = _AsyncRuntime()
+
+
+def submit_llm(user_text: str, **opts) -> Future:
+    """Start an LLM call in the background; returns a concurrent Future (e.g. summarize while answering)."""
+    return _runtime.submit(ask_llm_async(user_text, **opts))
+
+
+def ask_llm_many(prompts: List[str], concurrency: int = None, **opts) -> List[Optional[str]]:
+    """Run `prompts` concurrently (at most `concurrency` in flight); results in input order."""
+    limit = max(1, int(concurrency or getattr(cfg, "LLM_ASYNC_CONCURRENCY", 4)))
+
+    async def _all():
+        sem = asyncio.Semaphore(limit)
+
+        async def _one(p):
+            async with sem:
+                return await ask_llm_async(p, **opts)
+        return await asyncio.gather(*(_one(p) for p in prompts))
 
-    return None
+    return list(_runtime.submit(_all()).result())
@@ -0,0 +1,814 @@
+# app/llm_backends.py
+"""
+LLM backends and latency-aware failover.
+
+    pool = get_pool()
+    text = pool.complete(payload, deadline_s=20)       # first backend that answers
+    for delta in pool.stream(payload): ...
+
+Backends come from the `backends:` section of configs/models.yaml
+(LLM_MODELS_PATH), optionally narrowed and ordered by LLM_ROUTE
+("groq,space"). Each has its own circuit breaker and rolling latency; calls
+try healthy backends fastest-first (error rate counts against a backend),
+each attempt bounded by its `timeout_s` and by what is left of the deadline.
+A backend with `rpm`/`tpm` budgets sits behind an infra.rate_limit
+RateGovernor: "interactive" calls are admitted before "background" ones
+(summaries, eval) and 429 / Retry-After replies pause admission.
+
+    openai   any OpenAI-compatible /chat/completions server (Groq, llama.cpp,
+             vLLM, Ollama, eval/sse_stub.py)
+    gradio   a Hugging Face Space / Gradio app answering POST /run/predict
+             with {"data": [system, user]} (see test_space.py)
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+import requests
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from config import cfg
+
+try:
+    from infra.http_client import get_session
+except Exception:               # repo root not on sys.path: plain requests
+    get_session = lambda name="default": requests
+
+try:
+    from infra.rate_limit import RateGovernor
+except Exception:
+    RateGovernor = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import aiohttp
+except ImportError:             # async calls fall back to the blocking client in a thread
+    aiohttp = None
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ----------------------------
+# Circuit breaker (passive health tracking)
+# ----------------------------
+class CircuitBreaker:
+    """
+    Tracks the outcome and latency of real LLM calls instead of pinging
+    before each one.
+
+        closed     normal; every call goes through
+        open       `fail_threshold` consecutive failures (errors, 429/5xx,
+                   or calls slower than `slow_s`); calls fail fast and a
+                   background thread probes the endpoint every
+                   `probe_interval_s`
+        half_open  a probe succeeded; a single trial call (claimed with
+                   begin()) decides between closed and open again, other
+                   callers skip the backend until it has reported back
+
+    allow() and begin() only touch in-memory state, so the turn path never
+    waits on them. A trial that never reports back (its caller gave up) is
+    released after `probe_interval_s`.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, probe, fail_threshold: int = 3, probe_interval_s: float = 10.0, slow_s: float = 0.0):
+        self.probe = probe
+        self.fail_threshold = max(1, int(fail_threshold))
+        self.probe_interval_s = float(probe_interval_s)
+        self.slow_s = float(slow_s or 0)
+        self.state = self.CLOSED
+        self.opened_count = 0
+        self.last_error = ""
+        self.latency_ms = deque(maxlen=200)
+        self._fails = 0
+        self._trial_at = None       # monotonic start of the half-open trial call
+        self._lock = threading.Lock()
+        self._prober = None
+
+    def _trial_busy(self) -> bool:
+        return self._trial_at is not None and time.monotonic() - self._trial_at < self.probe_interval_s
+
+    def allow(self) -> bool:
+        """Could a call go through right now? Read-only; use begin() to actually start one."""
+        with self._lock:
+            if self.state == self.CLOSED or (self.state == self.HALF_OPEN and not self._trial_busy()):
+                return True
+            if self.state == self.HALF_OPEN:
+                return False
+        self._ensure_prober()
+        return False
+
+    def begin(self) -> bool:
+        """Start a call: always when closed, once (the trial) when half-open, never when open."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_busy():
+                self._trial_at = time.monotonic()
+                return True
+            if self.state == self.HALF_OPEN:
+                return False
+        self._ensure_prober()
+        return False
+
+    def record(self, ok: bool, latency_s: float = None, error: str = ""):
+        with self._lock:
+            self._trial_at = None
+            if latency_s is not None:
+                self.latency_ms.append(latency_s * 1000)
+            if ok and self.slow_s and latency_s is not None and latency_s > self.slow_s:
+                ok, error = False, f"slow call ({latency_s:.1f}s)"
+            if ok:
+                if self.state != self.CLOSED:
+                    logging.info("✅ LLM circuit closed")
+                self.state, self._fails = self.CLOSED, 0
+                return
+            self._fails += 1
+            self.last_error = error
+            trip = self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._fails >= self.fail_threshold)
+            if trip:
+                self.state = self.OPEN
+                self.opened_count += 1
+                logging.warning(f"⛔ LLM circuit open after {self._fails} failure(s): {error}")
+        if trip:
+            self._ensure_prober()
+
+    def _ensure_prober(self):
+        with self._lock:
+            if self._prober and self._prober.is_alive():
+                return
+            self._prober = threading.Thread(target=self._probe_loop, name="LLM_Probe", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        while True:
+            time.sleep(self.probe_interval_s)
+            with self._lock:
+                if self.state != self.OPEN:
+                    return
+            try:
+                ok = bool(self.probe())
+            except Exception as e:
+                logging.debug(f"LLM probe error: {e}")
+                ok = False
+            if ok:
+                with self._lock:
+                    if self.state == self.OPEN:
+                        self.state = self.HALF_OPEN
+                        logging.info("LLM probe succeeded; circuit half-open")
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            xs = sorted(self.latency_ms)
+            return {
+                "state": self.state,
+                "consecutive_failures": self._fails,
+                "opened": self.opened_count,
+                "last_error": self.last_error,
+                "latency_ms_p50": round(xs[len(xs) // 2]) if xs else None,
+                "latency_ms_p90": round(xs[int(len(xs) * 0.9)]) if xs else None,
+            }
+
+
+def _is_failure_status(code: int) -> bool:
+    # 4xx other than 429 is our request's fault, not the backend's health
+    return code >= 500 or code == 429
+
+
+_DONE = object()
+
+
+def _sse_event(line: str, info: dict = None):
+    """One SSE line -> content delta, _DONE at [DONE], or None. A `usage` block goes into `info`."""
+    if not line or not line.startswith("data:"):
+        return None                        # blank separators, comments, event: lines
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return _DONE
+    try:
+        j = json.loads(data)
+    except ValueError:
+        logging.debug(f"Skipping malformed SSE event: {data[:80]}")
+        return None
+    usage = j.get("usage") or (j.get("x_groq") or {}).get("usage")     # last chunk, if the server sends it
+    if usage and info is not None:
+        info["usage"] = usage
+    return (j.get("choices") or [{}])[0].get("delta", {}).get("content") or None
+
+
+def _sse_deltas(lines, info: dict = None) -> Iterator[str]:
+    """Parse `data: {...}` SSE lines into content deltas; stops at [DONE]."""
+    for line in lines:
+        ev = _sse_event(line, info)
+        if ev is _DONE:
+            return
+        if ev:
+            yield ev
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+class Backend:
+    """Common health/latency bookkeeping; subclasses implement the wire protocol."""
+    kind = "base"
+
+    def __init__(self, name: str, priority: int = 0, model: str = "", timeout_s: float = None,
+                 expected_s: float = None, rpm: float = 0, tpm: float = 0):
+        self.name = name
+        self.priority = int(priority)
+        self.model = model or ""                      # forced model name (e.g. a local server's)
+        self.timeout_s = float(timeout_s or getattr(cfg, "LLM_BACKEND_TIMEOUT_S", 20.0))
+        self.expected_s = float(expected_s if expected_s is not None else 1.0 + 0.5 * self.priority)
+        self.ewma_s: Optional[float] = None
+        self.outcomes = deque(maxlen=50)               # 1 = failed call
+        self.breaker = CircuitBreaker(
+            self.probe,
+            fail_threshold=int(getattr(cfg, "LLM_BREAKER_FAILURES", 3)),
+            probe_interval_s=float(getattr(cfg, "LLM_HEALTHCHECK_SECONDS", 10)),
+            slow_s=float(getattr(cfg, "LLM_BREAKER_SLOW_S", 0)),
+        )
+        self.governor = None
+        if RateGovernor is not None:
+            self.governor = RateGovernor(float(rpm or 0), float(tpm or 0),
+                                         reserve=float(getattr(cfg, "LLM_GOVERNOR_RESERVE", 0.25)), name=name)
+        self._lock = threading.Lock()
+
+    # ---- health ----
+    def _record(self, ok: bool, latency_s: float, error: str = ""):
+        self.breaker.record(ok, latency_s, error)
+        with self._lock:
+            self.outcomes.append(0 if ok else 1)
+            if ok:
+                self.ewma_s = latency_s if self.ewma_s is None else 0.7 * self.ewma_s + 0.3 * latency_s
+
+    def error_rate(self) -> float:
+        with self._lock:
+            return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def score(self) -> float:
+        """Expected seconds to an answer; lower is tried first."""
+        lat = self.ewma_s if self.ewma_s is not None else self.expected_s
+        return lat + 5.0 * self.error_rate()
+
+    def stats(self) -> dict:
+        return {"kind": self.kind, "priority": self.priority,
+                "ewma_ms": round(self.ewma_s * 1000) if self.ewma_s is not None else None,
+                "error_rate": round(self.error_rate(), 3), "score": round(self.score(), 3),
+                **self.breaker.stats(),
+                "governor": self.governor.stats() if self.governor else None}
+
+    # ---- rate governor ----
+    @staticmethod
+    def _est_tokens(payload: dict) -> int:
+        """Prompt (~4 chars/token) plus the completion limit: what the call may cost against TPM."""
+        chars = sum(len(str(m.get("content") or "")) for m in payload.get("messages") or [])
+        return chars // 4 + int(payload.get("max_tokens") or 0)
+
+    def _admit(self, payload: dict, timeout_s: float, priority: str):
+        """(estimated tokens, seconds left for the call) once admitted, or None if the wait ran out."""
+        if self.governor is None:
+            return 0, timeout_s
+        est = self._est_tokens(payload)
+        t0 = time.monotonic()
+        if not self.governor.acquire(est, priority, deadline_s=timeout_s):
+            logging.info(f"⏳ LLM backend {self.name}: no {priority} rate budget within {timeout_s:.1f}s")
+            return None
+        return est, timeout_s - (time.monotonic() - t0)
+
+    async def _aadmit(self, payload: dict, timeout_s: float, priority: str):
+        if self.governor is None:
+            return 0, timeout_s
+        est = self._est_tokens(payload)
+        t0 = time.monotonic()
+        if not await self.governor.aacquire(est, priority, deadline_s=timeout_s):
+            logging.info(f"⏳ LLM backend {self.name}: no {priority} rate budget within {timeout_s:.1f}s")
+            return None
+        return est, timeout_s - (time.monotonic() - t0)
+
+    def _observe(self, status: int, headers, est: int, body: dict = None, info: dict = None):
+        """Feed the response to the rate governor and note backend/status/usage in the caller's `info`."""
+        usage = (body or {}).get("usage") or {}
+        if self.governor is not None:
+            self.governor.observe(status, headers, est, usage.get("total_tokens"))
+        if info is not None:
+            info.update(backend=self.name, status=status)
+            if self.model:
+                info["model"] = self.model
+            if usage:
+                info["usage"] = usage
+
+    def _payload(self, payload: dict) -> dict:
+        return {**payload, "model": self.model} if self.model else payload
+
+    # ---- protocol ----
+    def probe(self) -> bool:
+        raise NotImplementedError
+
+    def complete(self, payload: dict, timeout_s: float, priority: str = "interactive",
+                 info: dict = None) -> Optional[str]:
+        raise NotImplementedError
+
+    def stream(self, payload: dict, idle_timeout: float, priority: str = "interactive",
+               info: dict = None) -> Iterator[str]:
+        """Default: one delta with the whole reply (backends without streaming)."""
+        text = self.complete(payload, idle_timeout, priority, info)
+        if text:
+            yield text
+
+    async def acomplete(self, http, payload: dict, timeout_s: float, priority: str = "interactive",
+                        info: dict = None) -> Optional[str]:
+        """Default: the blocking call on a worker thread."""
+        return await asyncio.to_thread(self.complete, payload, timeout_s, priority, info)
+
+    async def astream(self, http, payload: dict, idle_timeout: float,
+                      priority: str = "interactive", info: dict = None) -> AsyncIterator[str]:
+        text = await self.acomplete(http, payload, idle_timeout, priority, info)
+        if text:
+            yield text
+
+
+class OpenAIBackend(Backend):
+    kind = "openai"
+
+    def __init__(self, name: str, base_url: str, api_key: str = "", **kw):
+        super().__init__(name, **kw)
+        self.base_url = (base_url or "").rstrip("/")
+        self.api_key = api_key or ""
+
+    def headers(self) -> dict:
+        h = {"Content-Type": "application/json"}
+        if self.api_key:
+            h["Authorization"] = f"Bearer {self.api_key}"
+        return h
+
+    def probe(self) -> bool:
+        """GET /models: cheap reachability check, no tokens spent."""
+        connect = float(getattr(cfg, "LLM_CONNECT_TIMEOUT", 5.0))
+        r = get_session("llm").get(f"{self.base_url}/models", headers=self.headers(), timeout=(connect, 5))
+        r.close()
+        return r.status_code < 500 and r.status_code != 429
+
+    def complete(self, payload: dict, timeout_s: float, priority: str = "interactive",
+                 info: dict = None) -> Optional[str]:
+        admitted = self._admit(payload, timeout_s, priority)
+        if admitted is None:
+            return None
+        est, timeout_s = admitted
+        connect = float(getattr(cfg, "LLM_CONNECT_TIMEOUT", 5.0))
+        t0 = time.perf_counter()
+        try:
+            r = get_session("llm").post(f"{self.base_url}/chat/completions", headers=self.headers(),
+                                        json=self._payload(payload), timeout=(min(connect, timeout_s), timeout_s))
+            if r.status_code == 200:
+                self._record(True, time.perf_counter() - t0)
+                j = r.json()
+                self._observe(200, r.headers, est, j, info)
+                return j.get("choices", [{}])[0].get("message", {}).get("content", None)
+            self._observe(r.status_code, r.headers, est, info=info)
+            self._record(not _is_failure_status(r.status_code), time.perf_counter() - t0, f"HTTP {r.status_code}")
+            logging.warning(f"⚠️ LLM backend {self.name} error {r.status_code}: {r.text[:300]}")
+        except Exception as e:
+            self._record(False, time.perf_counter() - t0, str(e))
+            logging.warning(f"❌ LLM backend {self.name} call failed: {e}")
+        return None
+
+    def stream(self, payload: dict, idle_timeout: float, priority: str = "interactive",
+               info: dict = None) -> Iterator[str]:
+        admitted = self._admit(payload, idle_timeout, priority)
+        if admitted is None:
+            return
+        est, _ = admitted
+        connect = float(getattr(cfg, "LLM_CONNECT_TIMEOUT", 5.0))
+        t0 = time.perf_counter()
+        first = None
+        try:
+            r = get_session("llm").post(f"{self.base_url}/chat/completions", headers=self.headers(),
+                                        json={**self._payload(payload), "stream": True},
+                                        timeout=(connect, idle_timeout), stream=True)
+        except Exception as e:
+            self._record(False, time.perf_counter() - t0, str(e))
+            logging.warning(f"❌ Exception opening LLM stream on {self.name}: {e}")
+            return
+        try:
+            self._observe(r.status_code, r.headers, est, info=info)
+            if r.status_code != 200:
+                self._record(not _is_failure_status(r.status_code), time.perf_counter() - t0, f"HTTP {r.status_code}")
+                logging.warning(f"⚠️ LLM stream error {r.status_code} on {self.name}: {r.text[:300]}")
+                return
+            for delta in _sse_deltas(r.iter_lines(decode_unicode=True), info):
+                if first is None:
+                    first = time.perf_counter() - t0
+                    self._record(True, first)          # health = time to first token
+                    logging.info(f"LLM first token from {self.name} after {first * 1000:.0f} ms")
+                yield delta
+        except Exception as e:
+            if first is None:
+                self._record(False, time.perf_counter() - t0, str(e))
+            logging.warning(f"❌ LLM stream from {self.name} broke off: {e}")
+        finally:
+            r.close()
+
+
+    async def acomplete(self, http, payload: dict, timeout_s: float, priority: str = "interactive",
+                        info: dict = None) -> Optional[str]:
+        if http is None:
+            return await super().acomplete(http, payload, timeout_s, priority, info)
+        admitted = await self._aadmit(payload, timeout_s, priority)
+        if admitted is None:
+            return None
+        est, timeout_s = admitted
+        connect = float(getattr(cfg, "LLM_CONNECT_TIMEOUT", 5.0))
+        t0 = time.perf_counter()
+        try:
+            async with http.post(f"{self.base_url}/chat/completions", headers=self.headers(),
+                                 json=self._payload(payload),
+                                 timeout=aiohttp.ClientTimeout(total=timeout_s, sock_connect=connect)) as r:
+                if r.status == 200:
+                    j = await r.json(content_type=None)
+                    self._record(True, time.perf_counter() - t0)
+                    self._observe(200, r.headers, est, j, info)
+                    return j.get("choices", [{}])[0].get("message", {}).get("content", None)
+                self._observe(r.status, r.headers, est, info=info)
+                body = await r.text()
+                self._record(not _is_failure_status(r.status), time.perf_counter() - t0, f"HTTP {r.status}")
+                logging.warning(f"⚠️ LLM backend {self.name} error {r.status}: {body[:300]}")
+        except Exception as e:
+            self._record(False, time.perf_counter() - t0, str(e) or type(e).__name__)
+            logging.warning(f"❌ LLM backend {self.name} call failed: {e!r}")
+        return None
+
+    async def astream(self, http, payload: dict, idle_timeout: float,
+                      priority: str = "interactive", info: dict = None) -> AsyncIterator[str]:
+        if http is None:
+            async for delta in super().astream(http, payload, idle_timeout, priority, info):
+                yield delta
+            return
+        admitted = await self._aadmit(payload, idle_timeout, priority)
+        if admitted is None:
+            return
+        est, _ = admitted
+        connect = float(getattr(cfg, "LLM_CONNECT_TIMEOUT", 5.0))
+        t0 = time.perf_counter()
+        first = None
+        try:
+            async with http.post(f"{self.base_url}/chat/completions", headers=self.headers(),
+                                 json={**self._payload(payload), "stream": True},
+                                 timeout=aiohttp.ClientTimeout(total=None, sock_connect=connect,
+                                                               sock_read=idle_timeout)) as r:
+                self._observe(r.status, r.headers, est, info=info)
+                if r.status != 200:
+                    body = await r.text()
+                    self._record(not _is_failure_status(r.status), time.perf_counter() - t0, f"HTTP {r.status}")
+                    logging.warning(f"⚠️ LLM stream error {r.status} on {self.name}: {body[:300]}")
+                    return
+                async for raw in r.content:
+                    ev = _sse_event(raw.decode("utf-8", "replace").strip(), info)
+                    if ev is _DONE:
+                        return
+                    if not ev:
+                        continue
+                    if first is None:
+                        first = time.perf_counter() - t0
+                        self._record(True, first)
+                        logging.info(f"LLM first token from {self.name} after {first * 1000:.0f} ms")
+                    yield ev
+        except Exception as e:
+            if first is None:
+                self._record(False, time.perf_counter() - t0, str(e) or type(e).__name__)
+            logging.warning(f"❌ LLM stream from {self.name} broke off: {e!r}")
+
+
+class GradioBackend(Backend):
+    kind = "gradio"
+
+    def __init__(self, name: str, url: str, token: str = "", route: str = "/run/predict",
+                 inputs: str = "system_user", **kw):
+        super().__init__(name, **kw)
+        self.url = (url or "").rstrip("/")
+        self.token = token or ""
+        self.route = route if route.startswith("/") else f"/{route}"
+        self.inputs = inputs
+
+    def headers(self) -> dict:
+        h = {"Content-Type": "application/json"}
+        if self.token:
+            h["Authorization"] = f"Bearer {self.token}"
+        return h
+
+    def _inputs(self, payload: dict) -> list:
+        msgs = payload.get("messages") or []
+        system = next((m["content"] for m in msgs if m.get("role") == "system"), "")
+        user = next((m["content"] for m in reversed(msgs) if m.get("role") == "user"), "")
+        return [system, user] if self.inputs == "system_user" else [user]
+
+    def probe(self) -> bool:
+        r = get_session("llm").get(f"{self.url}/config", headers=self.headers(), timeout=(5, 10))
+        r.close()
+        return r.status_code == 200
+
+    def complete(self, payload: dict, timeout_s: float, priority: str = "interactive",
+                 info: dict = None) -> Optional[str]:
+        admitted = self._admit(payload, timeout_s, priority)
+        if admitted is None:
+            return None
+        est, timeout_s = admitted
+        t0 = time.perf_counter()
+        try:
+            r = get_session("llm").post(f"{self.url}{self.route}", headers=self.headers(),
+                                        json={"data": self._inputs(payload)}, timeout=(5, timeout_s))
+            self._observe(r.status_code, r.headers, est, info=info)
+            if r.status_code == 200:
+                out = (r.json().get("data") or [None])[0]
+                ok = isinstance(out, str) and bool(out.strip())
+                self._record(ok, time.perf_counter() - t0, "" if ok else "empty reply")
+                return out if ok else None
+            self._record(not _is_failure_status(r.status_code), time.perf_counter() - t0, f"HTTP {r.status_code}")
+            logging.warning(f"⚠️ LLM backend {self.name} error {r.status_code}: {r.text[:300]}")
+        except Exception as e:
+            self._record(False, time.perf_counter() - t0, str(e))
+            logging.warning(f"❌ LLM backend {self.name} call failed: {e}")
+        return None
+
+
+    async def acomplete(self, http, payload: dict, timeout_s: float, priority: str = "interactive",
+                        info: dict = None) -> Optional[str]:
+        if http is None:
+            return await super().acomplete(http, payload, timeout_s, priority, info)
+        admitted = await self._aadmit(payload, timeout_s, priority)
+        if admitted is None:
+            return None
+        est, timeout_s = admitted
+        t0 = time.perf_counter()
+        try:
+            async with http.post(f"{self.url}{self.route}", headers=self.headers(),
+                                 json={"data": self._inputs(payload)},
+                                 timeout=aiohttp.ClientTimeout(total=timeout_s, sock_connect=5)) as r:
+                self._observe(r.status, r.headers, est, info=info)
+                if r.status == 200:
+                    out = ((await r.json(content_type=None)).get("data") or [None])[0]
+                    ok = isinstance(out, str) and bool(out.strip())
+                    self._record(ok, time.perf_counter() - t0, "" if ok else "empty reply")
+                    return out if ok else None
+                body = await r.text()
+                self._record(not _is_failure_status(r.status), time.perf_counter() - t0, f"HTTP {r.status}")
+                logging.warning(f"⚠️ LLM backend {self.name} error {r.status}: {body[:300]}")
+        except Exception as e:
+            self._record(False, time.perf_counter() - t0, str(e) or type(e).__name__)
+            logging.warning(f"❌ LLM backend {self.name} call failed: {e!r}")
+        return None
+
+
+_KINDS = {"openai": OpenAIBackend, "groq": OpenAIBackend, "gradio": GradioBackend, "space": GradioBackend}
+
+
+# ----------------------------
+# Pool
+# ----------------------------
+class BackendPool:
+    def __init__(self, backends: List[Backend]):
+        self.backends = list(backends)
+        self.failovers = 0
+        self.retries = 0
+
+    def primary(self) -> Optional[Backend]:
+        return self.backends[0] if self.backends else None
+
+    def available(self) -> bool:
+        return any(b.breaker.allow() for b in self.backends)
+
+    def ordered(self) -> List[Backend]:
+        """Closed/half-open backends, best score first (ties: config order)."""
+        ok = [b for b in self.backends if b.breaker.allow()]
+        return sorted(ok, key=lambda b: (b.score(), b.priority))
+
+    def _attempts(self, deadline_s: float, retries: int = None):
+        """
+        Yield (backend, seconds_left) for each attempt: every healthy backend
+        in order, then — after a backoff, yielded as (None, delay) — up to
+        `retries` more rounds while the deadline allows.
+        """
+        t_end = time.monotonic() + float(deadline_s)
+        retries = int(getattr(cfg, "LLM_RETRIES", 1) if retries is None else retries)
+        for rnd in range(retries + 1):
+            backends = self.ordered()
+            if not backends:
+                logging.info("⛔ All LLM backends unavailable; skipping call")
+                return
+            if rnd:
+                delay = min(4.0, 0.5 * 2 ** (rnd - 1))
+                if t_end - time.monotonic() < delay + 0.5:
+                    return
+                self.retries += 1
+                yield None, delay
+            tried = 0
+            for b in backends:
+                left = t_end - time.monotonic()
+                if left <= 0.05:
+                    return
+                if not b.breaker.begin():
+                    continue                       # half-open and its trial call is already out
+                if tried:
+                    self.failovers += 1
+                    logging.info(f"↪️ LLM failover to {b.name} ({left:.1f}s left)")
+                tried += 1
+                yield b, left
+
+    def complete(self, payload: dict, deadline_s: float, retries: int = None,
+                 priority: str = "interactive", info: dict = None) -> Optional[str]:
+        for b, left in self._attempts(deadline_s, retries):
+            if b is None:
+                time.sleep(left)
+                continue
+            text = b.complete(payload, min(b.timeout_s, left), priority, info)
+            if text:
+                return text
+        return None
+
+    def stream(self, payload: dict, idle_timeout: float, deadline_s: float = None,
+               retries: int = None, priority: str = "interactive", info: dict = None) -> Iterator[str]:
+        """Stream from the best backend; fail over / retry only while nothing has been yielded."""
+        deadline_s = deadline_s or getattr(cfg, "LLM_READ_TIMEOUT", 180.0)
+        for b, left in self._attempts(deadline_s, retries):
+            if b is None:
+                time.sleep(left)
+                continue
+            got = False
+            gen = b.stream(payload, min(idle_timeout, left), priority, info)
+            try:
+                for delta in gen:
+                    got = True
+                    yield delta
+            finally:
+                gen.close()
+            if got:
+                return
+
+    # ---- asyncio (http: the caller loop's aiohttp session, or None) ----
+    async def acomplete(self, http, payload: dict, deadline_s: float, retries: int = None,
+                        priority: str = "interactive", info: dict = None) -> Optional[str]:
+        for b, left in self._attempts(deadline_s, retries):
+            if b is None:
+                await asyncio.sleep(left)
+                continue
+            text = await b.acomplete(http, payload, min(b.timeout_s, left), priority, info)
+            if text:
+                return text
+        return None
+
+    async def astream(self, http, payload: dict, idle_timeout: float, deadline_s: float = None,
+                      retries: int = None, priority: str = "interactive",
+                      info: dict = None) -> AsyncIterator[str]:
+        deadline_s = deadline_s or getattr(cfg, "LLM_READ_TIMEOUT", 180.0)
+        for b, left in self._attempts(deadline_s, retries):
+            if b is None:
+                await asyncio.sleep(left)
+                continue
+            got = False
+            gen = b.astream(http, payload, min(idle_timeout, left), priority, info)
+            try:
+                async for delta in gen:
+                    got = True
+                    yield delta
+            finally:
+                await gen.aclose()
+            if got:
+                return
+
+    def stats(self) -> dict:
+        return {"failovers": self.failovers, "retries": self.retries, "backends": {b.name: b.stats() for b in self.backends}}
+
+
+# ----------------------------
+# Config
+# ----------------------------
+def _scalar(v: str):
+    v = v.strip()
+    if len(v) >= 2 and v[0] == v[-1] and v[0] in "'\"":
+        return v[1:-1]
+    low = v.lower()
+    if low in ("true", "yes", "on"):
+        return True
+    if low in ("false", "no", "off"):
+        return False
+    for cast in (int, float):
+        try:
+            return cast(v)
+        except ValueError:
+            pass
+    return v
+
+
+def _read_yaml(path: str) -> dict:
+    """PyYAML if installed, else a tiny reader for nested `key: value` mappings (no lists)."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        text = f.read()
+    if yaml is not None:
+        return yaml.safe_load(text) or {}
+    root: dict = {}
+    stack = [(-1, root)]
+    for raw in text.splitlines():
+        line = raw.split(" #", 1)[0].rstrip()
+        if not line.strip() or line.lstrip().startswith("#") or ":" not in line:
+            continue
+        indent = len(line) - len(line.lstrip())
+        key, _, val = line.strip().partition(":")
+        while stack[-1][0] >= indent:
+            stack.pop()
+        parent = stack[-1][1]
+        if val.strip():
+            parent[key.strip()] = _scalar(val)
+        else:
+            parent[key.strip()] = {}
+            stack.append((indent, parent[key.strip()]))
+    return root
+
+
+def _secret(spec: dict, key: str, fallback: str = "") -> str:
+    """`<key>` literal, else the env var named by `<key>_env`, else `fallback` (the cfg value)."""
+    if spec.get(key):
+        return str(spec[key])
+    env = spec.get(f"{key}_env")
+    return (os.getenv(str(env), "").strip() if env else "") or fallback
+
+
+def _default_specs() -> Dict[str, dict]:
+    specs = {"groq": {"kind": "openai", "base_url": getattr(cfg, "LLM_BASE_URL", "") or "https://api.groq.com/openai/v1",
+                      "api_key": cfg.GROQ_API_KEY, "priority": 0}}
+    if getattr(cfg, "SPACE_URL", ""):
+        specs["space"] = {"kind": "gradio", "url": cfg.SPACE_URL, "token": getattr(cfg, "HF_TOKEN", ""), "priority": 1}
+    return specs
+
+
+def load_backends(path: str = None) -> List[Backend]:
+    path = path or getattr(cfg, "LLM_MODELS_PATH", "") or os.path.join(_ROOT, "configs", "models.yaml")
+    specs: Dict[str, dict] = {}
+    try:
+        if os.path.exists(path):
+            specs = (_read_yaml(path) or {}).get("backends") or {}
+    except Exception as e:
+        logging.warning(f"⚠️ Could not read {path}: {e}")
+    if not specs:
+        specs = _default_specs()
+
+    route = [n.strip() for n in (getattr(cfg, "LLM_ROUTE", "") or "").split(",") if n.strip()]
+    names = route or [n for n, s in specs.items() if isinstance(s, dict) and s.get("enabled", True)]
+    backends: List[Backend] = []
+    for i, name in enumerate(names):
+        spec = specs.get(name)
+        if not isinstance(spec, dict):
+            logging.warning(f"⚠️ LLM_ROUTE names unknown backend '{name}'")
+            continue
+        kind = str(spec.get("kind") or "openai").lower()
+        cls = _KINDS.get(kind)
+        if cls is None:
+            logging.warning(f"⚠️ Unknown LLM backend kind '{kind}' for '{name}'")
+            continue
+        common = {"priority": spec.get("priority", i), "model": spec.get("model", ""),
+                  "timeout_s": spec.get("timeout_s"), "expected_s": spec.get("expected_s"),
+                  "rpm": spec.get("rpm", 0), "tpm": spec.get("tpm", 0)}
+        if cls is OpenAIBackend:
+            base = _secret(spec, "base_url", getattr(cfg, "LLM_BASE_URL", ""))
+            key = _secret(spec, "api_key", cfg.GROQ_API_KEY if name == "groq" else "")
+            b = OpenAIBackend(name, base, api_key=key, **common)
+        else:
+            url = _secret(spec, "url", getattr(cfg, "SPACE_URL", ""))
+            token = _secret(spec, "token", getattr(cfg, "HF_TOKEN", ""))
+            if not url:
+                logging.info(f"LLM backend '{name}' has no URL; skipped")
+                continue
+            b = GradioBackend(name, url, token=token, route=str(spec.get("route", "/run/predict")),
+                              inputs=str(spec.get("inputs", "system_user")), **common)
+        backends.append(b)
+    if not backends:
+        spec = _default_specs()["groq"]
+        backends.append(OpenAIBackend("groq", spec["base_url"], api_key=spec["api_key"]))
+    logging.info("LLM backends: " + ", ".join(f"{b.name}({b.kind})" for b in backends))
+    return backends
+
+
+_pool: Optional[BackendPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> BackendPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BackendPool(load_backends())
+        return _pool
+
+
+def set_pool(pool: BackendPool):
+    """Swap the pool (tests, or after editing configs/models.yaml)."""
+    global _pool
+    with _pool_lock:
+        _pool = pool
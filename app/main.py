@@ -2,6 +2,7 @@
 import os
 import sys
 import time
+import random
 import logging
 import threading
 from enum import Enum, auto
@@ -13,11 +14,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from config import cfg
 from audio import record_until_silence, transcribe
 from hotword import init_hotword
-from tts import speak, is_speaking
+from tts import speak, is_speaking, prewarm_cache
 from logging_utils import log_turn, save_context, load_context, should_sleep
 from listener_interrupt import start_interrupt_listener
 from shared_state import mic_enabled, mic_stream
 from orchestrator.turn import handle_turn
+from llm import prewarm_llm_connection
 
 # -----------------------------
 # Minimal state machine
@@ -34,6 +36,11 @@ stop_tts_now = threading.Event()
 current_state: State | None = None
 last_state_change = 0.0
 
+_last_filler = 0.0
+
+NO_REPLY_LINE = "Sorry, I couldn't get a response."
+LOOP_ERROR_LINE = "Sorry, something went wrong. I'll keep listening."
+
 def _startup_beep():
     try:
         import platform
@@ -96,14 +103,45 @@ def _startup_banner():
     alias_count = init_hotword()
     print(f"\x1b[2mLoaded {alias_count} hotword aliases for '{cfg.HOTWORD}'.\x1b[0m")
 
-def _say(text: str):
+def _speak_filler():
+    """Called when the LLM misses FILLER_LATENCY_GATE_S: say a short holding line (rate-limited)."""
+    global _last_filler
+    now = time.time()
+    if now - _last_filler < float(getattr(cfg, "FILLER_COOLDOWN_S", 30)):
+        return
+    from intent import processing_lines
+    lines = processing_lines()
+    if not lines:
+        return
+    _last_filler = now
+    line = random.choice(lines)
+    print(f"\x1b[2m{cfg.HOTWORD.title()}: {line}\x1b[0m")
+    speak(line, stop_flag=stop_tts_now)
+
+def _speak_streaming(deltas) -> str:
+    """handle_turn(on_stream=...): speak the reply while the LLM is still writing it."""
+    from streaming import speak_while_generating
+    # let a filler line finish instead of cutting it off mid-word
+    deadline = time.time() + 2.5
+    while is_speaking() and time.time() < deadline:
+        time.sleep(0.05)
     stop_tts_now.clear()
+    set_state(State.SPEAKING)
+    return speak_while_generating(deltas, stop_flag=stop_tts_now)
+
+def _say(text: str, already_spoken: bool = False):
+    # let a filler line finish instead of cutting it off mid-word
+    deadline = time.time() + 2.5
+    while not already_spoken and is_speaking() and time.time() < deadline:
+        time.sleep(0.05)
     msg = (text or "").strip()
     print(f"\x1b[36m{cfg.HOTWORD.title()}:\x1b[0m {msg}")
     log_turn("assistant", msg)
 
     set_state(State.SPEAKING)
-    speak(msg, stop_flag=stop_tts_now)
+    if not already_spoken:
+        stop_tts_now.clear()
+        speak(msg, stop_flag=stop_tts_now)
 
     time.sleep(0.4)
     while is_speaking():
@@ -132,7 +170,21 @@ def main():
         else:
             print("\x1b[31m\u274c Mic stream not available. Degraded mode.\x1b[0m")
 
+        # Open the LLM connection (DNS + TCP + TLS) while we wait for the first utterance
+        prewarm_llm_connection()
+
+        if getattr(cfg, "TTS_PREWARM", False):
+            from intent import canned_replies
+            prewarm_cache(canned_replies() + [NO_REPLY_LINE, LOOP_ERROR_LINE])
+
         start_interrupt_listener(stop_tts_now)
+
+        # Announce due reminders from the pre-rendered clips (and prepare upcoming ones)
+        if cfg.FIRESTORE_ENABLED:
+            from firebase_db import get_reminders
+            from reminder_audio import ReminderScheduler
+            ReminderScheduler(get_reminders, stop_tts_now,
+                              busy=lambda: is_speaking() or current_state == State.PROCESSING).start()
         history = load_context()
         set_state(State.LISTENING)
 
@@ -172,12 +224,14 @@ def main():
                     print(f"\x1b[35m\ud83d\udecc Going to sleep. Say '{cfg.HOTWORD}' to wake me.\x1b[0m")
                     continue
 
-                result = handle_turn(user_text, history)
+                on_stream = _speak_streaming if getattr(cfg, "SPEAK_STREAMING", False) else None
+                result = handle_turn(user_text, history, on_filler=_speak_filler, on_stream=on_stream)
                 reply_text = getattr(result, "reply", None) or (result if isinstance(result, str) else "")
+                spoken = bool(getattr(result, "spoken", False)) and bool(reply_text)
                 if not reply_text:
-                    reply_text = "Sorry, I couldn't get a response."
+                    reply_text = NO_REPLY_LINE
 
-                _say(reply_text)
+                _say(reply_text, already_spoken=spoken)
 
                 history.append({"role": "user", "content": user_text})
                 history.append({"role": "assistant", "content": reply_text})
@@ -196,7 +250,7 @@ def main():
                 print(f"\x1b[31m\u274c Unexpected error ({consecutive_errors}): {e}\x1b[0m")
 
                 if consecutive_errors < 5:
-                    _say("Sorry, something went wrong. I'll keep listening.")
+                    _say(LOOP_ERROR_LINE)
                 if consecutive_errors >= 5 or (time.time() - last_success > 300):
                     print("\x1b[31m\u26a0\ufe0f Too many errors or timeout; continuing...\x1b[0m")
                     consecutive_errors = 0
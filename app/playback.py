@@ -0,0 +1,256 @@
+# app/playback.py
+"""
+Low-latency, cancellable playback engine.
+
+One persistent sounddevice OutputStream runs for the life of the process.
+Its callback pulls int16 PCM from a queue of utterances and writes it into
+the device buffer block by block, so:
+  - stop() takes effect on the next callback (≤ one block, ~20 ms)
+  - no thread or process is spawned per utterance
+  - decoded clips are kept in a small in-memory cache and reused
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque, OrderedDict
+from typing import Deque, Optional
+
+import numpy as np
+
+from config import cfg
+
+ENGINE_RATE = 24000          # edge_tts native rate; everything is resampled to this
+BLOCK_SIZE = 480             # 20 ms at 24 kHz
+_SCALE = np.float32(1.0 / 32768.0)
+
+
+class PlaybackHandle:
+    """Returned by play(); wait() blocks until the clip finished or was stopped."""
+
+    def __init__(self, pcm: np.ndarray):
+        self.pcm = pcm
+        self.pos = 0
+        self.done = threading.Event()
+        self.stopped = False
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+
+    def wait(self, timeout: float = None, should_stop=None, engine=None) -> bool:
+        """Wait for completion; if `should_stop()` turns true, stop the engine. Returns True if played fully."""
+        deadline = time.monotonic() + timeout if timeout else None
+        while not self.done.wait(0.01):
+            if should_stop is not None and should_stop() and engine is not None:
+                engine.stop()
+                self.done.wait(0.5)
+                break
+            if deadline and time.monotonic() > deadline:
+                break
+        return self.done.is_set() and not self.stopped
+
+
+def _resample(pcm: np.ndarray, src_rate: int, dst_rate: int = ENGINE_RATE) -> np.ndarray:
+    if src_rate == dst_rate or not len(pcm):
+        return pcm
+    n = int(round(len(pcm) * dst_rate / src_rate))
+    x = np.linspace(0, len(pcm) - 1, n, dtype=np.float64)
+    return np.interp(x, np.arange(len(pcm)), pcm.astype(np.float32)).astype(np.int16)
+
+
+def decode_file(path: str, sample_rate: int = ENGINE_RATE) -> np.ndarray:
+    """Decode an audio file to mono int16 at `sample_rate` (miniaudio, else ffmpeg)."""
+    try:
+        import miniaudio
+        snd = miniaudio.decode_file(path, output_format=miniaudio.SampleFormat.SIGNED16,
+                                    nchannels=1, sample_rate=sample_rate)
+        return np.frombuffer(snd.samples, dtype=np.int16).copy()
+    except ImportError:
+        pass
+    import shutil, subprocess
+    exe = shutil.which("ffmpeg")
+    if not exe:
+        raise RuntimeError("no audio decoder available (install miniaudio or ffmpeg)")
+    out = subprocess.run(
+        [exe, "-loglevel", "quiet", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+        stdout=subprocess.PIPE, check=True,
+    ).stdout
+    return np.frombuffer(out, dtype=np.int16).copy()
+
+
+class PlaybackEngine:
+    def __init__(self, sample_rate: int = ENGINE_RATE, blocksize: int = BLOCK_SIZE, device=None,
+                 decode_cache_items: int = 32):
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.device = device
+        self._queue: Deque[PlaybackHandle] = deque()
+        self._lock = threading.Lock()
+        self._stream = None
+        self._stop_req: Optional[float] = None
+        self._last_sample_at: Optional[float] = None
+        self._silent_frames = 0           # silence emitted since the last clip ended
+
+        self._decoded: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._decode_cache_items = decode_cache_items
+        self._decoded_lock = threading.Lock()   # not self._lock: the audio callback must never wait on a decode
+
+        self.stop_latency_ms: Deque[float] = deque(maxlen=100)
+        self.gap_ms: Deque[float] = deque(maxlen=100)
+
+    # ----------------------------
+    # Stream lifecycle
+    # ----------------------------
+    def start(self):
+        if self._stream is not None:
+            return
+        import sounddevice as sd
+        self._stream = sd.OutputStream(
+            samplerate=self.sample_rate, channels=1, dtype="float32",
+            blocksize=self.blocksize, latency="low", device=self.device,
+            callback=self._callback,
+        )
+        self._stream.start()
+        print(f"🔈 Playback engine ready ({self.sample_rate} Hz, {self.blocksize}-frame blocks)")
+
+    def close(self):
+        self.stop()
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            except Exception as e:
+                logging.debug(f"Playback stream close failed: {e}")
+            self._stream = None
+
+    # ----------------------------
+    # Audio callback (PortAudio thread)
+    # ----------------------------
+    def _callback(self, outdata, frames, time_info, status):
+        if status:
+            logging.debug(f"Playback status: {status}")
+        out = outdata[:, 0]
+        now = time.perf_counter()
+        with self._lock:
+            if self._stop_req is not None:
+                self.stop_latency_ms.append((now - self._stop_req) * 1000)
+                self._stop_req = None
+                self._silent_frames = 0
+                while self._queue:
+                    h = self._queue.popleft()
+                    h.stopped = True
+                    h.ended_at = now
+                    h.done.set()
+                self._last_sample_at = None
+
+            filled = 0
+            while filled < frames and self._queue:
+                h = self._queue[0]
+                if h.started_at is None:
+                    h.started_at = now
+                    if self._last_sample_at is not None:
+                        self.gap_ms.append(self._silent_frames * 1000 / self.sample_rate)
+                    self._silent_frames = 0
+                n = min(frames - filled, len(h.pcm) - h.pos)
+                np.multiply(h.pcm[h.pos:h.pos + n], _SCALE, out=out[filled:filled + n], casting="unsafe")
+                h.pos += n
+                filled += n
+                if h.pos >= len(h.pcm):
+                    self._queue.popleft()
+                    h.ended_at = now
+                    self._last_sample_at = now
+                    h.done.set()
+            if filled < frames:
+                out[filled:] = 0.0
+                if self._last_sample_at is not None:
+                    self._silent_frames += frames - filled
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def play(self, pcm: np.ndarray, sample_rate: int = ENGINE_RATE) -> PlaybackHandle:
+        """Queue int16 mono PCM for playback; returns immediately."""
+        self.start()
+        h = PlaybackHandle(_resample(np.asarray(pcm, dtype=np.int16).reshape(-1), sample_rate, self.sample_rate))
+        if not len(h.pcm):
+            h.done.set()
+            return h
+        with self._lock:
+            self._queue.append(h)
+        return h
+
+    def play_file(self, path: str) -> PlaybackHandle:
+        return self.play(self._decode_cached(path), self.sample_rate)
+
+    def stop(self):
+        """Drop the current and queued clips; effective within one audio block."""
+        with self._lock:
+            if not self._queue:
+                return
+            self._stop_req = time.perf_counter()
+
+    def busy(self) -> bool:
+        with self._lock:
+            return bool(self._queue)
+
+    def stats(self) -> dict:
+        def _p50(xs):
+            xs = sorted(xs)
+            return round(xs[len(xs) // 2], 1) if xs else None
+        return {
+            "stop_latency_ms_p50": _p50(self.stop_latency_ms),
+            "gap_ms_p50": _p50(self.gap_ms),
+            "stops": len(self.stop_latency_ms),
+        }
+
+    def _decode_cached(self, path: str) -> np.ndarray:
+        try:
+            key = (os.path.abspath(path), os.path.getmtime(path))
+        except OSError:
+            key = None
+        if key is not None:
+            with self._decoded_lock:
+                pcm = self._decoded.get(key)
+                if pcm is not None:
+                    self._decoded.move_to_end(key)
+                    return pcm
+        pcm = decode_file(path, self.sample_rate)      # outside the lock; a concurrent miss may decode twice
+        if key is not None:
+            with self._decoded_lock:
+                self._decoded[key] = pcm
+                while len(self._decoded) > self._decode_cache_items:
+                    self._decoded.popitem(last=False)
+        return pcm
+
+
+class EngineSink:
+    """tts_stream sink that feeds the shared engine instead of opening a stream."""
+
+    def __init__(self, engine: PlaybackEngine, sample_rate: int, stop_flag: threading.Event = None):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.stop_flag = stop_flag
+        self._last: Optional[PlaybackHandle] = None
+
+    def write(self, pcm: np.ndarray):
+        self._last = self.engine.play(pcm, self.sample_rate)
+
+    def abort(self):
+        self.engine.stop()
+
+    def close(self):
+        if self._last is not None:
+            should_stop = self.stop_flag.is_set if self.stop_flag else None
+            self._last.wait(timeout=120, should_stop=should_stop, engine=self.engine)
+
+
+_engine: Optional[PlaybackEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> PlaybackEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            device = str(getattr(cfg, "PLAYBACK_DEVICE", "") or "").strip()
+            _engine = PlaybackEngine(device=(int(device) if device.isdigit() else device) or None)
+        return _engine
@@ -0,0 +1,189 @@
+# app/reminder_audio.py
+"""
+Pre-rendered reminder announcements.
+
+When a reminder is stored we synthesize its announcement in the background
+and keep it in the TTS cache under the reminder's id, so when it fires the
+clip plays without synthesis latency. Deleting the reminder (or storing it
+with different text/time, which gives a new id) drops the old audio.
+Prepared clips are pinned in the cache until the reminder fires, so normal
+replies and pre-warm cannot evict them first.
+
+ReminderScheduler polls the stored reminders, prepares upcoming ones
+(including those created in an earlier run) and announces due ones.
+"""
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from config import cfg
+from text_utils import tts_sanitize
+
+
+def reminder_id(text: str, when_iso: str) -> str:
+    """Stable id for a reminder record (Firestore stores no id of its own)."""
+    raw = f"{(text or '').strip().lower()}\x1f{(when_iso or '').strip()}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _key(rid: str) -> str:
+    return f"reminder-{rid}"
+
+
+def announcement_text(text: str) -> str:
+    return tts_sanitize(f"Reminder: {(text or '').strip().rstrip('.')}.")
+
+
+def prepare_reminder(text: str, when_iso: str) -> Optional[Future]:
+    """
+    Queue background synthesis of the announcement for this reminder.
+    Never raises; returns the render Future (or None if nothing was queued).
+    """
+    try:
+        from tts import get_synthesizer
+        from tts_cache import get_cache
+        cache = get_cache()
+        if cache is None or not (text or "").strip():
+            return None
+        key = _key(reminder_id(text, when_iso))
+        cache.pin(key)
+        if cache.get(key):
+            return None
+        fut = get_synthesizer("edge").render_async(announcement_text(text), key=key)
+        fut.add_done_callback(lambda f: f.exception() and logging.warning(
+            f"Reminder pre-render failed for {text[:40]!r}: {f.exception()}"))
+        return fut
+    except Exception as e:
+        logging.warning(f"Reminder pre-render not queued: {e}")
+        return None
+
+
+def forget_reminder(text: str, when_iso: str):
+    """Drop the prepared audio for a reminder that was deleted or changed."""
+    try:
+        from tts_cache import get_cache
+        cache = get_cache()
+        if cache is not None:
+            cache.invalidate(_key(reminder_id(text, when_iso)))
+    except Exception as e:
+        logging.debug(f"Reminder audio invalidate failed: {e}")
+
+
+def announce_reminder(reminder: dict, stop_flag=None):
+    """
+    Speak a fired reminder ({'message', 'time'} as stored by firebase_db).
+    Plays the pre-rendered clip if we have one, otherwise synthesizes live.
+    """
+    from tts import speak
+    from tts_cache import get_cache
+
+    text = reminder.get("message") or reminder.get("text") or ""
+    when = reminder.get("time") or reminder.get("when_iso") or ""
+    cache = get_cache()
+    key = _key(reminder_id(text, when))
+    path = cache.get(key) if cache else None
+    if path:
+        print("⚡ Reminder audio ready")
+    # speak() only queues: keep the clip pinned until playback is over
+    speak(announcement_text(text), stop_flag, audio_path=path,
+          on_done=(lambda: cache.unpin(key)) if cache is not None else None)
+
+
+def _release(text: str, when_iso: str):
+    """Unpin the prepared clip of a reminder that will never be announced."""
+    try:
+        from tts_cache import get_cache
+        cache = get_cache()
+        if cache is not None:
+            cache.unpin(_key(reminder_id(text, when_iso)))
+    except Exception as e:
+        logging.debug(f"Reminder audio unpin failed: {e}")
+
+
+# ----------------------------
+# Scheduler
+# ----------------------------
+def reminder_time(reminder: dict) -> Optional[datetime]:
+    raw = (reminder.get("time") or reminder.get("when_iso") or "").strip()
+    try:
+        return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _age_s(when: datetime, now: datetime = None) -> float:
+    """Seconds since `when` (negative = still ahead). Naive times are local."""
+    if when.tzinfo is None:
+        return ((now or datetime.now()).replace(tzinfo=None) - when).total_seconds()
+    ref = now if now is not None and now.tzinfo else datetime.now(timezone.utc)
+    return (ref - when).total_seconds()
+
+
+class ReminderScheduler:
+    """
+    Poll `get_reminders()` every REMINDER_POLL_S seconds; announce each due
+    reminder once (deferred while `busy()` is true) and pre-render the
+    upcoming ones. Reminders overdue by more than REMINDER_GRACE_S when
+    first seen (missed while the assistant was off) are skipped.
+    """
+
+    def __init__(self, get_reminders: Callable[[], list], stop_flag=None,
+                 busy: Callable[[], bool] = None, poll_s: float = None, grace_s: float = None):
+        self.get_reminders = get_reminders
+        self.stop_flag = stop_flag
+        self.busy = busy or (lambda: False)
+        self.poll_s = float(poll_s if poll_s is not None else getattr(cfg, "REMINDER_POLL_S", 15))
+        self.grace_s = float(grace_s if grace_s is not None else getattr(cfg, "REMINDER_GRACE_S", 600))
+        self._fired: set = set()
+        self._prepared: set = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ReminderScheduler":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ReminderScheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logging.warning(f"Reminder poll failed: {e}")
+            self._stop.wait(self.poll_s)
+
+    def poll_once(self, now: datetime = None) -> List[dict]:
+        """One pass; returns the reminders announced."""
+        fired = []
+        for r in self.get_reminders() or []:
+            when = reminder_time(r)
+            if when is None or r.get("done"):
+                continue
+            text = r.get("message") or r.get("text") or ""
+            rid = reminder_id(text, r.get("time") or r.get("when_iso") or "")
+            if rid in self._fired:
+                continue
+            age = _age_s(when, now)
+            if age < 0:
+                if rid not in self._prepared:
+                    self._prepared.add(rid)
+                    prepare_reminder(text, r.get("time") or r.get("when_iso") or "")
+                continue
+            if age > self.grace_s:
+                self._fired.add(rid)            # missed long ago; don't announce it now
+                _release(text, r.get("time") or r.get("when_iso") or "")
+                continue
+            if self.busy():
+                break                           # mid-conversation: try again next poll
+            self._fired.add(rid)
+            announce_reminder(r, self.stop_flag)
+            fired.append(r)
+        return fired
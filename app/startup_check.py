@@ -73,13 +73,23 @@ def _check_firestore_if_enabled():
         print(f"❌ Firestore: Connection failed - {e}\n")
 
 
+def _check_streaming_tts():
+    if not getattr(cfg, "TTS_STREAMING", False):
+        return
+    import shutil
+    if shutil.which("ffmpeg"):
+        print("🔊 Streaming TTS: ✅ ffmpeg found.\n")
+    else:
+        print("⚠️ Streaming TTS: ffmpeg not on PATH; replies will use clip playback.\n")
+
+
 def run_all_checks():
     """
     Lightweight startup checks:
     - NO TTS playback
     - NO microphone recording
     - NO audio device resets
-    - Just hotword + optional Firestore + device listing
+    - Just hotword + optional Firestore + device listing + ffmpeg (TTS_STREAMING)
     """
     if not getattr(cfg, "STARTUP_CHECKS", False):
         # Completely skip when disabled
@@ -96,6 +106,9 @@ def run_all_checks():
     # Optional Firestore
     _check_firestore_if_enabled()
 
+    # Streaming TTS decoder (ffmpeg)
+    _check_streaming_tts()
+
     print("✅ All checks complete.\n")
 
 
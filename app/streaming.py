@@ -1,18 +1,64 @@
+# app/streaming.py
+"""
+Speak an LLM reply while it is still being generated.
+
+    from llm import stream_llm
+    reply = speak_while_generating(stream_llm(user_text), stop_flag=stop_flag)
+
+    # stop at the first sentence end past the reply budget
+    from thinker.budget import reply_budget
+    b = reply_budget(user_text, affect)
+    reply = speak_while_generating(b.clip_stream(stream_llm(user_text, max_tokens=b.max_tokens)))
+
+Tokens go into a tts.SpeechStream, which sanitizes them incrementally and
+starts synthesizing at the first clause boundary, so time-to-first-audio is
+roughly first-clause latency + one synthesis instead of whole-reply latency.
+"""
 import time
+import logging
+import threading
+from typing import Iterable, Optional
+
+
+def speak_while_generating(llm_iter: Iterable[str], token=None,
+                           stop_flag: threading.Event = None,
+                           first_clause_chars: int = 40) -> str:
+    """
+    Consume `llm_iter` (text deltas), speaking as it goes. Stops early when
+    `token` (concurrency.CancellationToken) is cancelled or `stop_flag` is
+    set. Returns the text received so far (the full reply if not cancelled).
+    """
+    from tts import SpeechStream
+
+    stream: Optional[SpeechStream] = None
+    parts = []
+    cancelled = False
+    t0 = time.perf_counter()
+    first_tok = None
+    try:
+        for tok in llm_iter:
+            if (token and token.is_cancelled()) or (stop_flag and stop_flag.is_set()):
+                cancelled = True
+                break
+            if not tok:
+                continue
+            if first_tok is None:
+                first_tok = time.perf_counter() - t0
+            parts.append(tok)
+            if stream is None:
+                stream = SpeechStream(stop_flag, first_clause_chars=first_clause_chars)
+            stream.append(tok)
+    finally:
+        close = getattr(llm_iter, "close", None)
+        if cancelled and close:
+            close()                     # drop the HTTP stream too
+        if stream is not None:
+            if cancelled:
+                stream.cancel()
+            else:
+                stream.finish()
 
-def speak_while_generating(llm_iter, tts_start_after_tokens=20, tts_start_after_ms=400, token=None):
-    buf = []
-    t0 = time.time()
-    started = False
-    for tok in llm_iter:
-        if token and token.is_cancelled():
-            break
-        buf.append(tok)
-        if (not started) and (len(buf) >= tts_start_after_tokens or (time.time() - t0) * 1000 >= tts_start_after_ms):
-            tts_start("".join(buf), token)
-            started = True
-        elif started:
-            tts_append(tok, token)
-    if not started and buf:
-        tts_start("".join(buf), token)
-    tts_finish(token)
+    if first_tok is not None:
+        logging.info(f"speak_while_generating: first token {first_tok * 1000:.0f} ms, "
+                     f"{len(parts)} deltas, cancelled={cancelled}")
+    return "".join(parts)
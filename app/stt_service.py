@@ -0,0 +1,255 @@
+# app/stt_service.py
+"""
+Shared speech-to-text service for many concurrent audio streams.
+
+Callers submit utterances and get a Future back. A single worker thread
+collects requests into micro-batches (up to STT_BATCH_MAX items, waiting at
+most STT_BATCH_WAIT_MS for the batch to fill) and decodes them with
+faster-whisper's BatchedInferencePipeline, so one model serves every room.
+"""
+import time
+import queue
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+import numpy as np
+
+from config import cfg
+
+SAMPLE_RATE = 16000
+# Each utterance gets its own 30 s window in the batch buffer, matching
+# Whisper's receptive field, so segments map back by their start time.
+_WINDOW_S = 30.0
+
+
+@dataclass
+class _STTRequest:
+    audio: np.ndarray
+    future: Future
+    deadline: Optional[float] = None          # time.monotonic() deadline
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+def _load_audio(src: Union[str, np.ndarray]) -> np.ndarray:
+    """Accept a file path or a float32 mono array at 16 kHz."""
+    if isinstance(src, np.ndarray):
+        return src.astype(np.float32, copy=False).reshape(-1)
+    from faster_whisper import decode_audio
+    return decode_audio(src, sampling_rate=SAMPLE_RATE)
+
+
+class BatchedSTTService:
+    """
+    Queue utterances from many streams and decode them in micro-batches.
+
+        svc = BatchedSTTService()
+        fut = svc.submit("utt.wav", deadline_s=5.0)
+        text = fut.result()
+    """
+
+    def __init__(self, model_size: str = None, max_batch: int = None,
+                 max_wait_ms: float = None, language: str = "en"):
+        self.model_size = model_size or cfg.WHISPER_SIZE
+        self.max_batch = max(1, int(max_batch or getattr(cfg, "STT_BATCH_MAX", 8)))
+        self.max_wait_s = float(max_wait_ms if max_wait_ms is not None
+                                else getattr(cfg, "STT_BATCH_WAIT_MS", 40)) / 1000.0
+        self.language = language
+
+        self._q: "queue.Queue[_STTRequest]" = queue.Queue()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._model = None
+        self._pipeline = None
+
+        self._lock = threading.Lock()
+        self._batch_hist: Counter = Counter()
+        self._completed = 0
+        self._expired = 0
+        self._failed = 0
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._load_model()
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="STT_Batcher", daemon=True)
+        self._worker.start()
+        print(f"🧠 STT service started (batch ≤ {self.max_batch}, wait ≤ {self.max_wait_s * 1000:.0f} ms)")
+
+    def shutdown(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._worker and self._worker.is_alive():
+            self._worker.join(timeout=timeout)
+        # fail anything still queued so callers don't hang
+        while True:
+            try:
+                req = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if not req.future.done():
+                req.future.set_exception(RuntimeError("STT service shut down"))
+
+    def _load_model(self):
+        if self._model is not None:
+            return
+        from faster_whisper import WhisperModel
+        self._model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+        try:
+            from faster_whisper import BatchedInferencePipeline
+            self._pipeline = BatchedInferencePipeline(model=self._model)
+        except Exception as e:
+            # Older faster-whisper: keep the shared model, decode one by one.
+            logging.warning(f"BatchedInferencePipeline unavailable ({e}); using sequential decode")
+            self._pipeline = None
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def submit(self, audio: Union[str, np.ndarray], deadline_s: float = None) -> Future:
+        """
+        Queue one utterance (WAV path or float32 array). The returned Future
+        resolves to the cleaned transcript, or raises TimeoutError if the
+        request could not be decoded before `deadline_s` seconds elapsed.
+        """
+        if not self._worker or not self._worker.is_alive():
+            self.start()
+        fut: Future = Future()
+        try:
+            arr = _load_audio(audio)
+        except Exception as e:
+            fut.set_exception(e)
+            return fut
+        deadline = time.monotonic() + deadline_s if deadline_s else None
+        self._q.put(_STTRequest(audio=arr, future=fut, deadline=deadline))
+        return fut
+
+    def transcribe(self, audio: Union[str, np.ndarray], timeout: float = None) -> str:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(audio, deadline_s=timeout).result(timeout=timeout)
+
+    def queue_depth(self) -> int:
+        return self._q.qsize()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self._q.qsize(),
+                "batch_size_hist": dict(sorted(self._batch_hist.items())),
+                "completed": self._completed,
+                "expired": self._expired,
+                "failed": self._failed,
+            }
+
+    # ----------------------------
+    # Worker
+    # ----------------------------
+    def _collect_batch(self) -> List[_STTRequest]:
+        try:
+            first = self._q.get(timeout=0.2)
+        except queue.Empty:
+            return []
+        batch = [first]
+        until = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            left = until - time.monotonic()
+            if left <= 0:
+                break
+            try:
+                batch.append(self._q.get(timeout=left))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drop_expired(self, batch: List[_STTRequest]) -> List[_STTRequest]:
+        now = time.monotonic()
+        live = []
+        for req in batch:
+            if req.future.cancelled():
+                continue
+            if req.deadline is not None and now > req.deadline:
+                req.future.set_exception(TimeoutError("STT deadline exceeded before decode"))
+                with self._lock:
+                    self._expired += 1
+                continue
+            live.append(req)
+        return live
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._drop_expired(self._collect_batch())
+            if not batch:
+                continue
+            with self._lock:
+                self._batch_hist[len(batch)] += 1
+            try:
+                texts = self._decode(batch)
+            except Exception as e:
+                logging.exception("Batched STT decode failed")
+                for req in batch:
+                    if not req.future.done():
+                        req.future.set_exception(e)
+                with self._lock:
+                    self._failed += len(batch)
+                continue
+            for req, text in zip(batch, texts):
+                if not req.future.done():
+                    req.future.set_result(text)
+            with self._lock:
+                self._completed += len(batch)
+
+    def _decode(self, batch: List[_STTRequest]) -> List[str]:
+        from text_utils import clean_stt_text
+
+        if self._pipeline is None or len(batch) == 1:
+            return [clean_stt_text(self._decode_one(r.audio)) for r in batch]
+
+        # Lay the utterances out in 30 s windows and let the pipeline batch
+        # the clips; segment start times tell us which request they belong to.
+        # clip_timestamps are sample offsets (as the pipeline's own VAD
+        # produces); the segments it returns are timed in seconds.
+        win = int(_WINDOW_S * SAMPLE_RATE)
+        buf = np.zeros(win * len(batch), dtype=np.float32)
+        clips = []
+        for i, req in enumerate(batch):
+            a = req.audio[:win]
+            buf[i * win:i * win + len(a)] = a
+            clips.append({"start": i * win, "end": i * win + len(a)})
+
+        try:
+            segments, _ = self._pipeline.transcribe(
+                buf, language=self.language, batch_size=len(batch),
+                vad_filter=False, clip_timestamps=clips,
+            )
+            parts: List[List[str]] = [[] for _ in batch]
+            for seg in segments:
+                idx = min(len(batch) - 1, max(0, int(seg.start * SAMPLE_RATE) // win))
+                parts[idx].append(seg.text)
+        except Exception as e:
+            logging.warning(f"Batched pipeline failed ({e}); decoding sequentially")
+            return [clean_stt_text(self._decode_one(r.audio)) for r in batch]
+
+        return [clean_stt_text(" ".join(p)) for p in parts]
+
+    def _decode_one(self, audio: np.ndarray) -> str:
+        segments, _ = self._model.transcribe(audio, vad_filter=False, language=self.language)
+        return " ".join(seg.text for seg in segments)
+
+
+# Process-wide instance for callers that just want a shared service
+_service: Optional[BatchedSTTService] = None
+_service_lock = threading.Lock()
+
+
+def get_stt_service() -> BatchedSTTService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = BatchedSTTService()
+        return _service
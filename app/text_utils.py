@@ -5,6 +5,16 @@ from html import unescape
 
 # Common role labels we want to strip from logs/LLM output
 _ROLE_WORDS = ("system", "assistant", "user", "tool", "developer", "function")
+_ROLES = "|".join(_ROLE_WORDS)
+
+# Compiled once; these run on every reply (and per fragment when streaming)
+_FENCED_ROLE = re.compile(r"```(?:\s*)(?:%s)\b.*?```" % _ROLES, flags=re.IGNORECASE | re.DOTALL)
+_LINE_ROLE_ONLY = re.compile(rf"(?mi)^\s*(?:{_ROLES})\s*$")
+_LINE_ROLE_COLON = re.compile(rf"(?mi)^\s*(?:{_ROLES})\s*:\s*")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+_SSML_CHARS = re.compile(r"[<>{}]")
+_WS = re.compile(r"\s+")
+
 
 def strip_role_blocks(text: str) -> str:
     """
@@ -20,24 +30,24 @@ def strip_role_blocks(text: str) -> str:
     s = str(text)
 
     # 1) Remove fenced code blocks labeled with a role: ```assistant ... ```
-    fenced = re.compile(
-        r"```(?:\s*)(?:%s)\b.*?```" % "|".join(_ROLE_WORDS),
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    s = fenced.sub("", s)
+    s = _FENCED_ROLE.sub("", s)
 
     # 2) Remove bare role headers/lines like "assistant" or "assistant:" on their own line
-    line_role_only = re.compile(rf"(?mi)^\s*(?:{'|'.join(_ROLE_WORDS)})\s*$")
-    s = line_role_only.sub("", s)
-
-    line_role_colon = re.compile(rf"(?mi)^\s*(?:{'|'.join(_ROLE_WORDS)})\s*:\s*")
-    s = line_role_colon.sub("", s)
+    s = _LINE_ROLE_ONLY.sub("", s)
+    s = _LINE_ROLE_COLON.sub("", s)
 
     # 3) Collapse excessive blank lines and trim
-    s = re.sub(r"\n{3,}", "\n\n", s)
+    s = _BLANK_RUNS.sub("\n\n", s)
     return s.strip()
 
 
+def _cap(s: str, max_chars: int) -> str:
+    """Hard-cap length on a word boundary if possible."""
+    cut = s[:max_chars]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > 50 else cut).rstrip() + "..."
+
+
 def tts_sanitize(text: str, max_chars: int = 1200) -> str:
     """
     Make text safe/nice for TTS:
@@ -54,19 +64,275 @@ def tts_sanitize(text: str, max_chars: int = 1200) -> str:
     s = unescape(s)
     s = s.replace("\r", "")
     # Avoid accidental SSML/control characters in TTS engines
-    s = re.sub(r"[<>{}]", "", s)
+    s = _SSML_CHARS.sub("", s)
     # Normalize whitespace
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS.sub(" ", s).strip()
 
     if len(s) > max_chars:
-        # Trim on a word boundary if possible
-        cut = s[:max_chars]
-        space = cut.rfind(" ")
-        s = (cut[:space] if space > 50 else cut).rstrip() + "..."
+        s = _cap(s, max_chars)
 
     return s
 
 
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+")
+
+
+def split_sentences(text: str, min_chars: int = 24) -> list[str]:
+    """
+    Split sanitized text into speakable sentences for pipelined TTS.
+    Fragments shorter than `min_chars` are merged into the next sentence so
+    we don't synthesize tiny clips like "Sure." on their own.
+    """
+    if not text:
+        return []
+    parts = [p.strip() for p in _SENTENCE_END.split(text) if p and p.strip()]
+    out: list[str] = []
+    carry = ""
+    for p in parts:
+        cur = f"{carry} {p}".strip() if carry else p
+        if len(cur) < min_chars:
+            carry = cur
+            continue
+        out.append(cur)
+        carry = ""
+    if carry:
+        if out:
+            out[-1] = f"{out[-1]} {carry}"
+        else:
+            out.append(carry)
+    return out
+
+
+# ----------------------------
+# Streaming sanitizer (token-by-token LLM output → speakable segments)
+# ----------------------------
+_BODY_STOP = re.compile(r"[\n`&]")
+_LEAD_WS = re.compile(r"[ \t]*")
+_WORD = re.compile(r"[A-Za-z]+")
+_FENCE_LABEL = re.compile(r"\s*([A-Za-z]*)")
+_ENTITY = re.compile(r"&#?[A-Za-z0-9]{1,31};")
+_ENTITY_PREFIX = re.compile(r"&#?[A-Za-z0-9]{0,31}")
+_CLAUSE_END = re.compile(r"[,;:–—]\s")
+_MAX_HOLD = 40          # longest undecided prefix we ever keep (role word, fence label, entity)
+
+
+class StreamingSanitizer:
+    """
+    Incremental tts_sanitize() for streamed LLM text.
+
+        san = StreamingSanitizer()
+        for tok in tokens:
+            for seg in san.feed(tok):
+                speak(seg)
+        for seg in san.flush():
+            speak(seg)
+
+    Applies the same rules as tts_sanitize() — role-labelled fences and role
+    headers dropped, HTML entities unescaped, SSML characters removed,
+    whitespace collapsed, output capped at `max_chars` — but holds back only
+    the few characters that are still ambiguous (a possible "assistant:" at
+    a line start, a half-received fence or entity), so work per fragment is
+    proportional to the fragment, not to the text so far.
+
+    Segments are emitted at sentence ends once they reach `min_chars`, or at
+    a clause boundary when a sentence runs past `clause_chars`
+    (`first_clause_chars` for the first segment, so speech can start sooner).
+    """
+
+    _LINE, _BODY, _FENCE = range(3)
+
+    def __init__(self, max_chars: int = 1200, min_chars: int = 24, clause_chars: int = 160,
+                 first_clause_chars: int = None):
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self.clause_chars = clause_chars
+        self.first_clause_chars = first_clause_chars or clause_chars
+        self._state = self._LINE
+        self._raw = ""              # received but not yet decidable
+        self._seg = ""              # cleaned text of the segment being built
+        self._scan = 0              # _seg offset already searched for boundaries
+        self._emitted = 0           # chars emitted so far (incl. joining spaces)
+        self.done = False           # cap reached; everything else is dropped
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def feed(self, fragment: str) -> list[str]:
+        if self.done or not fragment:
+            return []
+        self._raw += str(fragment)
+        out: list[str] = []
+        self._consume(final=False, out=out)
+        return out
+
+    def flush(self) -> list[str]:
+        """End of stream: release held text and the final partial segment."""
+        out: list[str] = []
+        if not self.done:
+            self._consume(final=True, out=out)
+            if self._seg.strip():
+                self._emit(self._seg, out)
+            self._seg, self._scan = "", 0
+        return out
+
+    # ----------------------------
+    # Raw text → cleaned text
+    # ----------------------------
+    def _consume(self, final: bool, out: list[str]):
+        raw, i, n = self._raw, 0, len(self._raw)
+        while i < n and not self.done:
+            if self._state == self._FENCE:
+                j = raw.find("```", i)
+                if j < 0:
+                    i = n if final else max(i, n - 2)     # keep a possible partial closer
+                    break
+                i, self._state = j + 3, self._BODY
+                continue
+
+            if self._state == self._LINE:
+                k = self._line_head(raw, i, n, final)
+                if k is None:
+                    break                                  # need more text to decide
+                i = k
+                continue
+
+            m = _BODY_STOP.search(raw, i)
+            j = m.start() if m else n
+            if j > i:
+                self._append(raw[i:j], out)
+                i = j
+                continue
+            ch = raw[i]
+            if ch == "\n":
+                self._append(" ", out)
+                self._state = self._LINE
+                i += 1
+            elif ch == "`":
+                k = self._fence_open(raw, i, n, final, out)
+                if k is None:
+                    break
+                i = k
+            else:
+                k = self._entity(raw, i, n, final, out)
+                if k is None:
+                    break
+                i = k
+        self._raw = "" if self.done else raw[i:]
+
+    def _line_head(self, raw: str, i: int, n: int, final: bool):
+        """At a line start: drop 'assistant' / 'assistant:' headers. Returns new index, or None to wait."""
+        ws = _LEAD_WS.match(raw, i).end()
+        if ws >= n:
+            return n if final else None
+        m = _WORD.match(raw, ws)
+        if not m:
+            self._state = self._BODY
+            return i
+        word = m.group().lower()
+        if m.end() >= n and not final:
+            if any(r.startswith(word) for r in _ROLE_WORDS) and n - i < _MAX_HOLD:
+                return None
+            self._state = self._BODY
+            return i
+        if word not in _ROLE_WORDS:
+            self._state = self._BODY
+            return i
+        k = _LEAD_WS.match(raw, m.end()).end()
+        if k >= n:
+            return n if final else None                    # bare role word at the very end
+        if raw[k] == ":":
+            self._state = self._BODY
+            return _LEAD_WS.match(raw, k + 1).end()
+        if raw[k] in "\r\n":
+            return k + 1                                   # role word alone on its line
+        self._state = self._BODY
+        return i
+
+    def _fence_open(self, raw: str, i: int, n: int, final: bool, out: list[str]):
+        """At a backtick: skip ```<role> ... ``` blocks, pass anything else through."""
+        tail = raw[i:i + 3]
+        if len(tail) < 3 and tail == "`" * len(tail) and not final:
+            return None
+        if tail != "```":
+            self._append("`", out)
+            return i + 1
+        m = _FENCE_LABEL.match(raw, i + 3)
+        if m.end() >= n and not final and n - i < _MAX_HOLD:
+            return None
+        if m.group(1).lower() in _ROLE_WORDS:
+            self._state = self._FENCE
+            return m.end()
+        self._append("```", out)
+        return i + 3
+
+    def _entity(self, raw: str, i: int, n: int, final: bool, out: list[str]):
+        m = _ENTITY.match(raw, i)
+        if m:
+            self._append(unescape(m.group()), out)
+            return m.end()
+        if not final and _ENTITY_PREFIX.match(raw, i).end() == n:
+            return None
+        self._append("&", out)
+        return i + 1
+
+    # ----------------------------
+    # Cleaned text → segments
+    # ----------------------------
+    def _append(self, text: str, out: list[str]):
+        text = _WS.sub(" ", _SSML_CHARS.sub("", text.replace("\r", "")))
+        if text[:1] == " " and (not self._seg or self._seg[-1] == " "):
+            text = text[1:]
+        if not text:
+            return
+        self._seg += text
+        self._segment(out)
+
+    def _segment(self, out: list[str]):
+        seg = self._seg
+        start = max(0, self._scan - 4)     # re-check a few chars: closers after . ! ?
+        cut = None
+        for m in _SENTENCE_END.finditer(seg, start):
+            if len(seg[:m.start()].strip()) >= self.min_chars:
+                cut = (m.start(), m.end())
+        clause_chars = self.clause_chars if self._emitted else self.first_clause_chars
+        if cut is None and len(seg) >= clause_chars:
+            for m in _CLAUSE_END.finditer(seg, start):
+                if m.start() >= self.min_chars:
+                    cut = (m.start() + 1, m.end())
+        if cut is not None:
+            self._emit(seg[:cut[0]], out)
+            seg = seg[cut[1]:]
+        self._seg = seg
+        self._scan = len(seg)
+        if not self.done and self._emitted + len(seg.rstrip()) > self.max_chars:
+            self._emit(seg, out)
+            self._seg, self._scan = "", 0
+
+    def _emit(self, text: str, out: list[str]):
+        text = text.strip()
+        if not text or self.done:
+            return
+        room = self.max_chars - self._emitted - (1 if self._emitted else 0)
+        if len(text) > room:
+            # cap on a word boundary; never leave half a word at the end
+            cut = text[:max(room, 0)]
+            space = cut.rfind(" ")
+            cut = cut[:space] if space > 0 else ("" if self._emitted else cut)
+            text = cut.rstrip() + "..." if cut.strip() else ""
+            self.done = True
+        if text:
+            out.append(text)
+            self._emitted += len(text) + (1 if self._emitted else 0)
+
+
+def sanitize_stream(fragments, **kw):
+    """Generator form: iterate LLM fragments, yield speakable segments."""
+    san = StreamingSanitizer(**kw)
+    for frag in fragments:
+        yield from san.feed(frag)
+    yield from san.flush()
+
+
 def sanitize_for_log(text: str, max_len: int = 4000) -> str:
     """Safer string for log files."""
     s = strip_role_blocks(text or "")
@@ -5,17 +5,27 @@ import os
 import logging
 import threading
 import time
-import ctypes
+import queue
 import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
 
+import numpy as np
 import edge_tts
-from playsound import playsound
+
+try:
+    from playsound import playsound   # fallback only; the playback engine is preferred
+except Exception:
+    playsound = None
 
 from config import cfg
 
 # Try to import sanitizer; fall back to a local one if missing
 try:
-    from text_utils import tts_sanitize
+    from text_utils import tts_sanitize, split_sentences
 except Exception:
     import re
     def tts_sanitize(text: str) -> str:
@@ -24,8 +34,14 @@ except Exception:
         t = re.sub(r"[\x00-\x1F\x7F]", " ", str(text))
         t = re.sub(r"\s+", " ", t).strip()
         return t[:2000]
+    def split_sentences(text: str) -> list:
+        return [text] if text else []
 
 from shared_state import mic_enabled, mic_stream
+from tts_cache import get_cache, cache_key
+from playback import get_engine
+from tts_stream import StreamingBackend, EdgeStreamBackend
+from tts_worker import get_worker, record_legacy
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -38,11 +54,20 @@ os.makedirs(AUDIO_DIR, exist_ok=True)
 _speaking_thread = None
 _is_speaking = False
 _audio_system_busy = threading.Event()
+_audio_system_idle = threading.Event()   # inverse of _audio_system_busy, so a handover can wait on it
+_audio_system_idle.set()
 _last_tts_time = 0
+_speak_jobs: "queue.Queue" = queue.Queue()
+_speech_lock = threading.Lock()
+_speech_gen = 0                       # bumped by every _begin_speech(); only the newest may end speech
+_active_jobs: dict = {}               # gen -> SpeechJob not yet ended (queued, synthesizing or playing)
+_HANDOVER_S = 2.0                     # how long a new utterance waits for the previous one to wind down
+_engine_ok = True
+_ffmpeg_warned = False
 
 
 def _reset_audio_device():
-    """Attempt to reset the audio device (mainly helpful on Windows)."""
+    """Attempt to reset the audio device (recovery path after a playback failure)."""
     try:
         import platform
         if platform.system() == "Windows":
@@ -54,10 +79,10 @@ def _reset_audio_device():
     time.sleep(0.6)
 
 
-async def _tts_to_file(text: str, voice: str, outfile: str) -> bool:
+async def _tts_to_file(text: str, voice: str, outfile: str, rate: str = "+0%") -> bool:
     """Generate speech using Edge TTS into a file."""
     try:
-        comm = edge_tts.Communicate(text, voice)
+        comm = edge_tts.Communicate(text, voice, rate=rate)
         await comm.save(outfile)
         return True
     except Exception as e:
@@ -66,136 +91,791 @@ async def _tts_to_file(text: str, voice: str, outfile: str) -> bool:
         return False
 
 
-def _stop_thread(thread: threading.Thread):
-    """Forcefully stop a thread using ctypes (last resort)."""
-    if not thread or not thread.is_alive():
-        return
+def _edge_save(text: str, voice: str, outfile: str, rate: str = "+0%") -> bool:
+    """
+    Blocking edge_tts render into `outfile`. Goes through the long-lived
+    worker loop (tts_worker) unless TTS_WORKER is off, in which case each
+    call pays for its own asyncio.run() and the setup time is recorded.
+    """
+    worker = get_worker()
+    if worker is not None:
+        try:
+            return bool(worker.save(text, voice, outfile, rate).result(timeout=60))
+        except Exception as e:
+            logging.error(f"Failed to generate speech: {e}")
+            print(f"\x1b[31mTTS generation failed: {e}\x1b[0m")
+            return False
+
+    submitted = time.perf_counter()
+
+    async def _timed():
+        record_legacy((time.perf_counter() - submitted) * 1000)
+        return await _tts_to_file(text, voice, outfile, rate)
+
+    return asyncio.run(_timed())
+
+
+def _resolved(value) -> Future:
+    f: Future = Future()
+    f.set_result(value)
+    return f
+
+
+def _cache_owns(path: str) -> bool:
+    cache = get_cache()
+    return bool(cache) and os.path.dirname(os.path.abspath(path)) == cache.root
+
+
+# ----------------------------
+# Synthesizers
+# ----------------------------
+@dataclass
+class Clip:
+    """One rendered utterance: an encoded file (edge) or in-memory PCM (local)."""
+    backend: str
+    path: Optional[str] = None
+    pcm: Optional[np.ndarray] = None
+    sample_rate: int = 24000
+    synth_s: float = 0.0
+    cached: bool = False      # file is owned by the TTS cache
+    hit: bool = False         # served from the cache without synthesis
+
+    def audio_seconds(self) -> float:
+        if self.pcm is not None:
+            return len(self.pcm) / float(self.sample_rate)
+        if self.path and os.path.exists(self.path):
+            return os.path.getsize(self.path) * 8 / 48000.0   # edge output is 48 kbit/s CBR
+        return 0.0
+
+
+class Synthesizer(StreamingBackend):
+    """
+    Text → speech. stream() yields encoded chunks for the streaming path
+    (see tts_stream); render() returns a whole Clip.
+    """
+    remote = False
+
+    def available(self) -> bool:
+        return True
+
+    def cached(self, text: str) -> Optional[Clip]:
+        return None
+
+    def render(self, text: str) -> Optional[Clip]:
+        raise NotImplementedError
+
+    def render_async(self, text: str) -> Future:
+        return _remote_pool.submit(self.render, text)
+
+
+class EdgeSynthesizer(EdgeStreamBackend, Synthesizer):
+    """edge_tts over the network; renders go through the content-addressed cache."""
+    remote = True
+
+    def cached(self, text: str) -> Optional[Clip]:
+        cache = get_cache()
+        hit = cache.get(cache_key(text, self.voice, self.rate)) if cache else None
+        if hit:
+            print("⚡ TTS cache hit")
+            return Clip(backend=self.name, path=hit, cached=True, hit=True)
+        return None
+
+    def _target(self, text: str, key: str = None):
+        cache = get_cache()
+        if cache is None:
+            return None, os.path.join(AUDIO_DIR, f"tts_{uuid.uuid4().hex}.mp3")
+        key = key or cache_key(text, self.voice, self.rate)
+        return key, cache.temp_path(key)
+
+    def _finish(self, key: Optional[str], path: str, ok: bool) -> Optional[Clip]:
+        if not ok or not os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        if key is None:
+            return Clip(backend=self.name, path=path)
+        return Clip(backend=self.name, path=get_cache().put(key, path), cached=True)
+
+    def render(self, text: str) -> Optional[Clip]:
+        hit = self.cached(text)
+        if hit:
+            return hit
+        key, path = self._target(text)
+        return self._finish(key, path, _edge_save(text, self.voice, path, self.rate))
+
+    def render_async(self, text: str, key: str = None) -> Future:
+        """
+        Like render(), but returns a Future so the caller can keep working.
+        `key` stores the result under an explicit cache key (e.g. a reminder
+        id) instead of the content hash.
+        """
+        hit = None if key else self.cached(text)
+        worker = get_worker()
+        if hit:
+            return _resolved(hit)
+        if worker is None:
+            if key is None:
+                return _remote_pool.submit(self.render, text)
+            k, path = self._target(text, key)
+            return _remote_pool.submit(lambda: self._finish(k, path, _edge_save(text, self.voice, path, self.rate)))
+
+        key, path = self._target(text, key)
+        out: Future = Future()
+
+        def _done(f: Future):
+            try:
+                ok = f.result()
+            except Exception as e:
+                logging.error(f"Failed to generate speech: {e}")
+                ok = False
+            try:
+                out.set_result(self._finish(key, path, ok))
+            except Exception as e:
+                out.set_exception(e)
+
+        worker.save(text, self.voice, path, self.rate).add_done_callback(_done)
+        return out
+
+
+class LocalSynthesizer(Synthesizer):
+    """Piper voice on the CPU, synthesized straight to in-memory PCM (no network)."""
+    name = "local"
+    fmt = "pcm16"
+
+    def __init__(self, model_path: str = None):
+        self.model_path = model_path or getattr(cfg, "TTS_LOCAL_MODEL", "")
+        self._voice = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._voice is None and not self._failed:
+                try:
+                    from piper.voice import PiperVoice
+                    self._voice = PiperVoice.load(self.model_path)
+                    self.sample_rate = int(self._voice.config.sample_rate)
+                    print(f"🗣️ Local TTS voice loaded: {os.path.basename(self.model_path)}")
+                except Exception as e:
+                    logging.warning(f"Local TTS unavailable: {e}")
+                    self._failed = True
+        return self._voice
+
+    def available(self) -> bool:
+        return bool(self.model_path) and self._load() is not None
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        voice = self._load()
+        if voice is None:
+            raise RuntimeError("local TTS voice not loaded")
+        if hasattr(voice, "synthesize_stream_raw"):       # piper-tts 1.2
+            yield from voice.synthesize_stream_raw(text)
+        else:                                             # piper-tts 1.3+
+            for chunk in voice.synthesize(text):
+                yield chunk.audio_int16_bytes
+
+    def render(self, text: str) -> Optional[Clip]:
+        pcm = np.frombuffer(b"".join(self.stream(text)), dtype=np.int16)
+        return Clip(backend=self.name, pcm=pcm, sample_rate=self.sample_rate) if len(pcm) else None
+
+
+_synths: dict = {}
+_rtf: dict = {}
+_remote_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="TTS_Remote")
+
+
+def get_synthesizer(name: str = None) -> Synthesizer:
+    name = (name or getattr(cfg, "TTS_BACKEND", "edge") or "edge").lower()
+    if name not in _synths:
+        _synths[name] = LocalSynthesizer() if name == "local" else EdgeSynthesizer(cfg.VOICE, getattr(cfg, "TTS_RATE", "+0%"))
+    return _synths[name]
+
+
+def _timed_render(synth: Synthesizer, txt: str) -> Optional[Clip]:
+    t = time.perf_counter()
+    clip = synth.render(txt)
+    if clip is None or clip.hit:
+        return clip
+    clip.synth_s = time.perf_counter() - t
+    audio = clip.audio_seconds()
+    if audio > 0:
+        rtf = clip.synth_s / audio
+        _rtf.setdefault(synth.name, deque(maxlen=200)).append(rtf)
+        logging.debug(f"TTS [{synth.name}] synth={clip.synth_s * 1000:.0f}ms audio={audio:.2f}s rtf={rtf:.2f}")
+    return clip
+
+
+def synth_stats() -> dict:
+    """Real-time factor (synthesis time / audio duration) per backend."""
+    out = {}
+    for name, xs in _rtf.items():
+        s = sorted(xs)
+        out[name] = {"n": len(s), "rtf_p50": round(s[len(s) // 2], 3), "rtf_p90": round(s[int(len(s) * 0.9)], 3)}
+    return out
+
+
+def _render(txt: str) -> Optional[Clip]:
+    """
+    Render already-sanitized `txt` with the configured backend. A remote
+    backend gets TTS_REMOTE_BUDGET_S; if it misses the budget (or fails) and a
+    local voice is available we speak the local rendition instead, while the
+    remote result still lands in the cache for next time.
+    """
+    primary = get_synthesizer()
+    hit = primary.cached(txt)
+    if hit:
+        return hit
+
+    local = get_synthesizer("local") if primary.remote and getattr(cfg, "TTS_LOCAL_FALLBACK", True) else None
+    if local is None or not local.available():
+        return _timed_render(primary, txt)
+
+    budget = float(getattr(cfg, "TTS_REMOTE_BUDGET_S", 2.0))
+    fut = _remote_pool.submit(_timed_render, primary, txt)
     try:
-        tid = thread.ident
-        exc = ctypes.py_object(SystemExit)
-        res = ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(tid), exc)
-        if res == 0:
-            raise ValueError("Invalid thread ID")
-        elif res > 1:
-            ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(tid), None)
-            raise SystemError("PyThreadState_SetAsyncExc failed")
+        clip = fut.result(timeout=budget)
+        if clip:
+            return clip
+        logging.warning(f"{primary.name} TTS failed; using {local.name}")
+    except FutureTimeout:
+        logging.warning(f"⏱️ {primary.name} TTS missed its {budget:.1f}s budget; using {local.name}")
+        fut.add_done_callback(lambda f: f.exception() is None and _discard(f.result()))
     except Exception as e:
-        logging.error(f"Failed to stop thread: {e}")
+        logging.warning(f"{primary.name} TTS error ({e}); using {local.name}")
+    return _timed_render(local, txt)
 
 
-def speak(text: str, stop_flag: threading.Event = None):
+def _play_streaming(txt: str, stop_flag: threading.Event = None) -> bool:
     """
-    Convert text to speech and play it while managing microphone state.
-    Ensures the assistant doesn't hear itself.
+    Stream synthesis straight to the speaker, teeing MP3 output into the cache.
+    Returns False when the caller should use the clip path instead
+    (cache hit, or streaming unavailable before any audio was played).
     """
-    global _speaking_thread, _is_speaking, _last_tts_time
+    global _ffmpeg_warned
+    synth = get_synthesizer()
+    if synth.cached(txt) is not None:
+        return False
 
-    # Sanitize early
-    txt = tts_sanitize(text)
-    if not txt:
+    from tts_stream import stream_speak, ffmpeg_available
+    if synth.fmt == "mp3" and not ffmpeg_available():
+        if not _ffmpeg_warned:
+            logging.warning("TTS_STREAMING needs ffmpeg on PATH to decode MP3; using clip playback")
+            _ffmpeg_warned = True
+        return False
+
+    cache = get_cache() if synth.fmt == "mp3" else None
+    key = cache_key(txt, cfg.VOICE, getattr(cfg, "TTS_RATE", "+0%"))
+    tmp = cache.temp_path(key) if cache else None
+    try:
+        with open(tmp, "wb") if tmp else nullcontext() as tee:
+            m = stream_speak(txt, synth, stop_flag=stop_flag, tee=tee)
+    except Exception as e:
+        logging.warning(f"Streaming TTS unavailable ({e}); falling back to clip playback")
+        m = None
+
+    # only a stream that ran to its end is the full text's audio; a cut-off one is not cached
+    if tmp and m and m.complete and not m.interrupted and m.chunks:
+        cache.put(key, tmp)
+    elif tmp and os.path.exists(tmp):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    if m is None:
+        return False
+
+    if m.ttfa_s is not None:
+        print(f"⏱️ TTS first audio after {m.ttfa_s * 1000:.0f} ms "
+              f"(synthesis {m.synth_s * 1000:.0f} ms, audio {m.audio_s:.1f} s)")
+    return True
+
+
+def prewarm_cache(phrases, background: bool = True):
+    """
+    Pre-synthesize fixed phrases (canned replies, error lines) into the cache
+    so they play instantly later. Runs in a daemon thread by default.
+    """
+    cache = get_cache()
+    synth = get_synthesizer("edge")
+    if cache is None:
+        return None
+
+    def _go():
+        # render_async() overlaps the phrases on the worker loop; keep a few in flight
+        pending: "deque[tuple]" = deque()
+        done = 0
+
+        def _collect(txt: str, fut: Future):
+            nonlocal done
+            try:
+                if fut.result(timeout=60):
+                    done += 1
+            except Exception as e:
+                logging.warning(f"TTS pre-warm failed for {txt[:40]!r}: {e}")
+
+        for p in dict.fromkeys(phrases or []):
+            txt = tts_sanitize(p)
+            if not txt or os.path.exists(cache.path_for(cache_key(txt, synth.voice, synth.rate))):
+                continue
+            pending.append((txt, synth.render_async(txt)))
+            if len(pending) >= 4:
+                _collect(*pending.popleft())
+        while pending:
+            _collect(*pending.popleft())
+        logging.info(f"TTS pre-warm complete: {done} new phrase(s), cache={cache.stats()}")
+
+    if not background:
+        _go()
+        return None
+    t = threading.Thread(target=_go, name="TTS_Prewarm", daemon=True)
+    t.start()
+    return t
+
+
+def _discard(clip: Optional[Clip]):
+    """Remove a played file unless the cache owns it or KEEP_TTS is set."""
+    if not clip or not clip.path or clip.cached or _cache_owns(clip.path):
         return
+    if not getattr(cfg, "KEEP_TTS", False):
+        try:
+            os.remove(clip.path)
+        except OSError:
+            pass
 
-    # Prevent overlapping TTS
-    if _audio_system_busy.is_set():
-        # wait briefly; if stuck, clear and try to recover
-        waited = _audio_system_busy.wait(timeout=5.0)
-        if not waited:
-            _audio_system_busy.clear()
-            _reset_audio_device()
 
-    # Cooldown between TTS calls helps some backends/drivers
-    now = time.time()
-    since = now - _last_tts_time
-    if since < 0.5:
-        time.sleep(0.5 - since)
+@dataclass
+class PipelineMetrics:
+    sentences: int = 0
+    played: int = 0
+    dropped: int = 0
+    ttfa_s: Optional[float] = None                     # first push → first sentence starts playing
+    gaps_s: List[float] = field(default_factory=list)  # silence between consecutive sentences
+    synth_s: List[float] = field(default_factory=list)
 
-    _audio_system_busy.set()
-    _last_tts_time = time.time()
 
-    # Stop any ongoing speech
-    if _speaking_thread and _speaking_thread.is_alive():
-        _stop_thread(_speaking_thread)
-        time.sleep(0.4)
+class SpeechPipeline:
+    """
+    Two-stage TTS: a synth thread renders sentence N+1 while the player
+    thread is still playing sentence N. Only the first sentence's synthesis
+    is on the critical path; at most `max_ahead` rendered files wait in the
+    bounded queue. cancel() (or the stop flag) drops everything still queued.
+
+        pipe = SpeechPipeline(stop_flag)
+        for s in split_sentences(text):
+            pipe.push(s)
+        pipe.close()
+        pipe.wait()
+    """
+    _END = object()
+
+    def __init__(self, stop_flag: threading.Event = None, max_ahead: int = 2):
+        self.stop_flag = stop_flag
+        self.metrics = PipelineMetrics()
+        self._cancel = threading.Event()
+        self._text_q: "queue.Queue" = queue.Queue()
+        self._audio_q: "queue.Queue" = queue.Queue(maxsize=max(1, max_ahead))
+        self._t0: Optional[float] = None
+        self._synth = threading.Thread(target=self._synth_loop, name="TTS_PipeSynth", daemon=True)
+        self._player = threading.Thread(target=self._play_loop, name="TTS_PipePlay", daemon=True)
+        self._synth.start()
+        self._player.start()
+
+    # ----------------------------
+    # Producer side
+    # ----------------------------
+    def push(self, sentence: str):
+        txt = (sentence or "").strip()
+        if not txt or self.cancelled():
+            return
+        if self._t0 is None:
+            self._t0 = time.perf_counter()
+        self.metrics.sentences += 1
+        self._text_q.put(txt)
+
+    def close(self):
+        """No more sentences; the pipeline drains and finishes."""
+        self._text_q.put(self._END)
+
+    def cancel(self):
+        """Drop this pipeline's queued sentences and cut off its clip; other speech is left alone."""
+        self._cancel.set()
+        self.close()
+
+    def cancelled(self) -> bool:
+        return self._cancel.is_set() or bool(self.stop_flag and self.stop_flag.is_set())
+
+    def wait(self, timeout: float = None) -> PipelineMetrics:
+        self._player.join(timeout)
+        return self.metrics
+
+    # ----------------------------
+    # Stages
+    # ----------------------------
+    def _put_audio(self, item) -> bool:
+        while True:
+            try:
+                self._audio_q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self.cancelled():
+                    return False
+
+    def _synth_loop(self):
+        while True:
+            txt = self._text_q.get()
+            if txt is self._END:
+                break
+            if self.cancelled():
+                self.metrics.dropped += 1
+                continue
+            t = time.perf_counter()
+            try:
+                clip = _render(txt)
+            except Exception as e:
+                logging.error(f"Pipelined TTS synthesis failed: {e}")
+                clip = None
+            self.metrics.synth_s.append(time.perf_counter() - t)
+            if not clip:
+                continue
+            if not self._put_audio(clip):
+                _discard(clip)
+                self.metrics.dropped += 1
+        self._put_audio(self._END)
+
+    def _play_loop(self):
+        last_end = None
+        while True:
+            try:
+                clip = self._audio_q.get(timeout=0.1)
+            except queue.Empty:
+                if self.cancelled() and not self._synth.is_alive():
+                    break
+                continue
+            if clip is self._END:
+                break
+            if self.cancelled():
+                _discard(clip)
+                self.metrics.dropped += 1
+                continue
+            start = time.perf_counter()
+            if self.metrics.ttfa_s is None and self._t0 is not None:
+                self.metrics.ttfa_s = start - self._t0
+            elif last_end is not None:
+                self.metrics.gaps_s.append(start - last_end)
+            try:
+                if _play_clip(clip, self.cancelled):
+                    self.metrics.played += 1
+            except Exception as e:
+                logging.error(f"TTS playback failed: {e}")
+                print(f"\x1b[31m❌ Audio playback failed: {e}\x1b[0m")
+            finally:
+                _discard(clip)
+            last_end = time.perf_counter()
 
-    if stop_flag:
-        stop_flag.clear()
+        # drain anything left behind by a cancel
+        while True:
+            try:
+                item = self._audio_q.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._END:
+                _discard(item)
+                self.metrics.dropped += 1
+
+        m = self.metrics
+        gaps = ", ".join(f"{g * 1000:.0f}" for g in m.gaps_s) or "-"
+        ttfa = f"{m.ttfa_s * 1000:.0f}" if m.ttfa_s is not None else "n/a"
+        logging.info(f"TTS pipeline: {m.played}/{m.sentences} played, {m.dropped} dropped, "
+                     f"ttfa={ttfa}ms gaps=[{gaps}]ms")
 
-    _is_speaking = True
 
-    # Logical mute & try to stop mic stream
-    mic_enabled.clear()
-    if mic_stream and getattr(mic_stream, "active", False):
+def _play_file(filename: str, should_stop=None) -> bool:
+    """
+    Play one file on the shared playback engine; returns True if it played to
+    the end. Falls back to playsound if no output stream can be opened.
+    """
+    global _engine_ok
+    if _engine_ok:
         try:
-            mic_stream.stop()
-            print("🔇 Mic stream stopped for TTS.")
+            engine = get_engine()
+            handle = engine.play_file(filename)
         except Exception as e:
-            print(f"\x1b[33m⚠️ Could not stop mic: {e}\x1b[0m")
+            logging.warning(f"Playback engine unavailable ({e}); falling back to playsound")
+            _engine_ok = False
+        else:
+            return handle.wait(should_stop=should_stop, engine=engine)
+    if playsound is None:
+        raise RuntimeError("no playback backend available")
+    playsound(filename)
+    return True
+
+
+def _play_clip(clip: Clip, should_stop=None) -> bool:
+    if clip.pcm is None:
+        return _play_file(clip.path, should_stop)
+    engine = get_engine()
+    return engine.play(clip.pcm, clip.sample_rate).wait(should_stop=should_stop, engine=engine)
+
+
+class SpeechJob:
+    """
+    Stop flag for one utterance: set when the caller's `stop_flag` is, or
+    when stop_speaking() / a newer utterance cancels it, even mid-synthesis.
+    """
+
+    def __init__(self, gen: int, stop_flag: threading.Event = None):
+        self.gen = gen
+        self.stop_flag = stop_flag
+        self._cancel = threading.Event()
 
-    # small pause for audio subsystem
-    time.sleep(0.2)
+    def set(self):
+        self._cancel.set()
 
-    def _play():
-        global _is_speaking, _last_tts_time
-        filename = None
+    def is_set(self) -> bool:
+        return self._cancel.is_set() or bool(self.stop_flag and self.stop_flag.is_set())
+
+
+def _cancel_jobs():
+    with _speech_lock:
+        jobs = list(_active_jobs.values())
+    for job in jobs:
+        job.set()
+
+
+def stop_speaking():
+    """Cut off current speech within one audio block and drop queued utterances."""
+    _cancel_jobs()
+    if _engine_ok:
+        try:
+            get_engine().stop()
+        except Exception as e:
+            logging.debug(f"Playback stop failed: {e}")
+
+
+def _speak_job(txt: str, stop_flag: SpeechJob, audio_path: str = None):
+    clip = None
+    should_stop = stop_flag.is_set
+    try:
+        if stop_flag.is_set():
+            return                      # superseded or stopped while queued
+
+        # Pre-rendered audio (e.g. a reminder announcement) plays as-is
+        if audio_path and os.path.exists(audio_path):
+            clip = Clip(backend="prerendered", path=audio_path, cached=True, hit=True)
+            print("🔊 Playing pre-rendered audio...")
+            _play_clip(clip, should_stop)
+            return
+
+        # Streaming path: first chunk plays while the rest is synthesized
+        if getattr(cfg, "TTS_STREAMING", False) and _play_streaming(txt, stop_flag):
+            return
+
+        # Multi-sentence replies: synthesize sentence N+1 while N plays
+        sentences = split_sentences(txt) if getattr(cfg, "TTS_PIPELINE", True) else [txt]
+        if len(sentences) > 1:
+            pipe = SpeechPipeline(stop_flag)
+            for s in sentences:
+                pipe.push(s)
+            pipe.close()
+            m = pipe.wait()
+            if m.ttfa_s is not None:
+                print(f"⏱️ TTS first audio after {m.ttfa_s * 1000:.0f} ms ({m.played}/{m.sentences} sentences)")
+            return
+
+        # Cache hit → play straight away, no synthesis round trip
+        clip = _render(txt)
+        if not clip or (clip.pcm is None and not os.path.exists(clip.path or "")):
+            print("\x1b[31m❌ Failed to generate speech audio\x1b[0m")
+            return
+
+        if stop_flag.is_set():
+            print("🛑 TTS interrupted by stop flag")
+            return
+
+        # Play
         try:
-            temp_dir = tempfile.gettempdir()
-            unique_id = uuid.uuid4().hex
-            filename = os.path.join(AUDIO_DIR, f"tts_{unique_id}.mp3")
+            print("🔊 Playing TTS audio...")
+            if _play_clip(clip, should_stop):
+                print("✅ TTS playback completed")
+            else:
+                print("🛑 TTS interrupted")
+                if _engine_ok:
+                    logging.info(f"Playback engine stats: {get_engine().stats()}")
+        except Exception as e:
+            logging.error(f"TTS playback failed: {e}")
+            print(f"\x1b[31m❌ Audio playback failed: {e}\x1b[0m")
+            _reset_audio_device()
 
-            # Synthesize
-            ok = asyncio.run(_tts_to_file(txt, cfg.VOICE, filename))
-            if not ok or not os.path.exists(filename):
-                print("\x1b[31m❌ Failed to generate speech audio\x1b[0m")
-                return
+    except Exception as e:
+        logging.error(f"TTS process error: {e}")
+        print(f"\x1b[31m❌ TTS process error: {e}\x1b[0m")
+    finally:
+        # Cleanup temp file (cached files are owned by the cache's LRU quota)
+        _discard(clip)
+        _end_speech(stop_flag)
 
-            if stop_flag and stop_flag.is_set():
-                print("🛑 TTS interrupted by stop flag")
-                return
 
-            # Play
+def _end_speech(job: SpeechJob):
+    """
+    Undo _begin_speech(): unmute the mic and mark the audio system idle,
+    unless a newer utterance has begun since `job` (it owns that state now).
+    """
+    global _is_speaking, _last_tts_time
+    with _speech_lock:
+        _active_jobs.pop(job.gen, None)
+        if job.gen != _speech_gen:
+            return
+        _is_speaking = False
+
+        # Attempt to restart mic
+        if mic_stream and not getattr(mic_stream, "active", False):
             try:
-                print("🔊 Playing TTS audio...")
-                playsound(filename)
-                print("✅ TTS playback completed")
+                mic_stream.start()
+                print("🎙️ Mic stream restarted after TTS.")
             except Exception as e:
-                logging.error(f"TTS playback failed: {e}")
-                print(f"\x1b[31m❌ Audio playback failed: {e}\x1b[0m")
-                _reset_audio_device()
+                print(f"\x1b[33m⚠️ Failed to restart mic: {e}\x1b[0m")
 
+        # Logical unmute regardless, so the loop can listen again
+        mic_enabled.set()
+
+        _audio_system_busy.clear()
+        _audio_system_idle.set()
+        _last_tts_time = time.time()
+
+
+def _speaker_loop():
+    while True:
+        txt, job, audio_path, on_done = _speak_jobs.get()
+        try:
+            _speak_job(txt, job, audio_path)
         except Exception as e:
-            logging.error(f"TTS process error: {e}")
-            print(f"\x1b[31m❌ TTS process error: {e}\x1b[0m")
+            logging.exception(f"TTS worker error: {e}")
         finally:
-            _is_speaking = False
+            _call_done(on_done)
 
-            # Let audio system settle, then reset devices (Windows-friendly)
-            time.sleep(0.3)
-            _reset_audio_device()
 
-            # Attempt to restart mic
-            if mic_stream and not getattr(mic_stream, "active", False):
-                try:
-                    mic_stream.start()
-                    print("🎙️ Mic stream restarted after TTS.")
-                except Exception as e:
-                    print(f"\x1b[33m⚠️ Failed to restart mic: {e}\x1b[0m")
+def _call_done(on_done):
+    if on_done is not None:
+        try:
+            on_done()
+        except Exception as e:
+            logging.debug(f"speak on_done callback failed: {e}")
 
-            # Logical unmute regardless, so the loop can listen again
-            mic_enabled.set()
 
-            # Cleanup temp file
-            if filename and not getattr(cfg, "KEEP_TTS", False) and os.path.exists(filename):
-                try:
-                    os.remove(filename)
-                    # print("🧹 Cleaned up temporary audio file")
-                except Exception as e:
-                    print(f"⚠️ Could not remove temp file: {e}")
+def speak(text: str, stop_flag: threading.Event = None, audio_path: str = None, on_done=None):
+    """
+    Convert text to speech and play it while managing microphone state.
+    Ensures the assistant doesn't hear itself.
+    Returns immediately; the long-lived TTS_Player thread does the work.
+    `audio_path`, if given, is an already rendered file for `text` to play
+    instead of synthesizing. `on_done()`, if given, runs once the utterance
+    has finished, been stopped or failed (on the player thread).
+    """
+    global _speaking_thread
 
-            _audio_system_busy.clear()
-            _last_tts_time = time.time()
+    # Sanitize early
+    txt = tts_sanitize(text)
+    if not txt:
+        _call_done(on_done)
+        return
 
-    _speaking_thread = threading.Thread(target=_play, name="TTS_Player", daemon=True)
-    _speaking_thread.start()
+    job = _begin_speech(stop_flag)
+
+    if _speaking_thread is None or not _speaking_thread.is_alive():
+        _speaking_thread = threading.Thread(target=_speaker_loop, name="TTS_Player", daemon=True)
+        _speaking_thread.start()
+    _speak_jobs.put((txt, job, audio_path, on_done))
+
+
+def _begin_speech(stop_flag: threading.Event = None) -> SpeechJob:
+    """Cut off current speech, mark the audio system busy and mute the mic."""
+    global _is_speaking, _last_tts_time, _speech_gen
+
+    # Stop any ongoing or queued speech (engine drops it within one block)
+    if _audio_system_busy.is_set():
+        stop_speaking()
+        if not _audio_system_idle.wait(_HANDOVER_S):
+            logging.debug("Previous utterance still winding down; it can no longer end this one")
+
+    if stop_flag:
+        stop_flag.clear()
+
+    with _speech_lock:
+        _speech_gen += 1
+        job = SpeechJob(_speech_gen, stop_flag)
+        _active_jobs[job.gen] = job
+        _audio_system_busy.set()
+        _audio_system_idle.clear()
+        _last_tts_time = time.time()
+        _is_speaking = True
+
+        # Logical mute & try to stop mic stream
+        mic_enabled.clear()
+        if mic_stream and getattr(mic_stream, "active", False):
+            try:
+                mic_stream.stop()
+                print("🔇 Mic stream stopped for TTS.")
+            except Exception as e:
+                print(f"\x1b[33m⚠️ Could not stop mic: {e}\x1b[0m")
+    return job
+
+
+class SpeechStream:
+    """
+    speak() for text that is still being generated. Fragments go through a
+    StreamingSanitizer; each speakable segment is pushed into a
+    SpeechPipeline as soon as it is complete, so the first clause is already
+    playing while the LLM is still writing the rest.
+
+        s = SpeechStream(stop_flag)
+        for tok in tokens:
+            s.append(tok)
+        s.finish()
+    """
+
+    def __init__(self, stop_flag: threading.Event = None, first_clause_chars: int = 40):
+        from text_utils import StreamingSanitizer
+        self._job = _begin_speech(stop_flag)
+        self.stop_flag = self._job
+        self._san = StreamingSanitizer(first_clause_chars=first_clause_chars)
+        self._pipe = SpeechPipeline(self._job)
+        self._closed = False
+
+    def append(self, fragment: str):
+        if self._closed:
+            return
+        for seg in self._san.feed(fragment):
+            self._pipe.push(seg)
+
+    def finish(self, wait: bool = False) -> Optional[PipelineMetrics]:
+        """No more text. Returns metrics if `wait`, else cleans up in the background."""
+        if self._closed:
+            return None
+        self._closed = True
+        for seg in self._san.flush():
+            self._pipe.push(seg)
+        self._pipe.close()
+        if wait:
+            return self._done()
+        threading.Thread(target=self._done, name="TTS_StreamDone", daemon=True).start()
+        return None
+
+    def cancel(self):
+        if not self._closed:
+            self._closed = True
+            self._pipe.cancel()
+            threading.Thread(target=self._done, name="TTS_StreamDone", daemon=True).start()
+
+    def _done(self) -> PipelineMetrics:
+        try:
+            m = self._pipe.wait()
+            if m.ttfa_s is not None:
+                print(f"⏱️ TTS first audio after {m.ttfa_s * 1000:.0f} ms ({m.played}/{m.sentences} segments)")
+            return m
+        finally:
+            _end_speech(self._job)
 
 
 def is_speaking() -> bool:
@@ -0,0 +1,162 @@
+# app/tts_cache.py
+"""
+Content-addressed cache for synthesized speech.
+
+Files are named by a hash of (sanitized text, voice, rate), so the same line
+spoken twice is synthesized once. Recency is tracked with the file mtime
+(touched on every hit) so LRU order survives restarts, and the least recently
+used files are evicted whenever the directory grows past its byte quota.
+Pinned keys (pending reminder announcements) are never evicted.
+"""
+import os
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from config import cfg
+
+
+def cache_key(text: str, voice: str, rate: str = "+0%") -> str:
+    """Stable key for one rendition of `text` (expects already-sanitized text)."""
+    raw = "\x1f".join([voice or "", rate or "", text or ""])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    def __init__(self, root: str, max_bytes: int, ext: str = ".mp3"):
+        self.root = os.path.abspath(root)
+        self.max_bytes = int(max_bytes)
+        self.ext = ext
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()   # key -> size, oldest first
+        self._total = 0
+        self._pinned: set = set()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.root, exist_ok=True)
+        self._scan()
+
+    # ----------------------------
+    # Index
+    # ----------------------------
+    def _scan(self):
+        found = []
+        for name in os.listdir(self.root):
+            if not name.endswith(self.ext):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            found.append((st.st_mtime, name[: -len(self.ext)], st.st_size))
+        found.sort()
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+            for _, key, size in found:
+                self._entries[key] = size
+                self._total += size
+            self._evict_locked()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key + self.ext)
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached file for `key` (and mark it recently used), or None."""
+        path = self.path_for(key)
+        with self._lock:
+            if key not in self._entries or not os.path.exists(path):
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return path
+
+    def put(self, key: str, src_path: str) -> str:
+        """Move a freshly synthesized file into the cache and enforce the quota."""
+        dst = self.path_for(key)
+        os.replace(src_path, dst)
+        size = os.path.getsize(dst)
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._total += size
+            self._evict_locked(keep=key)
+        return dst
+
+    def temp_path(self, key: str) -> str:
+        """Scratch path inside the cache dir, so put() is an atomic rename."""
+        return os.path.join(self.root, f"{key}.{uuid.uuid4().hex[:12]}.part")
+
+    def pin(self, key: str):
+        """Exempt `key` from eviction (it may be put() later)."""
+        with self._lock:
+            self._pinned.add(key)
+
+    def unpin(self, key: str):
+        """Return `key` to normal LRU eviction."""
+        with self._lock:
+            self._pinned.discard(key)
+            self._evict_locked()
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._pinned.discard(key)
+            self._total -= self._entries.pop(key, 0)
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "pinned": len(self._pinned & self._entries.keys()),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _evict_locked(self, keep: str = None):
+        while self._total > self.max_bytes:
+            victim = next((k for k in self._entries if k != keep and k not in self._pinned), None)
+            if victim is None:
+                break
+            key, size = victim, self._entries.pop(victim)
+            self._total -= size
+            try:
+                os.remove(self.path_for(key))
+            except OSError as e:
+                logging.debug(f"TTS cache evict failed for {key}: {e}")
+
+
+_cache: Optional[TTSCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[TTSCache]:
+    """Process-wide cache, or None when TTS_CACHE is off."""
+    global _cache
+    if not getattr(cfg, "TTS_CACHE", True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            root = getattr(cfg, "TTS_CACHE_DIR", "") or os.path.join(
+                getattr(cfg, "AUDIO_DIR", "") or "audio", "cache")
+            max_mb = float(getattr(cfg, "TTS_CACHE_MAX_MB", 100))
+            _cache = TTSCache(root, int(max_mb * 1024 * 1024))
+        return _cache
@@ -0,0 +1,329 @@
+# app/tts_stream.py
+"""
+Streaming TTS: play the first audio chunk while synthesis continues.
+
+    backend  → yields encoded audio chunks as the synthesizer produces them
+    decoder  → turns those chunks into int16 PCM incrementally
+    sink     → plays (or records) PCM as soon as it is decoded; by default the
+               shared playback engine (app/playback.py)
+
+Synthesis runs on its own producer thread, so a slow sink never stalls the
+synthesizer and time-to-first-audio is reported separately from total
+synthesis time.
+"""
+import time
+import math
+import queue
+import shutil
+import asyncio
+import logging
+import threading
+import subprocess
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from config import cfg
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+class StreamingBackend:
+    """Produces encoded audio chunks for `text`. Subclasses set fmt/sample_rate."""
+    name = "base"
+    fmt = "pcm16"            # "pcm16" (raw mono int16) or "mp3"
+    sample_rate = 24000
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        raise NotImplementedError
+
+
+class EdgeStreamBackend(StreamingBackend):
+    """edge_tts websocket stream (24 kHz mono MP3)."""
+    name = "edge"
+    fmt = "mp3"
+    sample_rate = 24000
+
+    def __init__(self, voice: str = None, rate: str = None):
+        self.voice = voice or cfg.VOICE
+        self.rate = rate or getattr(cfg, "TTS_RATE", "+0%")
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        from tts_worker import get_worker
+        worker = get_worker()
+        if worker is not None:
+            yield from worker.stream(text, self.voice, self.rate)
+            return
+
+        import edge_tts
+
+        q: "queue.Queue" = queue.Queue()
+        _done = object()
+
+        async def _pump():
+            comm = edge_tts.Communicate(text, self.voice, rate=self.rate)
+            async for chunk in comm.stream():
+                if chunk.get("type") == "audio" and chunk.get("data"):
+                    q.put(chunk["data"])
+
+        def _run():
+            try:
+                asyncio.run(_pump())
+            except Exception as e:
+                q.put(e)
+            finally:
+                q.put(_done)
+
+        threading.Thread(target=_run, name="EdgeStream", daemon=True).start()
+        while True:
+            item = q.get()
+            if item is _done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class ToneStreamBackend(StreamingBackend):
+    """
+    Offline stand-in synthesizer: one short tone per word, emitted as raw
+    PCM with an artificial per-chunk delay that mimics network synthesis.
+    """
+    name = "tone"
+    fmt = "pcm16"
+
+    def __init__(self, sample_rate: int = 24000, word_ms: int = 180, chunk_delay_s: float = 0.02):
+        self.sample_rate = sample_rate
+        self.word_ms = word_ms
+        self.chunk_delay_s = chunk_delay_s
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        n = int(self.sample_rate * self.word_ms / 1000)
+        t = np.arange(n, dtype=np.float32) / self.sample_rate
+        for i, _ in enumerate((text or "").split()):
+            if self.chunk_delay_s:
+                time.sleep(self.chunk_delay_s)
+            freq = 330.0 + 40.0 * (i % 6)
+            tone = 0.2 * np.sin(2 * math.pi * freq * t)
+            yield (tone * 32767).astype(np.int16).tobytes()
+
+
+# ----------------------------
+# Decoders
+# ----------------------------
+class PCMDecoder:
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._tail = b""
+
+    def feed(self, data: bytes) -> List[np.ndarray]:
+        data = self._tail + data
+        cut = len(data) - (len(data) % 2)
+        self._tail = data[cut:]
+        return [np.frombuffer(data[:cut], dtype=np.int16)] if cut else []
+
+    def close(self) -> List[np.ndarray]:
+        return []
+
+
+class FFmpegMP3Decoder:
+    """Incremental MP3 → int16 PCM through an ffmpeg pipe."""
+
+    def __init__(self, sample_rate: int):
+        exe = shutil.which("ffmpeg")
+        if not exe:
+            raise RuntimeError("ffmpeg not found; streaming MP3 decode unavailable")
+        self.sample_rate = sample_rate
+        self._proc = subprocess.Popen(
+            [exe, "-loglevel", "quiet", "-f", "mp3", "-i", "pipe:0",
+             "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0,
+        )
+        self._out: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._reader = threading.Thread(target=self._read, name="MP3Decode", daemon=True)
+        self._reader.start()
+        self._pcm = PCMDecoder(sample_rate)
+
+    def _read(self):
+        try:
+            while True:
+                buf = self._proc.stdout.read(4096)
+                if not buf:
+                    break
+                self._out.put(buf)
+        finally:
+            self._out.put(None)
+
+    def _drain(self, block: bool) -> List[np.ndarray]:
+        out: List[np.ndarray] = []
+        while True:
+            try:
+                buf = self._out.get(block=block)
+            except queue.Empty:
+                break
+            if buf is None:
+                break
+            out += self._pcm.feed(buf)
+        return out
+
+    def feed(self, data: bytes) -> List[np.ndarray]:
+        try:
+            self._proc.stdin.write(data)
+        except (BrokenPipeError, ValueError):
+            pass
+        return self._drain(block=False)
+
+    def close(self) -> List[np.ndarray]:
+        try:
+            self._proc.stdin.close()
+        except Exception:
+            pass
+        out = self._drain(block=True)
+        self._proc.wait(timeout=5)
+        return out
+
+    def abort(self):
+        try:
+            self._proc.kill()
+            self._proc.wait(timeout=2)      # reaps ffmpeg; the reader thread sees EOF and exits
+        except Exception:
+            pass
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def make_decoder(backend: StreamingBackend):
+    if backend.fmt == "mp3":
+        return FFmpegMP3Decoder(backend.sample_rate)
+    return PCMDecoder(backend.sample_rate)
+
+
+# ----------------------------
+# Sinks
+# ----------------------------
+class NullSink:
+    """Collects PCM instead of playing it (offline runs / measurements)."""
+
+    def __init__(self, sample_rate: int = 24000):
+        self.sample_rate = sample_rate
+        self.frames = 0
+        self.first_write_at: Optional[float] = None
+
+    def write(self, pcm: np.ndarray):
+        if self.first_write_at is None:
+            self.first_write_at = time.perf_counter()
+        self.frames += len(pcm)
+
+    def close(self):
+        pass
+
+
+# ----------------------------
+# Driver
+# ----------------------------
+@dataclass
+class StreamMetrics:
+    backend: str
+    ttfa_s: Optional[float] = None      # start → first PCM handed to the sink
+    synth_s: Optional[float] = None     # start → backend finished producing
+    total_s: Optional[float] = None     # start → playback finished
+    audio_s: float = 0.0
+    chunks: int = 0
+    interrupted: bool = False
+    complete: bool = False              # backend reached end-of-stream (no stop, no error)
+
+
+def stream_speak(text: str, backend: StreamingBackend, sink=None,
+                 stop_flag: threading.Event = None, tee=None) -> StreamMetrics:
+    """
+    Synthesize and play `text` incrementally. `tee`, if given, is a binary
+    file object that receives the encoded chunks (used to fill the TTS cache).
+    """
+    m = StreamMetrics(backend=backend.name)
+    t0 = time.perf_counter()
+    chunks: "queue.Queue" = queue.Queue(maxsize=64)
+    abandoned = threading.Event()
+    _done = object()
+
+    def _put(item) -> bool:
+        while True:
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if abandoned.is_set():
+                    return False
+
+    def _produce():
+        try:
+            for data in backend.stream(text):
+                if (stop_flag and stop_flag.is_set()) or not _put(data):
+                    break
+            else:
+                m.complete = True
+        except Exception as e:
+            _put(e)
+        finally:
+            m.synth_s = time.perf_counter() - t0
+            _put(_done)
+
+    decoder = make_decoder(backend)         # before the producer: no ffmpeg, no synthesis started
+    producer = threading.Thread(target=_produce, name="TTS_StreamSynth", daemon=True)
+    producer.start()
+
+    own_sink = sink is None
+
+    def _emit(frames: List[np.ndarray]):
+        for pcm in frames:
+            if not len(pcm):
+                continue
+            if m.ttfa_s is None:
+                m.ttfa_s = time.perf_counter() - t0
+            m.audio_s += len(pcm) / backend.sample_rate
+            sink.write(pcm)
+
+    try:
+        if own_sink:
+            from playback import get_engine, EngineSink
+            sink = EngineSink(get_engine(), backend.sample_rate, stop_flag)
+        while True:
+            item = chunks.get()
+            if item is _done:
+                # the producer may have seen the stop before we did
+                m.interrupted = bool(stop_flag and stop_flag.is_set() and not m.complete)
+                break
+            if isinstance(item, Exception):
+                if m.ttfa_s is None:
+                    raise item
+                # audio already playing: end the utterance early instead of failing
+                logging.warning(f"TTS stream [{m.backend}] broke off mid-utterance: {item}")
+                break
+            if stop_flag and stop_flag.is_set():
+                m.interrupted = True
+                break
+            m.chunks += 1
+            if tee is not None:
+                tee.write(item)
+            _emit(decoder.feed(item))
+        if not m.interrupted:
+            _emit(decoder.close())
+            decoder = None
+        elif hasattr(sink, "abort"):
+            sink.abort()
+    finally:
+        abandoned.set()
+        if decoder is not None and hasattr(decoder, "abort"):
+            decoder.abort()                 # stopped or failed: don't leave ffmpeg and its reader behind
+        if own_sink and sink is not None:
+            sink.close()
+        m.total_s = time.perf_counter() - t0
+
+    ttfa = f"{m.ttfa_s * 1000:.0f}" if m.ttfa_s is not None else "n/a"
+    synth = f"{m.synth_s * 1000:.0f}" if m.synth_s is not None else "n/a"
+    logging.info(f"TTS stream [{m.backend}] ttfa={ttfa}ms synth={synth}ms "
+                 f"audio={m.audio_s:.2f}s chunks={m.chunks} interrupted={m.interrupted} complete={m.complete}")
+    return m
@@ -0,0 +1,218 @@
+# app/tts_worker.py
+"""
+Long-lived asyncio worker for edge_tts.
+
+Instead of asyncio.run() per utterance (new event loop, new connector, new
+DNS lookup every time), one daemon thread owns a persistent event loop and a
+shared aiohttp connector. Jobs are submitted from any thread and come back as
+concurrent.futures.Future objects, so callers can overlap synthesis with
+other work.
+
+Setup overhead is measured per job: `setup_ms` is the time from submission
+until the coroutine is actually running, and `ttfb_ms` the time from there to
+the first audio byte. The legacy asyncio.run() path records the same numbers
+via record_legacy(), so the two can be compared with stats().
+"""
+import time
+import queue
+import asyncio
+import inspect
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Iterator, Optional
+
+from config import cfg
+
+
+def _p50(xs) -> Optional[float]:
+    xs = sorted(xs)
+    return round(xs[len(xs) // 2], 1) if xs else None
+
+
+class _Timings:
+    def __init__(self):
+        self.setup_ms = deque(maxlen=200)
+        self.ttfb_ms = deque(maxlen=200)
+
+    def summary(self) -> dict:
+        return {"n": len(self.setup_ms), "setup_ms_p50": _p50(self.setup_ms), "ttfb_ms_p50": _p50(self.ttfb_ms)}
+
+
+_legacy = _Timings()
+
+
+def record_legacy(setup_ms: float, ttfb_ms: float = None):
+    """Timings from the per-utterance asyncio.run() path, for comparison."""
+    _legacy.setup_ms.append(setup_ms)
+    if ttfb_ms is not None:
+        _legacy.ttfb_ms.append(ttfb_ms)
+
+
+STREAM_QUEUE_CHUNKS = 64      # audio chunks stream() buffers ahead of a slow consumer
+
+
+class TTSWorker:
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._connector = None
+        self._connector_ok = False
+        self.timings = _Timings()
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="TTS_Async", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        loop.run_until_complete(self._setup())
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _setup(self):
+        try:
+            import edge_tts
+            self._connector_ok = "connector" in inspect.signature(edge_tts.Communicate).parameters
+        except Exception:
+            self._connector_ok = False
+        if not self._connector_ok:
+            return
+        try:
+            import aiohttp
+
+            class _SharedConnector(aiohttp.TCPConnector):
+                # edge_tts opens a ClientSession per utterance and that session
+                # closes its connector on exit; keep ours alive across jobs.
+                def close(self):
+                    fut = asyncio.get_running_loop().create_future()
+                    fut.set_result(None)
+                    return fut
+
+            self._connector = _SharedConnector(limit=4, ttl_dns_cache=600, keepalive_timeout=60)
+        except Exception as e:
+            logging.debug(f"Shared TTS connector unavailable: {e}")
+            self._connector_ok = False
+
+    def shutdown(self):
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # ----------------------------
+    # Jobs
+    # ----------------------------
+    def submit(self, coro_fn, *args) -> Future:
+        """Run `coro_fn(*args)` on the worker loop; returns a concurrent Future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro_fn(*args), self._loop)
+
+    def _communicate(self, text: str, voice: str, rate: str):
+        import edge_tts
+        if self._connector_ok and self._connector is not None:
+            return edge_tts.Communicate(text, voice, rate=rate, connector=self._connector)
+        return edge_tts.Communicate(text, voice, rate=rate)
+
+    async def _save(self, text: str, voice: str, rate: str, outfile: str, submitted: float) -> bool:
+        started = time.perf_counter()
+        self.timings.setup_ms.append((started - submitted) * 1000)
+        first = None
+        with open(outfile, "wb") as f:
+            async for chunk in self._communicate(text, voice, rate).stream():
+                if chunk.get("type") == "audio" and chunk.get("data"):
+                    if first is None:
+                        first = time.perf_counter()
+                        self.timings.ttfb_ms.append((first - started) * 1000)
+                    f.write(chunk["data"])
+        return first is not None
+
+    def save(self, text: str, voice: str, outfile: str, rate: str = "+0%") -> Future:
+        """Synthesize `text` into `outfile`; Future resolves to True on success."""
+        return self.submit(self._save, text, voice, rate, outfile, time.perf_counter())
+
+    def stream(self, text: str, voice: str, rate: str = "+0%",
+               max_chunks: int = STREAM_QUEUE_CHUNKS) -> Iterator[bytes]:
+        """
+        Blocking iterator over audio chunks produced on the worker loop. At
+        most `max_chunks` wait for the consumer; when it stops (break,
+        close() or an error) the synthesis on the loop is cancelled.
+        """
+        q: "queue.Queue" = queue.Queue(maxsize=max(1, max_chunks))
+        stop = threading.Event()
+        _done = object()
+        submitted = time.perf_counter()
+
+        async def _put(item) -> bool:
+            # never block the loop on a full queue: other jobs share it
+            while not stop.is_set():
+                try:
+                    q.put_nowait(item)
+                    return True
+                except queue.Full:
+                    await asyncio.sleep(0.01)
+            return False
+
+        async def _pump():
+            started = time.perf_counter()
+            self.timings.setup_ms.append((started - submitted) * 1000)
+            first = True
+            try:
+                async for chunk in self._communicate(text, voice, rate).stream():
+                    if stop.is_set():
+                        return
+                    if chunk.get("type") == "audio" and chunk.get("data"):
+                        if first:
+                            self.timings.ttfb_ms.append((time.perf_counter() - started) * 1000)
+                            first = False
+                        if not await _put(chunk["data"]):
+                            return
+            except Exception as e:
+                await _put(e)
+            finally:
+                if not stop.is_set():
+                    await _put(_done)
+
+        fut = self.submit(_pump)
+        try:
+            while True:
+                item = q.get()
+                if item is _done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            fut.cancel()
+
+    def stats(self) -> dict:
+        return {"worker": self.timings.summary(), "legacy": _legacy.summary(),
+                "shared_connector": bool(self._connector_ok)}
+
+
+_worker: Optional[TTSWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> Optional[TTSWorker]:
+    """Process-wide worker, or None when TTS_WORKER is off (legacy asyncio.run path)."""
+    global _worker
+    if not getattr(cfg, "TTS_WORKER", True):
+        return None
+    with _worker_lock:
+        if _worker is None:
+            _worker = TTSWorker()
+        return _worker
@@ -4,6 +4,7 @@ from zoneinfo import ZoneInfo  # Python 3.9+
 from typing import Tuple, List
 
 from config import cfg
+from thinker.prompt import render_grounding
 from firebase_db import (
     load_facts, get_reminders, get_timezone
 )
@@ -35,23 +36,16 @@ def _format_reminders(limit: int = 5) -> List[str]:
         out.append(f"- {msg} @ {when}")
     return out
 
-def build_grounding_snapshot() -> str:
+def build_grounding_snapshot(user_text: str = "") -> str:
     """
     Returns a short string you can inject as SYSTEM or prepend to USER.
-    Keep it compact to avoid token bloat.
+    Same renderer and token budget as the planner/thinker prompts
+    (thinker.prompt.render_grounding), most relevant items first.
     """
-    human_now, iso_now = _now_str()
-    facts = load_facts() or {}
-    reminders = _format_reminders()
-
-    lines = []
-    lines.append("GROUND TRUTH (authoritative; do not hallucinate):")
-    lines.append(f"- Now: {human_now}")
-    if facts:
-        lines.append("- Facts:")
-        for k, v in list(facts.items())[:20]:  # cap to avoid bloat
-            lines.append(f"  • {k}: {v}")
-    if reminders:
-        lines.append("- Upcoming reminders:")
-        lines += [f"  {r}" for r in reminders]
-    return "\n".join(lines)
+    human_now, _ = _now_str()
+    grounding = {
+        "now_human": human_now,
+        "facts": load_facts() or {},
+        "reminders": get_reminders() or [],
+    }
+    return render_grounding(grounding, user_text)
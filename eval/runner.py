@@ -1,6 +1,6 @@
 ﻿from __future__ import annotations
 import json, os
-from llm import ask_llm_full
+from llm import ask_llm_many, llm_cache_stats, rate_governor_stats, llm_usage
 
 DATA = os.path.join(os.path.dirname(__file__), "datasets", "example.jsonl")
 
@@ -8,17 +8,21 @@ def run_eval():
     if not os.path.exists(DATA):
         print("No dataset found.")
         return
-    good = 0; total = 0
     with open(DATA, "r", encoding="utf-8") as f:
-        for line in f:
-            total += 1
-            row = json.loads(line)
-            q = row.get("question","")
-            gold = row.get("gold","").lower()
-            out = ask_llm_full(q) or ""
-            ans = out.split("assistant\n",1)[-1].strip().lower() if "assistant\n" in out else out.strip().lower()
-            if gold and gold in ans:
-                good += 1
+        rows = [json.loads(line) for line in f if line.strip()]
+    # items are independent: run them concurrently on one connection pool
+    outs = ask_llm_many([row.get("question", "") for row in rows], temperature=0.0,
+                        priority="background", site="eval")
+    good = 0; total = len(rows)
+    for row, out in zip(rows, outs):
+        out = out or ""
+        gold = row.get("gold","").lower()
+        ans = out.split("assistant\n",1)[-1].strip().lower() if "assistant\n" in out else out.strip().lower()
+        if gold and gold in ans:
+            good += 1
     print(f"Eval done: {good}/{total} matched substring.")
+    print(f"LLM cache: {llm_cache_stats()}")
+    print(f"LLM rate governor: {rate_governor_stats()}")
+    print(f"LLM usage: {llm_usage().get('eval')}")
 if __name__ == "__main__":
     run_eval()
@@ -0,0 +1,120 @@
+"""
+Local OpenAI-compatible stub for testing the streaming LLM path offline.
+
+    python eval/sse_stub.py --port 8099 --delay-ms 40
+    LLM_BASE_URL=http://127.0.0.1:8099/v1 python app/main.py
+
+POST /v1/chat/completions answers with REPLY, word by word: as server-sent
+events when the request has "stream": true, otherwise as one JSON body.
+POST /run/predict answers like a Gradio Space ({"data": [REPLY]}), so the
+same stub can stand in for every backend kind in configs/models.yaml;
+--fail-status makes every POST fail with that HTTP status (failover tests).
+"""
+from __future__ import annotations
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = ("Sure, here is a quick answer. The first clause should be spoken before the rest "
+         "of this reply has even been generated, which is the whole point of streaming.")
+
+
+def _make_handler(reply: str, delay_s: float, first_delay_s: float, fail_status: int = 0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"       # keep-alive, like the real endpoint
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, code: int, obj, headers: dict = None):
+            body = json.dumps(obj).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.rstrip("/")
+            if path.endswith("/models"):
+                self._json(200, {"data": [{"id": "stub"}]})
+            elif path.endswith("/config"):
+                self._json(200, {"api_prefix": ""})            # Gradio app config
+            else:
+                self._json(404, {})
+
+        def do_POST(self):
+            path = self.path.rstrip("/")
+            n = int(self.headers.get("Content-Length") or 0)
+            try:
+                req = json.loads(self.rfile.read(n) or b"{}")
+            except ValueError:
+                self.send_error(400)
+                return
+            if fail_status:
+                # like Groq's 429s: tell the client when to come back
+                extra = {"Retry-After": "1", "x-ratelimit-remaining-requests": "0"} if fail_status == 429 else None
+                self._json(fail_status, {"error": "stub failure"}, extra)
+                return
+            words = reply.split(" ")
+            if path.endswith("/run/predict") or path.endswith("/api/predict"):
+                time.sleep(first_delay_s + delay_s * len(words))
+                self._json(200, {"data": [reply]})
+                return
+            if not path.endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            if not req.get("stream"):
+                time.sleep(first_delay_s + delay_s * len(words))
+                self._json(200, {"choices": [{"message": {"role": "assistant", "content": reply}}],
+                                 "usage": {"prompt_tokens": 20, "completion_tokens": len(words),
+                                           "total_tokens": 20 + len(words)}})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")    # unframed body ends with the connection
+            self.end_headers()
+            self.close_connection = True
+            time.sleep(first_delay_s)
+            try:
+                for i, w in enumerate(words):
+                    delta = {"choices": [{"delta": {"content": (" " if i else "") + w}}]}
+                    self.wfile.write(f"data: {json.dumps(delta)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(delay_s)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass            # client cancelled mid-stream
+
+    return Handler
+
+
+def start_stub(port: int = 0, reply: str = REPLY, delay_ms: float = 40, first_delay_ms: float = 150,
+               fail_status: int = 0):
+    """Run the stub on a background thread; returns (server, base_url)."""
+    srv = ThreadingHTTPServer(("127.0.0.1", port),
+                              _make_handler(reply, delay_ms / 1000.0, first_delay_ms / 1000.0, fail_status))
+    threading.Thread(target=srv.serve_forever, name="SSEStub", daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--delay-ms", type=float, default=40)
+    ap.add_argument("--first-delay-ms", type=float, default=150)
+    ap.add_argument("--fail-status", type=int, default=0)
+    a = ap.parse_args()
+    srv, url = start_stub(a.port, delay_ms=a.delay_ms, first_delay_ms=a.first_delay_ms, fail_status=a.fail_status)
+    print(f"SSE stub listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
@@ -1 +1 @@
-﻿__all__ = ["cache", "rate_limit"]
+﻿__all__ = ["cache", "http_client", "rate_limit"]
@@ -0,0 +1,145 @@
+﻿from __future__ import annotations
+import os, time, logging, threading
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Shared keep-alive HTTP sessions for every outbound API.
+#
+#   from infra.http_client import get_session
+#   r = get_session("llm").post(url, json=payload, timeout=(5, 30))
+#
+# One requests.Session per profile ("llm", "web", "learner"), each with
+# per-host connection pools, so DNS + TCP + TLS is paid once per host rather
+# than once per call. Every request records how much of its time went into
+# opening a connection versus waiting on the server; see http_stats().
+
+POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "8"))         # distinct hosts kept per session
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "8"))     # keep-alive connections per host
+
+_tls = threading.local()
+
+
+def _timed_connect(self, base):
+    t = time.perf_counter()
+    base.connect(self)
+    _tls.connect_s = getattr(_tls, "connect_s", 0.0) + (time.perf_counter() - t)
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        _timed_connect(self, HTTPConnection)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):                      # DNS + TCP + TLS handshake
+        _timed_connect(self, HTTPSConnection)
+
+
+class _TimedHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools time new connections."""
+    def init_poolmanager(self, connections, maxsize, block=False, **kw):
+        super().init_poolmanager(connections, maxsize, block=block, **kw)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPPool, "https": _TimedHTTPSPool}
+
+
+class _HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.new_conns = 0
+        self.connect_ms = deque(maxlen=200)   # only requests that opened a connection
+        self.server_ms = deque(maxlen=200)    # time to response headers, minus connect
+
+
+_stats: Dict[str, _HostStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _p50(xs) -> Optional[float]:
+    xs = sorted(xs)
+    return round(xs[len(xs) // 2], 1) if xs else None
+
+
+class TimedSession(requests.Session):
+    def request(self, method, url, *a, **kw):
+        _tls.connect_s = 0.0
+        t = time.perf_counter()
+        r = super().request(method, url, *a, **kw)
+        connect_s = _tls.connect_s
+        head_s = r.elapsed.total_seconds() if r.elapsed else time.perf_counter() - t
+        host = urlsplit(url).netloc
+        with _stats_lock:
+            st = _stats.setdefault(host, _HostStats())
+            st.requests += 1
+            if connect_s > 0:
+                st.new_conns += 1
+                st.connect_ms.append(connect_s * 1000)
+            st.server_ms.append(max(0.0, head_s - connect_s) * 1000)
+        logging.debug(f"HTTP {method} {host}: connect={connect_s * 1000:.0f}ms "
+                      f"server={(head_s - connect_s) * 1000:.0f}ms reused={connect_s == 0}")
+        return r
+
+
+_sessions: Dict[str, TimedSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name: str = "default") -> TimedSession:
+    """Process-wide keep-alive session for one traffic profile."""
+    with _sessions_lock:
+        s = _sessions.get(name)
+        if s is None:
+            s = TimedSession()
+            adapter = PooledAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sessions[name] = s
+        return s
+
+
+def prewarm(url: str, session: str = "default", headers: dict = None, background: bool = True):
+    """
+    Open (and keep) a connection to `url`'s host before it is needed, so the
+    first real request skips DNS/TCP/TLS. Any HTTP status counts as warm.
+    """
+    def _go():
+        try:
+            r = get_session(session).get(url, headers=headers, timeout=(5, 10))
+            r.close()
+            logging.info(f"HTTP pre-warm {urlsplit(url).netloc}: HTTP {r.status_code}")
+        except Exception as e:
+            logging.warning(f"HTTP pre-warm failed for {url}: {e}")
+
+    if not background:
+        _go()
+        return None
+    t = threading.Thread(target=_go, name="HTTP_Prewarm", daemon=True)
+    t.start()
+    return t
+
+
+def http_stats() -> dict:
+    """Per host: requests, connections opened, p50 connect vs server time."""
+    with _stats_lock:
+        return {
+            host: {
+                "requests": st.requests,
+                "new_conns": st.new_conns,
+                "connect_ms_p50": _p50(st.connect_ms),
+                "server_ms_p50": _p50(st.server_ms),
+            }
+            for host, st in _stats.items()
+        }
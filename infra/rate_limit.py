@@ -1,5 +1,8 @@
 ﻿from __future__ import annotations
-import time, threading
+import re, time, heapq, asyncio, itertools, threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
 
 class TokenBucket:
     def __init__(self, rate_per_s: float, capacity: int):
@@ -7,14 +10,226 @@ class TokenBucket:
         self.capacity = capacity
         self.tokens = capacity
         self.lock = threading.Lock()
-        self.last = time.time()
+        self.last = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
 
     def take(self, n: int = 1) -> bool:
         with self.lock:
-            now = time.time()
-            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
-            self.last = now
+            self._refill()
             if self.tokens >= n:
                 self.tokens -= n
                 return True
             return False
+
+    def wait_time(self, n: float = 1) -> float:
+        """Seconds until `n` tokens are available (0 = now)."""
+        with self.lock:
+            self._refill()
+            if self.tokens >= n:
+                return 0.0
+            return (n - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def adjust(self, delta: float, floor: Optional[float] = None):
+        """Add (or with a negative delta, charge) tokens; optionally cap at `floor` from above."""
+        with self.lock:
+            self._refill()
+            self.tokens = max(-self.capacity, min(self.capacity, self.tokens + delta))
+            if floor is not None:
+                self.tokens = min(self.tokens, floor)
+
+
+# ----------------------------
+# Request governor (RPM + TPM, priority queue, server feedback)
+# ----------------------------
+PRIORITIES = {"interactive": 0, "background": 1}
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value) -> Optional[float]:
+    """'7.66s', '2m59.5s', '250ms', '12' or an HTTP date -> seconds."""
+    if value is None:
+        return None
+    s = str(value).strip()
+    try:
+        return max(0.0, float(s))
+    except ValueError:
+        pass
+    parts = _DURATION.findall(s)
+    if parts:
+        mult = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        return sum(float(n) * mult[u] for n, u in parts)
+    try:
+        return max(0.0, parsedate_to_datetime(s).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _pctl(xs, q: float) -> Optional[float]:
+    xs = sorted(xs)
+    return round(xs[min(len(xs) - 1, int(len(xs) * q))], 1) if xs else None
+
+
+class RateGovernor:
+    """
+    Client-side budget for one API key: requests per minute and tokens per
+    minute (0 = no local limit), admitted strictly by priority then arrival.
+
+        if gov.acquire(est_tokens, "background", deadline_s=30):
+            r = post(...)
+            gov.observe(r.status_code, r.headers, est_tokens, usage_tokens)
+
+    Background callers also leave `reserve` of each budget untouched, so a
+    burst of summaries cannot use up what the next voice turn needs.
+    Retry-After and x-ratelimit-* response headers pause admission or
+    shrink the local budget to what the server reports. All timing is
+    time.monotonic().
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, reserve: float = 0.25, name: str = ""):
+        self.name = name
+        self.requests = TokenBucket(rpm / 60.0, rpm) if rpm else None
+        self.tokens = TokenBucket(tpm / 60.0, tpm) if tpm else None
+        self.reserve = max(0.0, min(0.9, float(reserve)))
+        self.blocked_until = 0.0
+        self._cv = threading.Condition()
+        self._queue: list = []                     # heap of (priority, seq)
+        self._seq = itertools.count()
+        self.admitted = {p: 0 for p in PRIORITIES}
+        self.timeouts = {p: 0 for p in PRIORITIES}
+        self.throttled = 0                          # 429s seen
+        self.wait_ms = {p: deque(maxlen=200) for p in PRIORITIES}
+
+    # ----------------------------
+    # Admission
+    # ----------------------------
+    def _needed_wait(self, est: float, prio: int) -> float:
+        wait = max(0.0, self.blocked_until - time.monotonic())
+        if self.requests is not None:
+            held = self.reserve * self.requests.capacity if prio else 0.0
+            wait = max(wait, self.requests.wait_time(1 + held))
+        if self.tokens is not None and est:
+            held = self.reserve * self.tokens.capacity if prio else 0.0
+            wait = max(wait, self.tokens.wait_time(min(est, self.tokens.capacity * (1 - self.reserve)) + held))
+        return wait
+
+    def _try_locked(self, ticket, est: float) -> float:
+        """Admit `ticket` if it is first in line and the budget allows; 0 on success, else seconds to wait."""
+        if self._queue[0] != ticket:
+            return 0.25                             # woken when the head moves
+        wait = self._needed_wait(est, ticket[0])
+        if wait > 0:
+            return wait
+        if self.requests is not None:
+            self.requests.adjust(-1)
+        if self.tokens is not None and est:
+            self.tokens.adjust(-est)
+        heapq.heappop(self._queue)
+        self._cv.notify_all()
+        return 0.0
+
+    def _give_up_locked(self, ticket, label: str):
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self.timeouts[label] += 1
+        self._cv.notify_all()
+
+    def acquire(self, est_tokens: float = 0, priority: str = "interactive", deadline_s: float = None) -> bool:
+        """Block until admitted (True) or until `deadline_s` passes (False)."""
+        label = priority if priority in PRIORITIES else "interactive"
+        t0 = time.monotonic()
+        t_end = t0 + deadline_s if deadline_s is not None else float("inf")
+        with self._cv:
+            ticket = (PRIORITIES[label], next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            while True:
+                wait = self._try_locked(ticket, est_tokens)
+                if wait == 0.0:
+                    self._admitted(label, t0)
+                    return True
+                left = t_end - time.monotonic()
+                if left <= 0 or (wait > left and self._queue[0] == ticket):
+                    self._give_up_locked(ticket, label)      # won't fit: let the caller fail over now
+                    return False
+                self._cv.wait(min(wait, left, 1.0))
+
+    async def aacquire(self, est_tokens: float = 0, priority: str = "interactive", deadline_s: float = None) -> bool:
+        """acquire() for coroutines: sleeps on the event loop instead of blocking a thread."""
+        label = priority if priority in PRIORITIES else "interactive"
+        t0 = time.monotonic()
+        t_end = t0 + deadline_s if deadline_s is not None else float("inf")
+        with self._cv:
+            ticket = (PRIORITIES[label], next(self._seq))
+            heapq.heappush(self._queue, ticket)
+        try:
+            while True:
+                with self._cv:
+                    wait = self._try_locked(ticket, est_tokens)
+                    if wait == 0.0:
+                        self._admitted(label, t0)
+                        return True
+                    left = t_end - time.monotonic()
+                    if left <= 0 or (wait > left and self._queue[0] == ticket):
+                        self._give_up_locked(ticket, label)
+                        return False
+                await asyncio.sleep(min(wait, left, 0.1))
+        except asyncio.CancelledError:
+            with self._cv:
+                if ticket in self._queue:
+                    self._give_up_locked(ticket, label)
+            raise
+
+    def _admitted(self, label: str, t0: float):
+        self.admitted[label] += 1
+        self.wait_ms[label].append((time.monotonic() - t0) * 1000)
+
+    # ----------------------------
+    # Server feedback
+    # ----------------------------
+    def observe(self, status: int, headers: Optional[Mapping] = None, est_tokens: float = 0,
+                used_tokens: Optional[float] = None):
+        """Adapt to the response: Retry-After / rate-limit headers and the real token count."""
+        h = headers or {}
+        now = time.monotonic()
+        if status == 429 or (status == 503 and h.get("retry-after")):
+            self.throttled += 1 if status == 429 else 0
+            pause = parse_duration(h.get("retry-after"))
+            if pause is None:
+                pause = max(parse_duration(h.get("x-ratelimit-reset-requests")) or 0,
+                            parse_duration(h.get("x-ratelimit-reset-tokens")) or 0) or 2.0
+            with self._cv:
+                self.blocked_until = max(self.blocked_until, now + min(pause, 300.0))
+                self._cv.notify_all()
+        rem_req = h.get("x-ratelimit-remaining-requests")
+        if self.requests is not None and rem_req is not None:
+            try:
+                self.requests.adjust(0, floor=float(rem_req))
+            except ValueError:
+                pass
+        rem_tok = h.get("x-ratelimit-remaining-tokens")
+        if self.tokens is not None and rem_tok is not None:
+            try:
+                self.tokens.adjust(0, floor=float(rem_tok))
+            except ValueError:
+                pass
+        if self.tokens is not None and used_tokens is not None and est_tokens:
+            self.tokens.adjust(est_tokens - used_tokens)       # settle the estimate
+
+    def stats(self) -> dict:
+        with self._cv:
+            queued = {p: sum(1 for q, _ in self._queue if q == v) for p, v in PRIORITIES.items()}
+        return {
+            "queued": queued,
+            "admitted": dict(self.admitted),
+            "timeouts": dict(self.timeouts),
+            "throttled_429": self.throttled,
+            "paused_s": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+            "wait_ms_p50": {p: _pctl(self.wait_ms[p], 0.5) for p in PRIORITIES},
+            "wait_ms_p95": {p: _pctl(self.wait_ms[p], 0.95) for p in PRIORITIES},
+            "requests_left": round(self.requests.tokens, 1) if self.requests else None,
+            "tokens_left": round(self.tokens.tokens) if self.tokens else None,
+        }
@@ -1,6 +1,7 @@
 ﻿from __future__ import annotations
 from typing import Tuple
-import re, requests, urllib.parse
+import re, urllib.parse
+from infra.http_client import get_session
 
 def _html_title(html: str) -> str:
     m = re.search(r"<title>(.*?)</title>", html, flags=re.I|re.S)
@@ -14,7 +15,7 @@ def fetch_and_extract(url: str) -> Tuple[str, str, str]:
     Uses trafilatura if available; otherwise basic HTML strip fallback.
     """
     try:
-        r = requests.get(url, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
+        r = get_session("learner").get(url, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
         r.raise_for_status()
         html = r.text
     except Exception:
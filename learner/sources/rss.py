@@ -1,13 +1,13 @@
 ﻿from __future__ import annotations
 from typing import List
 import xml.etree.ElementTree as ET
-import requests
+from infra.http_client import get_session
 
 def fetch_feed_urls(feed_url: str) -> List[str]:
     """Minimal RSS/Atom fetcher: returns entry links (best-effort)."""
     urls: List[str] = []
     try:
-        r = requests.get(feed_url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
+        r = get_session("learner").get(feed_url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
         r.raise_for_status()
         root = ET.fromstring(r.text)
 
@@ -1,22 +1,161 @@
 ﻿from __future__ import annotations
-import re, os
-from typing import Literal
+import re, os, time, threading
+from collections import deque
+from typing import Dict, Literal, Optional
 
-from llm import ask_llm_full
+from llm import ask_llm_full, ask_llm_hedged, ask_llm_cancellable, cached_reply, remember_reply
 from config import cfg
+from telemetry.logger import log_event
 
 # Optional heavier model name via env; fallback to cfg.GROQ_MODEL
 HEAVY_MODEL = os.getenv("GROQ_MODEL_HEAVY", "llama-3.1-70b-versatile")
 
-def pick_style(query: str) -> dict:
+_HEAVY_HINT = re.compile(r"\bwhy|how|design|explain|plan|strategy\b")
+_MIN_SAMPLES = 5          # below this the heavy model is tried regardless of its p90
+_MAX_ERROR_RATE = 0.3
+
+
+class ModelStats:
+    """
+    Rolling latency / error window for one model. Samples older than
+    `max_age_s` drop out, so a bad spell is forgotten even when the model
+    is no longer being routed to.
+    """
+    def __init__(self, window: int = 50, max_age_s: float = None):
+        self.latency_s = deque(maxlen=window)     # (t, seconds) of successful calls
+        self.errors = deque(maxlen=window)        # (t, 1 = failed call)
+        self.max_age_s = float(max_age_s if max_age_s is not None else getattr(cfg, "ROUTER_STATS_MAX_AGE_S", 600))
+        self.skipped = 0                          # eligible queries routed away since the last try
+        self.lock = threading.Lock()
+
+    def _prune_locked(self):
+        cutoff = time.monotonic() - self.max_age_s
+        for dq in (self.latency_s, self.errors):
+            while dq and dq[0][0] < cutoff:
+                dq.popleft()
+
+    def record(self, latency_s: float, ok: bool):
+        now = time.monotonic()
+        with self.lock:
+            self.errors.append((now, 0 if ok else 1))
+            if ok:
+                self.latency_s.append((now, latency_s))
+
+    def n(self) -> int:
+        with self.lock:
+            self._prune_locked()
+            return len(self.latency_s)
+
+    def p90(self) -> Optional[float]:
+        with self.lock:
+            self._prune_locked()
+            xs = sorted(v for _, v in self.latency_s)
+        return xs[min(len(xs) - 1, int(len(xs) * 0.9))] if xs else None
+
+    def error_rate(self) -> float:
+        with self.lock:
+            self._prune_locked()
+            return sum(v for _, v in self.errors) / len(self.errors) if self.errors else 0.0
+
+    def snapshot(self) -> dict:
+        p90 = self.p90()
+        return {"n": self.n(), "p90_s": round(p90, 3) if p90 is not None else None,
+                "error_rate": round(self.error_rate(), 3)}
+
+
+_stats: Dict[str, ModelStats] = {}
+
+
+def model_stats(model: str) -> ModelStats:
+    return _stats.setdefault(model, ModelStats())
+
+
+def router_stats() -> dict:
+    return {m: st.snapshot() for m, st in _stats.items()}
+
+
+def _needs_heavy(t: str) -> bool:
+    return len(t) > 250 or bool(_HEAVY_HINT.search(t))
+
+
+def pick_style(query: str, budget_s: float = None) -> dict:
+    """
+    Light model by default. The heavy model is chosen only when the query
+    looks like it needs it AND its recent p90 latency fits the turn's budget
+    (and it is not failing). While it is skipped, 1 in ROUTER_PROBE_EVERY
+    eligible queries still goes to it, so its stats can recover. Every
+    decision is logged as an "llm_route" event.
+    """
     t = (query or "").lower()
-    # simple heuristics
-    if len(t) > 250 or re.search(r"\bwhy|how|design|explain|plan|strategy\b", t):
-        return {"model": HEAVY_MODEL, "temperature": 0.5}
-    return {"model": cfg.GROQ_MODEL, "temperature": cfg.LLM_TEMPERATURE}
-
-def call_llm_with_style(prompt: str, style: dict) -> str:
-    # Your ask_llm_full uses cfg.* internally; keep a single entry for now.
-    # If you later add per-call model selection, route here.
-    out = ask_llm_full(prompt) or ""
+    budget = float(budget_s if budget_s is not None else getattr(cfg, "TURN_LATENCY_BUDGET_S", 6.0))
+    light = {"model": cfg.GROQ_MODEL, "temperature": cfg.LLM_TEMPERATURE}
+    style, reason = light, "simple query"
+
+    if _needs_heavy(t) and HEAVY_MODEL and HEAVY_MODEL != cfg.GROQ_MODEL:
+        st = model_stats(HEAVY_MODEL)
+        p90, err = st.p90(), st.error_rate()
+        heavy = {"model": HEAVY_MODEL, "temperature": 0.5}
+        if st.n() < _MIN_SAMPLES:
+            style, reason = heavy, "heavy: warming stats"
+        elif err > _MAX_ERROR_RATE:
+            reason = f"heavy skipped: error rate {err:.0%}"
+        elif p90 > budget:
+            reason = f"heavy skipped: p90 {p90:.1f}s > budget {budget:.1f}s"
+        else:
+            style, reason = heavy, f"heavy: p90 {p90:.1f}s fits {budget:.1f}s"
+        if style is heavy:
+            st.skipped = 0
+        else:
+            st.skipped += 1
+            if st.skipped >= int(getattr(cfg, "ROUTER_PROBE_EVERY", 10)):
+                st.skipped = 0
+                style, reason = heavy, f"heavy probe ({reason.split(': ', 1)[-1]})"
+
+    log_event("llm_route", {
+        "model": style["model"], "reason": reason, "budget_s": budget, "query_chars": len(t),
+        "stats": {m: model_stats(m).snapshot() for m in {cfg.GROQ_MODEL, HEAVY_MODEL}},
+    })
+    return style
+
+
+def call_llm_with_style(prompt: str, style: dict, on_gate=None, site: str = "thinker",
+                        cancel=None, progress: dict = None) -> str:
+    """
+    Run `prompt` on the style's model/temperature/max_tokens and record its
+    latency (and, under `site`, its usage in the ledger). With `on_gate`
+    (filler callback) or LLM_HEDGE on, the call is latency-gated: see
+    llm.ask_llm_hedged(). With `cancel` (threading.Event) the reply is
+    streamed and dropped once the event is set (speculation).
+    Cacheable calls (llm.ResponseCache: temperature 0 under LLM_CACHE=auto)
+    are answered from the cache whichever way they would have been sent;
+    a hit records no latency for the model.
+    """
+    model = style.get("model") or cfg.GROQ_MODEL
+    sampling = {"temperature": style.get("temperature"), "max_tokens": style.get("max_tokens")}
+    opts = {"model": model, **sampling, "site": site}
+    hit = cached_reply(prompt, **opts)
+    if hit is not None:
+        return _strip_role(hit)
+    t0 = time.perf_counter()
+    answered_by = model
+    if cancel is not None:
+        out = ask_llm_cancellable(prompt, cancel, progress, **opts)
+        if not cancel.is_set():
+            model_stats(model).record(time.perf_counter() - t0, ok=out is not None)
+    elif on_gate is not None or getattr(cfg, "LLM_HEDGE", False):
+        outcome: dict = {}
+        out = ask_llm_hedged(prompt, on_gate=on_gate, outcome=outcome, **opts)
+        answered_by = outcome.get("model") or model
+        # a hedge win says nothing about this model's latency, only that it was slow
+        if outcome.get("winner") != "hedge":
+            model_stats(model).record(time.perf_counter() - t0, ok=out is not None)
+    else:
+        out = ask_llm_full(prompt, cache=False, **opts)
+        model_stats(model).record(time.perf_counter() - t0, ok=out is not None)
+    if out:
+        remember_reply(prompt, out, model=answered_by, **sampling)
+    return _strip_role(out or "")
+
+
+def _strip_role(out: str) -> str:
     return out.split("assistant\n",1)[-1].strip() if "assistant\n" in out else out.strip()
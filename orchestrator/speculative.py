@@ -0,0 +1,222 @@
+﻿# orchestrator/speculative.py
+"""
+Speculative turns: start the LLM on a partial transcript that has stopped
+changing, and keep the result if the final transcript says the same thing.
+
+    spec = Speculator(history)
+    for partial in stt_stream:          # interim results from a streaming recognizer
+        spec.on_partial(partial)
+    result = spec.finalize(final_text, on_filler=speak_filler)   # TurnResult, as handle_turn
+
+A partial that is unchanged (after normalization) for SPECULATIVE_STABLE_MS
+starts plan_and_answer() in the background. finalize() commits it when the
+normalized final text matches and cancels it otherwise; either way the
+turn itself runs through handle_turn(), so memory writes and tool calls
+only ever happen for the final text. Only LLM-bound turns are speculated
+(no quick local answer, no memory write, no confident fast plan).
+Hit rate, latency saved and tokens wasted: speculation_stats().
+
+Not called from app/main.py yet: the faster-whisper path transcribes each
+utterance once, after it ends, so there are no interim results to feed
+on_partial(). It is ready for a streaming recognizer.
+"""
+from __future__ import annotations
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from config import cfg
+from memory_catcher import catch_memory
+from agent.affect import detect_affect
+from agent.fast_planner import fast_plan
+from agent.memory.retriever import build_grounding
+from thinker.state import TurnState
+from thinker.controller import plan_and_answer
+from llm import llm_available
+from orchestrator.turn import TurnResult, handle_turn, _maybe_local_answer
+from telemetry.logger import log_event
+
+_PUNCT = re.compile(r"[^\w\s']+")
+_FILLERS = re.compile(r"\b(?:um+|uh+|erm+|hmm+)\b")
+
+# a cancelled speculation can still be waiting on its first token; keep a spare worker
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="Speculate")
+
+
+def normalize(text: str) -> str:
+    """Compare transcripts modulo case, punctuation, hesitations and spacing."""
+    t = _FILLERS.sub(" ", _PUNCT.sub(" ", (text or "").lower()))
+    return " ".join(t.split())
+
+
+def _llm_bound(text: str) -> bool:
+    """Would handle_turn() reach the LLM for this text? (mirrors its early exits)"""
+    if _maybe_local_answer(text):
+        return False
+    parsed = catch_memory(text)
+    if any(parsed.get(k) for k in ("facts", "reminders", "events", "moods")):
+        return False
+    return bool(getattr(cfg, "TURN_SINGLE_PASS", True)) and llm_available()
+
+
+@dataclass
+class _Speculation:
+    text: str
+    norm: str
+    cancel: threading.Event = field(default_factory=threading.Event)
+    progress: Dict[str, Any] = field(default_factory=dict)
+    t_start: float = field(default_factory=time.perf_counter)
+    t_done: Optional[float] = None
+    future: Any = None
+
+
+class Speculator:
+    """Per-utterance speculation; call on_partial() for interim text, finalize() once."""
+
+    def __init__(self, history_ref: List[Dict[str, str]], channel: str = "voice",
+                 stable_ms: Optional[int] = None):
+        self.history = history_ref
+        self.channel = channel
+        self.stable_s = (stable_ms if stable_ms is not None
+                         else int(getattr(cfg, "SPECULATIVE_STABLE_MS", 350))) / 1000.0
+        self.enabled = bool(getattr(cfg, "SPECULATIVE", False))
+        self._lock = threading.Lock()
+        self._text = ""
+        self._norm = ""
+        self._timer: Optional[threading.Timer] = None
+        self._spec: Optional[_Speculation] = None
+
+    # ----------------------------
+    # Interim transcript
+    # ----------------------------
+    def on_partial(self, text: str):
+        if not self.enabled:
+            return
+        norm = normalize(text)
+        with self._lock:
+            if not norm or norm == self._norm:
+                return                              # unchanged: let the stability timer run
+            self._text, self._norm = text, norm
+            if self._spec is not None:
+                self._drop_locked("changed")        # the user kept talking
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.stable_s, self._on_stable, args=(norm,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_stable(self, norm: str):
+        with self._lock:
+            if norm != self._norm or self._spec is not None:
+                return
+            text = self._text
+        try:
+            if not _llm_bound(text):
+                return
+        except Exception as e:
+            log_event("speculation_error", {"where": "eligibility", "error": str(e)})
+            return
+        spec = _Speculation(text=text, norm=norm)
+        with self._lock:
+            if norm != self._norm or self._spec is not None:
+                return                              # transcript moved while we checked
+            self._spec = spec
+            spec.future = _pool.submit(self._run, spec)
+        _stats.started()
+
+    def _run(self, spec: _Speculation):
+        try:
+            grounding = build_grounding()
+            affect = detect_affect(spec.text)
+            mode = str(getattr(cfg, "FAST_PLANNER", "on")).lower()
+            fast = fast_plan(spec.text, grounding, affect) if mode == "on" else None
+            if fast is not None and fast.confidence >= float(getattr(cfg, "FAST_PLANNER_THRESHOLD", 0.8)):
+                return None                         # handle_turn will answer locally anyway
+            state = TurnState(user_text=spec.text, history=list(self.history), affect=affect or {},
+                              channel=self.channel)
+            return plan_and_answer(state, grounding, cancel=spec.cancel, progress=spec.progress,
+                                   site="speculative")
+        finally:
+            spec.t_done = time.perf_counter()
+
+    def _drop_locked(self, reason: str):
+        spec, self._spec = self._spec, None
+        spec.cancel.set()
+        wasted = spec.progress.get("prompt_tokens", 0) + (spec.progress.get("chars", 0) + 3) // 4
+        _stats.missed(wasted)
+        log_event("speculation", {"hit": False, "reason": reason, "wasted_tokens": wasted,
+                                  "ms": round((time.perf_counter() - spec.t_start) * 1000)})
+
+    # ----------------------------
+    # Final transcript
+    # ----------------------------
+    def finalize(self, final_text: str, on_filler=None) -> TurnResult:
+        """Run the turn for `final_text`, reusing a matching speculation."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            spec = self._spec
+            self._spec, self._timer, self._text, self._norm = None, None, "", ""
+        plan = None
+        if spec is not None and spec.norm == normalize(final_text):
+            t_final = time.perf_counter()
+            try:
+                plan = spec.future.result(timeout=float(getattr(cfg, "LLM_READ_TIMEOUT", 30)))
+            except Exception as e:
+                log_event("speculation_error", {"where": "result", "error": str(e)})
+            # the head start: how long the call had already been running when the final text came in
+            saved_ms = round(max(0.0, min(spec.t_done or t_final, t_final) - spec.t_start) * 1000)
+            _stats.hit(saved_ms if plan is not None else 0)
+            log_event("speculation", {"hit": True, "usable": plan is not None, "saved_ms": saved_ms})
+        elif spec is not None:
+            with self._lock:
+                self._spec = spec
+                self._drop_locked("final_differs")
+        return handle_turn(final_text, self.history, on_filler, channel=self.channel, plan=plan)
+
+    def reset(self):
+        """Abandon the utterance (barge-in, empty final) and cancel any speculation."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            if self._spec is not None:
+                self._drop_locked("reset")
+            self._timer, self._text, self._norm = None, "", ""
+
+
+# ----------------------------
+# Stats
+# ----------------------------
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.t = {"started": 0, "hits": 0, "misses": 0, "saved_ms": 0, "wasted_tokens": 0}
+
+    def started(self):
+        with self._lock:
+            self.t["started"] += 1
+
+    def hit(self, saved_ms: int):
+        with self._lock:
+            self.t["hits"] += 1
+            self.t["saved_ms"] += saved_ms
+
+    def missed(self, wasted_tokens: int):
+        with self._lock:
+            self.t["misses"] += 1
+            self.t["wasted_tokens"] += wasted_tokens
+
+
+_stats = _Stats()
+
+
+def speculation_stats() -> dict:
+    with _stats._lock:
+        t = dict(_stats.t)
+    done = t["hits"] + t["misses"]
+    t["hit_rate"] = round(t["hits"] / done, 3) if done else None
+    t["saved_ms_avg"] = round(t["saved_ms"] / t["hits"]) if t["hits"] else None
+    return t
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from config import cfg
@@ -10,25 +12,17 @@ from config import cfg
 # ---- Agent / Thinker / Memory glue ----
 from memory_catcher import catch_memory                    # regex/quick parse
 from agent.planner import plan_turn                        # high-level plan
+from agent.fast_planner import fast_plan, same_plan, record_turn  # rule-based planner
 from agent.affect import detect_affect                     # tone/emotion
-from agent.skills.registry import get as get_skill         # tool registry
+from agent.skills.registry import get as get_skill, is_read_only  # tool registry
 from agent.memory.retriever import build_grounding         # facts+now+reminders
 from thinker.state import TurnState
-from thinker.controller import think_and_act               # final LLM reply
-from llm import llm_is_up                                  # health gate
+from thinker.controller import think_and_act, plan_and_answer  # final LLM reply / single pass
+from llm import llm_available                              # health gate (circuit breaker)
 from agent.tools import TOOL_FUNCTIONS
+from reminder_audio import prepare_reminder                # pre-render announcements
+from telemetry.logger import log_event
 
-...
-
-if plan.tool_call:
-    tool_name = plan.tool_call.name
-    args = plan.tool_call.args
-    tool_fn = TOOL_FUNCTIONS.get(tool_name)
-    if tool_fn:
-        tool_result = tool_fn(args)
-        reply = tool_result or plan.response_hint
-    else:
-        reply = f"Sorry, I don’t know how to handle the tool '{tool_name}'."
 
 # ---- Firestore (optional) ----
 if cfg.FIRESTORE_ENABLED:
@@ -115,6 +109,29 @@ def _dispatch_tool(tool_call) -> Dict[str, Any]:
         return {"ok": False, "error": str(e)}
 
 
+# tool calls dispatched while the planner is still streaming (PLANNER_STREAM)
+_early_tools = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ToolEarly")
+
+
+def _dispatch_early(early: Dict[str, Any], tc) -> None:
+    """
+    Start a read-only tool as soon as the planner has streamed its call, so
+    its result (get_time's answers the turn) is ready when the plan ends.
+    Tools that write wait for the finished plan: a half-generated plan is
+    not a commitment to act.
+    """
+    if tc.name not in early and is_read_only(tc.name):
+        early[tc.name] = _early_tools.submit(_dispatch_tool, tc)
+
+
+# spoken when a planned tool call fails
+_TOOL_FAILED = {
+    "save_fact": "Sorry, I couldn't save that just now.",
+    "add_reminder": "Sorry, I couldn't set that reminder just now.",
+    "set_assistant_name": "Sorry, I couldn't change my name just now.",
+}
+
+
 def _apply_memory(parsed: Dict[str, Any]) -> List[str]:
     """Apply writes to Firestore based on catch_memory() output; return confirmations."""
     acks: List[str] = []
@@ -130,6 +147,7 @@ def _apply_memory(parsed: Dict[str, Any]) -> List[str]:
     for r in parsed.get("reminders", []):
         try:
             add_reminder(r["text"], r["when_iso"])
+            prepare_reminder(r["text"], r["when_iso"])
             acks.append(f"reminder '{r['text']}' @ {r['when_iso']}")
         except Exception:
             pass
@@ -172,16 +190,26 @@ class TurnResult:
     grounding: Optional[Dict[str, Any]] = None
     affect: Optional[Dict[str, Any]] = None
     confirmations: Optional[List[str]] = None
+    spoken: bool = False                  # reply was already spoken while it streamed (on_stream)
 
 
-def handle_turn(user_text: str, history_ref: List[Dict[str, str]]) -> TurnResult:
+def handle_turn(user_text: str, history_ref: List[Dict[str, str]], on_filler=None,
+                channel: str = "voice", plan: Any = None, on_stream=None) -> TurnResult:
     """
     The central brain for a single user turn.
     - Runs quick answers (time/facts)
     - Applies memory writes (facts/reminders/moods/events)
-    - Plans tool usage; dispatches tools
+    - Plans tool usage; dispatches tools (TURN_SINGLE_PASS: plan and answer
+      come from one LLM call; the Thinker only runs if that reply is unusable)
     - Falls back to Thinker (LLM) with grounding
-    Returns TurnResult (text + metadata). Does NOT speak or touch audio.
+    Returns TurnResult (text + metadata). Does not touch audio itself;
+    `on_stream(deltas) -> str` (SPEAK_STREAMING), if given, is handed the
+    LLM reply as it generates and returns what it spoke (result.spoken).
+    `on_filler()` is called if the LLM misses FILLER_LATENCY_GATE_S so the
+    caller can say something in the meantime. `channel` ("voice" or "text")
+    sets how long an LLM reply may get (thinker.budget). `plan`, if given,
+    is a single-pass Plan already computed for this text (committed
+    speculation, orchestrator/speculative.py) and replaces step 3's LLM call.
     """
     # 0) quick answers first
     quick = _maybe_local_answer(user_text)
@@ -199,15 +227,48 @@ def handle_turn(user_text: str, history_ref: List[Dict[str, str]]) -> TurnResult
     if acks:
         return TurnResult(reply="Got it! I’ll remember: " + "; ".join(acks) + ".", affect=affect, grounding=grounding, confirmations=acks)
 
-    # 3) high-level plan (which may ask to run a tool)
-    plan = plan_turn(user_text, grounding, affect)
+    # 3) plan: one completion that is either a tool call or the answer (TURN_SINGLE_PASS),
+    #    or the classic JSON plan followed by the Thinker in step 5
+    #    A confident rule-based plan skips the LLM planner (FAST_PLANNER=on); in
+    #    "shadow" mode it is only compared against the LLM's plan.
+    state = TurnState(user_text=user_text, history=history_ref, affect=affect or {}, channel=channel)
+    early: Dict[str, Any] = {}       # tool name -> Future of a dispatch started mid-stream
+    fast_mode = str(getattr(cfg, "FAST_PLANNER", "on")).lower()
+    t0 = time.perf_counter()
+    fast = fast_plan(user_text, grounding, affect) if fast_mode in ("on", "shadow") else None
+    confident = fast is not None and fast.confidence >= float(getattr(cfg, "FAST_PLANNER_THRESHOLD", 0.8))
+    if plan is not None:
+        log_event("turn_plan", {"mode": "speculative", "intent": plan.intent, "usable": True})
+    elif confident and fast_mode == "on":
+        plan = fast
+        record_turn(local=True)
+        log_event("turn_plan", {"mode": "local", "intent": plan.intent, "confidence": plan.confidence,
+                                "ms": round((time.perf_counter() - t0) * 1000, 2), "usable": True})
+    else:
+        single = bool(getattr(cfg, "TURN_SINGLE_PASS", True))
+        t0 = time.perf_counter()
+        if single:
+            if not llm_available():
+                human_now, _ = _now_human_and_iso()
+                return TurnResult(reply=f"My model brain is warming up. Meanwhile, the time is {human_now}.", affect=affect, grounding=grounding)
+            plan = plan_and_answer(state, grounding, on_gate=on_filler, on_stream=on_stream)
+        else:
+            plan = plan_turn(user_text, grounding, affect,
+                             on_tool_call=lambda tc: _dispatch_early(early, tc))
+        ms = (time.perf_counter() - t0) * 1000
+        agree = same_plan(fast, plan) if confident else None
+        record_turn(local=False, llm_plan_ms=ms, shadow_agree=agree)
+        log_event("turn_plan", {"mode": "single" if single else "two_pass", "ms": round(ms), "usable": plan is not None})
+        if agree is not None:
+            log_event("fast_plan_shadow", {"agree": agree, "fast_intent": fast.intent, "confidence": fast.confidence,
+                                           "fast_tool": fast.tool_call.name if fast.tool_call else None,
+                                           "llm_tool": plan.tool_call.name if plan and plan.tool_call else None})
 
     tool = getattr(plan, "tool_call", None) or (isinstance(plan, dict) and plan.get("tool_call"))
     if tool:
-        result = _dispatch_tool(tool)
-
         # common confirmations
         name = getattr(tool, "name", None) or (isinstance(tool, dict) and tool.get("name"))
+        result = early[name].result() if name in early else _dispatch_tool(tool)
         if result.get("ok"):
             if name == "set_assistant_name":
                 new_name = (getattr(tool, "args", None) or {}).get("name") or (isinstance(tool, dict) and (tool.get("args") or {}).get("name")) or "Assistant"
@@ -220,21 +281,31 @@ def handle_turn(user_text: str, history_ref: List[Dict[str, str]]) -> TurnResult
             if name == "add_reminder":
                 args = getattr(tool, "args", None) or (isinstance(tool, dict) and tool.get("args")) or {}
                 return TurnResult(reply=f"Reminder set: {args.get('text','')} at {args.get('when_iso','')}.", used_tool=name, tool_result=result, affect=affect, grounding=grounding)
+            if name == "get_time" and result.get("now_human"):
+                return TurnResult(reply=f"The current time is {result['now_human']}.", used_tool=name, tool_result=result, affect=affect, grounding=grounding)
 
-        # tool failed or unhandled → continue to LLM
+        # the plan's reply was written before the tool ran: it never confirms a failed write
         if not result.get("ok"):
-            pass
+            log_event("tool_failed", {"tool": name, "error": str(result.get("error", ""))[:200]})
+            return TurnResult(reply=_TOOL_FAILED.get(name, "Sorry, that didn't work."), used_tool=name,
+                              tool_result=result, affect=affect, grounding=grounding)
+        # succeeded without a canned confirmation → the Thinker answers (step 5)
 
-    # 4) if planner left a hint, we can answer quickly
-    hint = getattr(plan, "response_hint", None) or (isinstance(plan, dict) and plan.get("response_hint"))
+    # 4) if planner left a hint (and no tool), we can answer quickly
+    hint = None if tool else getattr(plan, "response_hint", None) or (isinstance(plan, dict) and plan.get("response_hint"))
     if hint:
-        return TurnResult(reply=hint, affect=affect, grounding=grounding)
+        return TurnResult(reply=hint, affect=affect, grounding=grounding, spoken=bool(getattr(plan, "spoken", False)))
 
     # 5) final: LLM “thinking” via Thinker
-    if not llm_is_up(retries=1, wait_per_try=1):
+    if not llm_available():
         human_now, _ = _now_human_and_iso()
         return TurnResult(reply=f"My model brain is warming up. Meanwhile, the time is {human_now}.", affect=affect, grounding=grounding)
 
-    state = TurnState(user_text=user_text, history=history_ref, affect=affect or {})
-    llm_reply = think_and_act(state, grounding)
-    return TurnResult(reply=llm_reply, affect=affect, grounding=grounding)
+    spoken: List[str] = []
+
+    def _speak(deltas):
+        spoken.append(on_stream(deltas) or "")
+        return spoken[-1]
+
+    llm_reply = think_and_act(state, grounding, on_gate=on_filler, on_stream=_speak if on_stream else None)
+    return TurnResult(reply=llm_reply, affect=affect, grounding=grounding, spoken=any(spoken))
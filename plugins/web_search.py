@@ -1,6 +1,7 @@
 ﻿from __future__ import annotations
 from typing import List, Dict
-import os, requests
+import os
+from infra.http_client import get_session
 
 # Uses SerpAPI if SERPAPI_KEY present; otherwise returns [].
 API_KEY = os.getenv("SERPAPI_KEY", "")
@@ -11,7 +12,7 @@ def web_search(query: str, count: int = 3) -> List[Dict]:
     url = "https://serpapi.com/search.json"
     params = {"engine": "google", "q": query, "num": count, "api_key": API_KEY}
     try:
-        r = requests.get(url, params=params, timeout=20)
+        r = get_session("web").get(url, params=params, timeout=20)
         r.raise_for_status()
         data = r.json()
         out = []
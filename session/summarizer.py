@@ -1,12 +1,10 @@
 ﻿from __future__ import annotations
 from typing import List, Dict
-from llm import ask_llm_full
+from llm import ask_llm_full, ask_llm_async
 
 SYSTEM = """You summarize dialogue. Keep it concise, preserve facts & user preferences."""
 
-def summarize_history(history: List[Dict[str, str]], max_chars: int = 1200) -> str:
-    if not history:
-        return ""
+def _summary_prompt(history: List[Dict[str, str]]) -> str:
     # Prepare compact transcript
     lines = []
     for m in history[-20:]:
@@ -14,6 +12,21 @@ def summarize_history(history: List[Dict[str, str]], max_chars: int = 1200) -> s
         content = (m.get("content") or "").strip().replace("\n", " ")
         lines.append(f"{role}: {content}")
     transcript = "\n".join(lines)[-3000:]
-    prompt = f"{SYSTEM}\n\nTranscript:\n{transcript}\n\nReturn a short summary capturing key facts, preferences, tasks."
-    out = ask_llm_full(prompt) or ""
+    return f"{SYSTEM}\n\nTranscript:\n{transcript}\n\nReturn a short summary capturing key facts, preferences, tasks."
+
+def _clean(out: str) -> str:
+    out = out or ""
     return out.split("assistant\n", 1)[-1].strip() if "assistant\n" in out else out.strip()
+
+def summarize_history(history: List[Dict[str, str]], max_chars: int = 1200) -> str:
+    if not history:
+        return ""
+    return _clean(ask_llm_full(_summary_prompt(history), temperature=0.0, priority="background",
+                               site="summarizer"))
+
+async def summarize_history_async(history: List[Dict[str, str]], max_chars: int = 1200) -> str:
+    """Awaitable variant, e.g. gathered alongside the turn's answer."""
+    if not history:
+        return ""
+    return _clean(await ask_llm_async(_summary_prompt(history), temperature=0.0, priority="background",
+                                     site="summarizer"))
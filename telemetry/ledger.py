@@ -0,0 +1,130 @@
+﻿"""
+LLM usage and latency ledger, one record per call, tagged with the call site.
+
+    record("planner", model="llama-3.1-8b-instant", backend="groq", outcome="ok",
+           prompt_tokens=412, completion_tokens=38, ttft_ms=None, total_ms=640)
+    aggregates()        # rolling per-site counts, p50/p95 latency, tokens (this process)
+
+Records are appended to LLM_LEDGER_PATH (logs/llm_ledger.jsonl). Token
+counts come from the response's `usage` block; `est` marks records where
+the server sent none and they were estimated (~4 chars/token).
+
+    python -m telemetry.ledger [--days 7] [--path logs/llm_ledger.jsonl]
+
+prints per-component p50/p95 latency and token totals by day.
+"""
+from __future__ import annotations
+import os, json, time, argparse, threading
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Iterable, Optional
+
+LEDGER_PATH = os.getenv("LLM_LEDGER_PATH", "").strip() or os.path.join("logs", "llm_ledger.jsonl")
+OUTCOMES = ("ok", "error", "cache", "stopped", "cancelled")
+
+_lock = threading.Lock()
+_window: dict = defaultdict(lambda: deque(maxlen=500))     # site -> recent records
+
+
+def _pctl(xs, q: float) -> Optional[float]:
+    xs = sorted(x for x in xs if x is not None)
+    return round(xs[min(len(xs) - 1, int(len(xs) * q))], 1) if xs else None
+
+
+def record(site: str, model: str = "", backend: str = "", outcome: str = "ok",
+           prompt_tokens: int = 0, completion_tokens: int = 0, ttft_ms: float = None,
+           total_ms: float = None, est: bool = False, **extra):
+    rec = {"ts": time.time(), "site": site or "unlabeled", "model": model, "backend": backend,
+           "outcome": outcome, "prompt_tokens": int(prompt_tokens or 0),
+           "completion_tokens": int(completion_tokens or 0),
+           "ttft_ms": round(ttft_ms, 1) if ttft_ms is not None else None,
+           "total_ms": round(total_ms, 1) if total_ms is not None else None, "est": est, **extra}
+    with _lock:
+        _window[rec["site"]].append(rec)
+        try:
+            os.makedirs(os.path.dirname(LEDGER_PATH) or ".", exist_ok=True)
+            with open(LEDGER_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        except OSError:
+            pass                # the ledger must never break a call
+
+
+def _summary(recs: Iterable[dict]) -> dict:
+    recs = list(recs)
+    timed = [r for r in recs if r.get("outcome") != "cache"]
+    out = {
+        "calls": len(recs),
+        "prompt_tokens": sum(r.get("prompt_tokens") or 0 for r in timed),
+        "completion_tokens": sum(r.get("completion_tokens") or 0 for r in timed),
+        "total_ms_p50": _pctl([r.get("total_ms") for r in timed], 0.5),
+        "total_ms_p95": _pctl([r.get("total_ms") for r in timed], 0.95),
+        "ttft_ms_p50": _pctl([r.get("ttft_ms") for r in timed], 0.5),
+        "ttft_ms_p95": _pctl([r.get("ttft_ms") for r in timed], 0.95),
+    }
+    for o in OUTCOMES:
+        n = sum(1 for r in recs if r.get("outcome") == o)
+        if n:
+            out[o] = n
+    return out
+
+
+def aggregates() -> dict:
+    """Rolling per-site aggregates over the last 500 calls of each site in this process."""
+    with _lock:
+        snap = {site: list(w) for site, w in _window.items()}
+    return {site: _summary(recs) for site, recs in sorted(snap.items())}
+
+
+def read(path: str = None, since_ts: float = 0.0) -> Iterable[dict]:
+    try:
+        with open(path or LEDGER_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if rec.get("ts", 0) >= since_ts:
+                    yield rec
+    except FileNotFoundError:
+        return
+
+
+def summarize(path: str = None, days: int = 7) -> dict:
+    """{day: {site: summary}} for the last `days` days of the ledger file."""
+    since = time.time() - days * 86400 if days else 0.0
+    groups: dict = defaultdict(list)
+    for rec in read(path, since):
+        day = datetime.fromtimestamp(rec["ts"]).strftime("%Y-%m-%d")
+        groups[(day, rec.get("site") or "unlabeled")].append(rec)
+    out: dict = defaultdict(dict)
+    for (day, site), recs in sorted(groups.items()):
+        out[day][site] = _summary(recs)
+    return dict(out)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Per-component LLM latency and token usage by day")
+    ap.add_argument("--path", default=LEDGER_PATH)
+    ap.add_argument("--days", type=int, default=7, help="0 = whole ledger")
+    a = ap.parse_args(argv)
+    days = summarize(a.path, a.days)
+    if not days:
+        print(f"No ledger records in {a.path}")
+        return
+    cols = ("calls", "prompt_tokens", "completion_tokens", "total_ms_p50", "total_ms_p95", "ttft_ms_p50")
+    head = f"{'day':<11} {'site':<14}" + "".join(f"{c:>18}" for c in cols) + "  outcomes"
+    print(head)
+    print("-" * len(head))
+    for day, sites in days.items():
+        tot_p = tot_c = 0
+        for site, s in sites.items():
+            tot_p += s["prompt_tokens"]
+            tot_c += s["completion_tokens"]
+            outcomes = " ".join(f"{o}={s[o]}" for o in OUTCOMES if o in s)
+            print(f"{day:<11} {site:<14}" + "".join(f"{'-' if s[c] is None else s[c]:>18}" for c in cols)
+                  + f"  {outcomes}")
+        print(f"{day:<11} {'= tokens':<14}{'':>18}{tot_p:>18}{tot_c:>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+# tests/conftest.py
+# The app runs from app/ with the repo root importable (agent, thinker, orchestrator, ...).
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "app"), ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault("FIRESTORE_ENABLED", "0")
+
+# modules write logs/ and audio/ relative to the working directory; keep them out of the tree
+os.chdir(tempfile.mkdtemp(prefix="assistant-tests-"))
@@ -0,0 +1,205 @@
+# tests/test_circuit_breaker.py
+import threading
+import time
+
+import pytest
+
+import llm_backends
+from llm_backends import BackendPool, CircuitBreaker
+from test_llm_failover import FakeBackend
+
+
+class Probe:
+    """Scripted endpoint health; records when each probe ran."""
+
+    def __init__(self, up: bool = True):
+        self.up = up
+        self.at = []
+        self.ran = threading.Event()
+
+    def __call__(self) -> bool:
+        self.at.append(time.monotonic())
+        self.ran.set()
+        return self.up
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    monkeypatch.setattr(llm_backends.cfg, "LLM_RETRIES", 0, raising=False)
+    return []
+
+
+def _wait_for_state(breaker: CircuitBreaker, state: str):
+    deadline = time.monotonic() + 2
+    while breaker.state != state and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert breaker.state == state
+
+
+def _open(breaker: CircuitBreaker):
+    for _ in range(breaker.fail_threshold):
+        breaker.record(False, 0.1, "HTTP 503")
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def _half_open(probe: Probe, interval: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker(probe, fail_threshold=2, probe_interval_s=interval)
+    _open(breaker)
+    _wait_for_state(breaker, CircuitBreaker.HALF_OPEN)
+    return breaker
+
+
+def test_full_cycle_closed_open_half_open_closed():
+    probe = Probe()
+    breaker = CircuitBreaker(probe, fail_threshold=3, probe_interval_s=0.05)
+    breaker.record(False, 0.1, "HTTP 500")
+    breaker.record(False, 0.1, "HTTP 500")
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    breaker.record(True, 0.1)                       # a success resets the run of failures
+    breaker.record(False, 0.1, "HTTP 500")
+    breaker.record(False, 0.1, "HTTP 500")
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record(False, 0.1, "HTTP 500")
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow() and not breaker.begin()
+    assert breaker.stats()["opened"] == 1 and breaker.stats()["last_error"] == "HTTP 500"
+
+    _wait_for_state(breaker, CircuitBreaker.HALF_OPEN)
+    assert breaker.begin()
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.stats()["consecutive_failures"] == 0
+
+
+def test_failed_trial_reopens_at_once():
+    breaker = _half_open(Probe())
+    assert breaker.begin()
+    breaker.record(False, 0.1, "timeout")           # one failure is enough in half-open
+    assert breaker.state == CircuitBreaker.OPEN and breaker.stats()["opened"] == 2
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(Probe(up=False), fail_threshold=2, probe_interval_s=60, slow_s=1.0)
+    breaker.record(True, 1.5)
+    breaker.record(True, 2.0)
+    assert breaker.state == CircuitBreaker.OPEN and breaker.last_error.startswith("slow call")
+
+
+def test_probe_waits_for_the_cooldown():
+    probe = Probe(up=False)
+    breaker = CircuitBreaker(probe, fail_threshold=1, probe_interval_s=0.1)
+    t_open = time.monotonic()
+    breaker.record(False, 0.1, "HTTP 503")
+    assert not breaker.allow()
+    assert probe.at == []                           # failing fast, not probing inline
+    assert probe.ran.wait(2)
+    assert probe.at[0] - t_open >= 0.09
+    probe.ran.clear()
+    assert probe.ran.wait(2)                        # still down: probed again one interval later
+    assert probe.at[1] - probe.at[0] >= 0.09
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_lets_a_single_trial_through():
+    breaker = _half_open(Probe())
+    breaker.probe_interval_s = 60                   # keep the trial lease for the whole test
+    assert breaker.allow()
+    assert breaker.begin()                          # the trial call
+    assert not breaker.begin() and not breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.begin() and breaker.begin()      # closed: everyone goes through
+
+
+def test_abandoned_trial_is_released_after_the_interval():
+    breaker = _half_open(Probe(), interval=0.05)
+    assert breaker.begin()
+    assert not breaker.begin()
+    time.sleep(0.06)                                # the trial's caller never reported back
+    assert breaker.begin()
+
+
+def test_pool_sends_one_trial_and_fails_over_for_the_rest(calls):
+    pool = BackendPool([FakeBackend("a", ["from a"], calls, priority=0),
+                        FakeBackend("b", ["from b", "from b"], calls, priority=1)])
+    a = pool.backends[0]
+    a.breaker.state = CircuitBreaker.HALF_OPEN
+    a.breaker.probe_interval_s = 60
+    a.breaker._trial_at = time.monotonic()         # another turn holds the trial
+    assert pool.complete({}, deadline_s=10) == "from b"
+    assert [n for n, _ in calls] == ["b"] and pool.failovers == 0
+
+    a.breaker._trial_at = None                     # trial released: "a" gets the next call
+    a.ewma_s = 0.01
+    assert pool.complete({}, deadline_s=10) == "from a"
+    assert a.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize("threshold", [1, 3])
+def test_threshold_is_respected(threshold):
+    breaker = CircuitBreaker(Probe(up=False), fail_threshold=threshold, probe_interval_s=60)
+    for _ in range(threshold - 1):
+        breaker.record(False, 0.1, "HTTP 500")
+        assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record(False, 0.1, "HTTP 500")
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.fixture
+def server():
+    """Local OpenAI-style endpoint: chat returns `status`, /models is always up. Keep-alive."""
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = {"status": 503, "models": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, code: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            state["models"] += 1
+            self._send(200, {"data": []})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            ok = state["status"] == 200
+            self._send(state["status"], {"choices": [{"message": {"content": "hello"}}]} if ok else {})
+
+        def log_message(self, *a):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{srv.server_address[1]}"
+    yield state
+    srv.shutdown()
+
+
+def test_breaker_over_pooled_http(server, monkeypatch):
+    from infra import http_client
+    monkeypatch.setattr(llm_backends.cfg, "LLM_BREAKER_FAILURES", 2, raising=False)
+    monkeypatch.setattr(llm_backends.cfg, "LLM_HEALTHCHECK_SECONDS", 0.05, raising=False)
+    backend = llm_backends.OpenAIBackend("local", server["url"])
+    host = server["url"].split("//", 1)[1]
+    before = http_client.http_stats().get(host, {}).get("requests", 0)
+
+    assert backend.complete({}, 5) is None
+    assert backend.complete({}, 5) is None           # second 503: open
+    assert backend.breaker.state == CircuitBreaker.OPEN and not backend.breaker.begin()
+
+    server["status"] = 200
+    _wait_for_state(backend.breaker, CircuitBreaker.HALF_OPEN)   # GET /models, no tokens spent
+    assert server["models"] >= 1
+    assert backend.breaker.begin()
+    assert backend.complete({}, 5) == "hello"
+    assert backend.breaker.state == CircuitBreaker.CLOSED
+
+    st = http_client.http_stats()[host]
+    assert st["requests"] - before == 3 + server["models"]
+    assert st["new_conns"] < st["requests"]          # keep-alive: connections are reused
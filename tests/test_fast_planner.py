@@ -0,0 +1,59 @@
+# tests/test_fast_planner.py
+import pytest
+
+from agent.fast_planner import fast_plan
+from memory_catcher import catch_memory
+
+THRESHOLD = 0.8                     # FAST_PLANNER_THRESHOLD default
+GROUNDING = {"now_human": "Monday, 19 October 2026, 03:00 PM"}
+
+
+def _conf(text: str) -> float:
+    plan = fast_plan(text, GROUNDING)
+    return plan.confidence if plan else 0.0
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("your name is Ivy", "set_assistant_name"),
+    ("I'll call you Ivy", "set_assistant_name"),
+    ("thank you so much", "thanks"),
+    ("hello", "greeting"),
+])
+def test_exact_commands_are_confident(text, intent):
+    plan = fast_plan(text, GROUNDING)
+    assert plan.intent == intent and plan.confidence >= THRESHOLD
+
+
+def test_unexplained_words_lower_confidence():
+    exact = _conf("your name is Ivy")
+    hedged = _conf("I think your name is Ivy")
+    padded = _conf("by the way from today onwards your name is Ivy")
+    assert exact > hedged > padded
+    assert padded < THRESHOLD
+
+
+def test_complex_phrasing_falls_through():
+    assert _conf("explain why your name is Ivy") < THRESHOLD
+
+
+def test_greeting_with_a_request_attached_falls_through():
+    assert _conf("hello") >= THRESHOLD
+    assert _conf("hello there can you explain why the sky is blue and how clouds form") < THRESHOLD
+    assert _conf("I feel sad today because work was long and my boss yelled") < THRESHOLD
+
+
+@pytest.mark.parametrize("text", ["what time is it", "what's the date today"])
+def test_time_questions_are_left_to_the_local_answer(text):
+    from orchestrator.turn import _maybe_local_answer
+    assert _maybe_local_answer(text)                    # handle_turn step 0 answers these
+    assert fast_plan(text, GROUNDING) is None
+
+
+@pytest.mark.parametrize("text", [
+    "remind me to call mom at 6pm",
+    "remember my wifi password is tiger123",
+])
+def test_memory_writes_are_left_to_the_catcher(text):
+    parsed = catch_memory(text)
+    assert parsed["reminders"] or parsed["facts"]       # handle_turn step 2 answers these
+    assert fast_plan(text, GROUNDING) is None
@@ -0,0 +1,18 @@
+# tests/test_imports.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("module", ["thinker.controller", "orchestrator.router", "agent.planner"])
+def test_module_imports_on_its_own(module):
+    """A fresh interpreter, so import cycles are not hidden by modules other tests loaded first."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([os.path.join(ROOT, "app"), ROOT,
+                                                        os.environ.get("PYTHONPATH", "")])}
+    r = subprocess.run([sys.executable, "-c", f"import {module}"], cwd=os.path.join(ROOT, "app"),
+                       env=env, capture_output=True, text=True, timeout=60)
+    assert r.returncode == 0, r.stderr[-2000:]
@@ -0,0 +1,107 @@
+# tests/test_ledger.py
+import json
+from collections import defaultdict, deque
+from datetime import datetime
+
+import pytest
+
+from telemetry import ledger
+
+DAY1 = datetime(2026, 10, 17, 12, 0).timestamp()
+DAY2 = datetime(2026, 10, 18, 12, 0).timestamp()
+NOW = datetime(2026, 10, 19, 12, 0).timestamp()
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    p = tmp_path / "logs" / "llm_ledger.jsonl"
+    monkeypatch.setattr(ledger, "LEDGER_PATH", str(p))
+    monkeypatch.setattr(ledger, "_window", defaultdict(lambda: deque(maxlen=500)))
+    return p
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [NOW]
+    monkeypatch.setattr(ledger.time, "time", lambda: now[0])
+    return now
+
+
+def _calls(clock, ts, site, totals, **kw):
+    clock[0] = ts
+    for ms in totals:
+        ledger.record(site, model="m", backend="b", prompt_tokens=100, completion_tokens=10, total_ms=ms, **kw)
+
+
+def test_record_round_trips_through_jsonl(path, clock):
+    ledger.record("planner", model="llama", backend="groq", prompt_tokens=412, completion_tokens=38,
+                  ttft_ms=120.04, total_ms=640.06, est=True, turn="t1")
+    ledger.record("", outcome="error")
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2                                   # the logs/ directory was created
+    first = json.loads(lines[0])
+    assert first == {"ts": NOW, "site": "planner", "model": "llama", "backend": "groq", "outcome": "ok",
+                     "prompt_tokens": 412, "completion_tokens": 38, "ttft_ms": 120.0, "total_ms": 640.1,
+                     "est": True, "turn": "t1"}
+    assert list(ledger.read(str(path))) == [first, json.loads(lines[1])]
+    assert json.loads(lines[1])["site"] == "unlabeled"
+
+
+def test_read_skips_bad_lines_and_old_records(path, clock):
+    _calls(clock, DAY1, "planner", [100])
+    _calls(clock, DAY2, "planner", [200])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("{not json\n")
+    assert [r["total_ms"] for r in ledger.read(str(path))] == [100, 200]
+    assert [r["total_ms"] for r in ledger.read(str(path), since_ts=DAY2)] == [200]
+    assert list(ledger.read(str(path.parent / "missing.jsonl"))) == []
+
+
+def test_summarize_groups_by_day_and_site_with_percentiles(path, clock):
+    _calls(clock, DAY1, "planner", range(10, 110, 10))       # 10 .. 100 ms
+    _calls(clock, DAY1, "thinker", [500, 700])
+    _calls(clock, DAY2, "planner", [40])
+    clock[0] = NOW
+    days = ledger.summarize(str(path), days=7)
+
+    d1, d2 = (datetime.fromtimestamp(t).strftime("%Y-%m-%d") for t in (DAY1, DAY2))
+    assert list(days) == [d1, d2] and sorted(days[d1]) == ["planner", "thinker"]
+    planner = days[d1]["planner"]
+    assert planner["calls"] == 10 and planner["ok"] == 10
+    assert (planner["total_ms_p50"], planner["total_ms_p95"]) == (60, 100)
+    assert planner["ttft_ms_p50"] is None                    # never reported
+    assert (days[d1]["thinker"]["total_ms_p50"], days[d1]["thinker"]["total_ms_p95"]) == (700, 700)
+    assert days[d2]["planner"]["total_ms_p50"] == 40
+
+    assert list(ledger.summarize(str(path), days=1)) == [d2]
+    assert list(ledger.summarize(str(path), days=0)) == [d1, d2]     # 0 = whole ledger
+
+
+def test_cache_hits_count_as_calls_but_not_tokens_or_latency(path, clock):
+    _calls(clock, NOW, "thinker", [800])
+    _calls(clock, NOW, "thinker", [1], outcome="cache")
+    s = next(iter(ledger.summarize(str(path)).values()))["thinker"]
+    assert s["calls"] == 2 and s["ok"] == 1 and s["cache"] == 1
+    assert (s["prompt_tokens"], s["completion_tokens"]) == (100, 10)
+    assert s["total_ms_p50"] == 800
+    assert ledger.aggregates()["thinker"] == s               # the in-process window agrees
+
+
+def test_cli_prints_a_row_per_site_and_day_totals(path, clock, capsys):
+    _calls(clock, DAY2, "planner", [100, 300])
+    _calls(clock, DAY2, "thinker", [900], outcome="error")
+    clock[0] = NOW
+    ledger.main(["--days", "7"])
+    lines = capsys.readouterr().out.splitlines()
+    day = datetime.fromtimestamp(DAY2).strftime("%Y-%m-%d")
+
+    assert lines[0].split()[:3] == ["day", "site", "calls"] and set(lines[1]) == {"-"}
+    planner, thinker, totals = lines[2:]
+    assert planner.split() == [day, "planner", "2", "200", "20", "300", "300", "-", "ok=2"]
+    assert thinker.split() == [day, "thinker", "1", "100", "10", "900", "900", "-", "error=1"]
+    assert totals.split() == [day, "=", "tokens", "300", "30"]
+
+
+def test_cli_with_an_empty_ledger(path, capsys):
+    ledger.main(["--path", str(path)])
+    assert capsys.readouterr().out.strip() == f"No ledger records in {path}"
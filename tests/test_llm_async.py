@@ -0,0 +1,144 @@
+# tests/test_llm_async.py
+"""The asyncio client (ask_llm_async / stream_llm_async) and its failover, against the SSE stub."""
+import asyncio
+
+import pytest
+
+import llm
+import llm_backends
+from eval.sse_stub import start_stub
+from llm_backends import BackendPool, GradioBackend, OpenAIBackend
+from test_llm_failover import FakeBackend
+
+REPLY = "Sure. Paris is lovely in spring, and the cafes stay open late."
+
+needs_aiohttp = pytest.mark.skipif(llm.aiohttp is None, reason="aiohttp not installed")
+
+
+@pytest.fixture
+def world(monkeypatch):
+    """Stub servers on demand, a fresh cache, and the ledger records of each call."""
+    servers, ledger = [], []
+
+    def stub(fail_status: int = 0) -> str:
+        srv, url = start_stub(reply=REPLY, delay_ms=1, first_delay_ms=0, fail_status=fail_status)
+        servers.append(srv)
+        return url
+
+    monkeypatch.setattr(llm_backends.cfg, "LLM_RETRIES", 0, raising=False)
+    monkeypatch.setattr(llm, "response_cache", llm.ResponseCache())
+    monkeypatch.setattr(llm, "ledger_record", lambda site, **kw: ledger.append({"site": site, **kw}))
+    yield stub, ledger
+    for srv in servers:
+        srv.shutdown()
+
+
+def _use(*backends) -> BackendPool:
+    pool = BackendPool(list(backends))
+    llm_backends.set_pool(pool)
+    return pool
+
+
+def _run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await llm.close_llm_async()
+    return asyncio.run(main())
+
+
+async def _collect(agen, limit: int = None) -> list:
+    out = []
+    async for d in agen:
+        out.append(d)
+        if limit and len(out) >= limit:
+            break
+    return out
+
+
+@pytest.fixture(autouse=True)
+def restore_pool():
+    pool = llm_backends._pool
+    yield
+    llm_backends.set_pool(pool)
+
+
+@needs_aiohttp
+def test_async_completion_fails_over_to_the_next_backend(world):
+    stub, ledger = world
+    pool = _use(OpenAIBackend("down", stub(fail_status=503), priority=0),
+                OpenAIBackend("up", stub(), priority=1))
+    assert _run(llm.ask_llm_async("hi", site="test", cache=False)) == REPLY
+    assert pool.failovers == 1
+    assert pool.backends[0].error_rate() == 1.0 and pool.backends[1].error_rate() == 0.0
+    (rec,) = ledger
+    assert rec["site"] == "test" and rec["outcome"] == "ok" and rec["backend"] == "up"
+    assert rec["completion_tokens"] == len(REPLY.split(" ")) and not rec["est"]   # server usage block
+
+
+@needs_aiohttp
+def test_async_stream_fails_over_and_rebuilds_the_reply(world):
+    stub, ledger = world
+    pool = _use(OpenAIBackend("down", stub(fail_status=500), priority=0),
+                OpenAIBackend("up", stub(), priority=1))
+    deltas = _run(_collect(llm.stream_llm_async("hi", site="test")))
+    assert len(deltas) > 5 and "".join(deltas) == REPLY
+    assert pool.failovers == 1
+    assert ledger[-1]["outcome"] == "ok" and ledger[-1]["ttft_ms"] is not None
+
+
+@needs_aiohttp
+def test_breaking_out_of_the_async_stream_is_recorded_as_stopped(world):
+    stub, ledger = world
+    _use(OpenAIBackend("up", stub()))
+    assert len(_run(_collect(llm.stream_llm_async("hi", site="test"), limit=2))) == 2
+    assert ledger[-1]["outcome"] == "stopped"
+
+
+@needs_aiohttp
+def test_async_gradio_backend(world):
+    stub, _ = world
+    _use(GradioBackend("space", stub().rsplit("/v1", 1)[0]))
+    assert _run(llm.ask_llm_async("hi", cache=False)) == REPLY
+
+
+@needs_aiohttp
+def test_all_backends_failing_returns_none(world):
+    stub, ledger = world
+    _use(OpenAIBackend("a", stub(fail_status=503)), OpenAIBackend("b", stub(fail_status=502)))
+    assert _run(llm.ask_llm_async("hi", cache=False)) is None
+    assert _run(_collect(llm.stream_llm_async("hi"))) == []
+    assert [r["outcome"] for r in ledger] == ["error", "error"]
+
+
+def test_without_aiohttp_blocking_backends_run_on_threads(world, monkeypatch):
+    monkeypatch.setattr(llm, "aiohttp", None)
+    calls = []
+    pool = _use(FakeBackend("a", [None], calls, priority=0), FakeBackend("b", ["from b", "b streamed"], calls, priority=1))
+    assert _run(llm.ask_llm_async("hi", cache=False)) == "from b"
+    assert _run(_collect(llm.stream_llm_async("hi"))) == ["b streamed"]
+    assert [n for n, _ in calls] == ["a", "b", "b"] and pool.failovers == 1
+
+
+def test_async_completion_is_served_from_the_cache(world, monkeypatch):
+    _, ledger = world
+    monkeypatch.setattr(llm, "aiohttp", None)
+    monkeypatch.setattr(llm.cfg, "LLM_CACHE", "auto", raising=False)
+    calls = []
+    _use(FakeBackend("a", ["cached answer"], calls))
+    assert _run(llm.ask_llm_async("hi", temperature=0.0)) == "cached answer"
+    assert _run(llm.ask_llm_async("hi", temperature=0.0)) == "cached answer"
+    assert len(calls) == 1 and [r["outcome"] for r in ledger] == ["ok", "cache"]
+
+
+def test_ask_llm_many_keeps_input_order(world, monkeypatch):
+    monkeypatch.setattr(llm, "aiohttp", None)
+
+    class Echo(FakeBackend):
+        def complete(self, payload, timeout_s, priority="interactive", info=None):
+            self._record(True, 0.01)
+            return payload["messages"][-1]["content"].upper()
+
+    _use(Echo("echo", [], []))
+    assert llm.ask_llm_many(["one", "two", "three"], concurrency=2, cache=False) == ["ONE", "TWO", "THREE"]
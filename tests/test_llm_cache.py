@@ -0,0 +1,117 @@
+# tests/test_llm_cache.py
+import pytest
+
+import llm
+from llm import ResponseCache
+from orchestrator import router
+
+
+def _payload(text="hi", temperature=0.0, model="m"):
+    return llm._payload(text, model=model, temperature=temperature)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm.time, "time", lambda: now[0])
+    return now
+
+
+def test_key_ignores_whitespace_but_not_sampling():
+    base = ResponseCache.key(_payload("what  time is\nit"))
+    assert base == ResponseCache.key(_payload("what time is it"))
+    assert base != ResponseCache.key(_payload("what time is it", temperature=0.3))
+    assert base != ResponseCache.key(_payload("what time is it", model="other"))
+
+
+def test_entries_expire_after_ttl(clock):
+    c = ResponseCache(ttl_s=60)
+    c.put("k", "reply")
+    clock[0] += 59
+    assert c.get("k") == "reply"
+    clock[0] += 2
+    assert c.get("k") is None
+    assert c.stats()["hits"] == 1 and c.stats()["misses"] == 1
+
+
+def test_lru_eviction_keeps_recently_used(clock):
+    c = ResponseCache(max_items=2)
+    c.put("a", "A")
+    c.put("b", "B")
+    assert c.get("a") == "A"                  # a is now the most recent
+    c.put("c", "C")
+    assert c.get("b") is None and c.get("a") == "A" and c.get("c") == "C"
+    assert c.stats()["evictions"] == 1
+
+
+def test_disk_entries_survive_a_restart_and_expire(tmp_path, clock):
+    ResponseCache(root=str(tmp_path), ttl_s=60).put("k", "persisted")
+    warm = ResponseCache(root=str(tmp_path), ttl_s=60)
+    assert warm.get("k") == "persisted"
+    clock[0] += 61
+    assert ResponseCache(root=str(tmp_path), ttl_s=60).get("k") is None
+    assert not (tmp_path / "k.json").exists()          # expired files are removed
+
+
+def test_evicted_entries_leave_the_disk(tmp_path):
+    c = ResponseCache(root=str(tmp_path), max_items=1)
+    c.put("a", "A")
+    c.put("b", "B")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["b.json"]
+
+
+@pytest.mark.parametrize("mode, temperature, cache, expected", [
+    ("auto", 0.0, None, True),
+    ("auto", 0.3, None, False),              # non-deterministic: never cached by default
+    ("auto", 0.3, True, True),               # unless the call asks for it
+    ("0", 0.0, None, False),
+    ("1", 0.7, None, True),
+    ("1", 0.0, False, False),
+])
+def test_use_cache_policy(monkeypatch, mode, temperature, cache, expected):
+    monkeypatch.setattr(llm.cfg, "LLM_CACHE", mode, raising=False)
+    assert llm._use_cache(_payload(temperature=temperature), cache) is expected
+
+
+@pytest.fixture
+def style_calls(monkeypatch):
+    """call_llm_with_style with the network replaced; counts the requests that went out."""
+    sent = []
+
+    def fake_full(prompt, **opts):
+        sent.append(opts)
+        return f"reply {len(sent)}"
+
+    monkeypatch.setattr(llm.cfg, "LLM_CACHE", "auto", raising=False)
+    monkeypatch.setattr(llm.cfg, "LLM_HEDGE", False, raising=False)
+    monkeypatch.setattr(llm, "response_cache", ResponseCache())
+    monkeypatch.setattr(router, "ask_llm_full", fake_full)
+    monkeypatch.setattr(router, "_stats", {})
+    return sent
+
+
+def test_plan_at_temperature_zero_is_served_from_cache(style_calls):
+    style = {"model": "m", "temperature": 0.0, "max_tokens": 100}
+    first = router.call_llm_with_style("plan this", style, site="single_pass")
+    second = router.call_llm_with_style("plan  this", style, site="single_pass")
+    assert first == second == "reply 1" and len(style_calls) == 1
+    assert style_calls[0]["cache"] is False                  # looked up once, not twice
+    assert router.model_stats("m").n() == 1                 # the hit recorded no latency
+
+
+def test_sampled_reply_is_never_cached(style_calls):
+    style = {"model": "m", "temperature": 0.3, "max_tokens": 100}
+    assert router.call_llm_with_style("chat", style) == "reply 1"
+    assert router.call_llm_with_style("chat", style) == "reply 2"
+    assert llm.response_cache.stats()["items"] == 0
+
+
+def test_single_pass_plan_samples_at_the_cacheable_temperature(monkeypatch):
+    from thinker import controller
+    from thinker.state import TurnState
+    styles = []
+    monkeypatch.setattr(router, "call_llm_with_style", lambda prompt, style, **kw: styles.append(style) or '{"reply": "ok"}')
+    monkeypatch.setattr(controller.cfg, "SINGLE_PASS_TEMPERATURE", 0.0, raising=False)
+    controller.plan_and_answer(TurnState(user_text="tell me about volcanoes"))
+    assert styles[0]["temperature"] == 0.0
+    assert llm._use_cache(llm._payload("x", temperature=styles[0]["temperature"]), None) is True
@@ -0,0 +1,100 @@
+# tests/test_llm_failover.py
+import pytest
+
+import llm_backends
+from llm_backends import Backend, BackendPool, CircuitBreaker
+
+
+class FakeBackend(Backend):
+    """Scripted replies; None = failed call. `calls` records (name, timeout) per attempt."""
+    kind = "fake"
+
+    def __init__(self, name, replies, calls, **kw):
+        super().__init__(name, **kw)
+        self.replies = list(replies)
+        self.calls = calls
+
+    def probe(self) -> bool:
+        return False
+
+    def _next(self, timeout_s):
+        self.calls.append((self.name, round(timeout_s, 1)))
+        reply = self.replies.pop(0) if self.replies else None
+        self._record(reply is not None, 0.1, "" if reply else "scripted failure")
+        return reply
+
+    def complete(self, payload, timeout_s, priority="interactive", info=None):
+        return self._next(timeout_s)
+
+    def stream(self, payload, idle_timeout, priority="interactive", info=None):
+        reply = self._next(idle_timeout)
+        if isinstance(reply, list):              # deltas, then a drop if it ends with None
+            for d in reply:
+                if d is None:
+                    return
+                yield d
+        elif reply:
+            yield reply
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    monkeypatch.setattr(llm_backends.cfg, "LLM_RETRIES", 0, raising=False)
+    monkeypatch.setattr(llm_backends.time, "sleep", lambda s: None)
+    return []
+
+
+def _pool(calls, *specs):
+    return BackendPool([FakeBackend(name, replies, calls, **kw) for name, replies, kw in specs])
+
+
+def test_order_is_score_then_config_priority(calls):
+    pool = _pool(calls, ("a", [], {"priority": 0, "expected_s": 2.0}),
+                 ("b", [], {"priority": 1, "expected_s": 1.0}),
+                 ("c", [], {"priority": 2, "expected_s": 1.0}))
+    assert [b.name for b in pool.ordered()] == ["b", "c", "a"]
+    pool.backends[2].ewma_s = 0.2                  # measured latency beats the configured guess
+    assert [b.name for b in pool.ordered()] == ["c", "b", "a"]
+
+
+def test_errors_push_a_fast_backend_down(calls):
+    pool = _pool(calls, ("fast", [], {"expected_s": 0.5}), ("slow", [], {"expected_s": 2.0}))
+    fast = pool.backends[0]
+    fast.outcomes.extend([1, 1, 0, 0])             # 50% errors = +2.5 s
+    assert [b.name for b in pool.ordered()] == ["slow", "fast"]
+
+
+def test_open_circuit_is_skipped(calls):
+    pool = _pool(calls, ("a", ["from a"], {"priority": 0}), ("b", ["from b"], {"priority": 1}))
+    pool.backends[0].breaker.state = CircuitBreaker.OPEN
+    assert pool.complete({}, deadline_s=10) == "from b"
+    assert calls == [("b", 10.0)] and pool.failovers == 0
+
+
+def test_complete_fails_over_in_order(calls):
+    pool = _pool(calls, ("a", [None], {"priority": 0, "timeout_s": 3}),
+                 ("b", [None], {"priority": 1}), ("c", ["from c"], {"priority": 2}))
+    assert pool.complete({}, deadline_s=10) == "from c"
+    assert [n for n, _ in calls] == ["a", "b", "c"]
+    assert calls[0][1] == 3.0                      # per-backend timeout within the deadline
+    assert pool.failovers == 2
+
+
+def test_retry_round_after_every_backend_failed(calls, monkeypatch):
+    monkeypatch.setattr(llm_backends.cfg, "LLM_RETRIES", 1, raising=False)
+    pool = _pool(calls, ("a", [None, "second try"], {"priority": 0}), ("b", [None, None], {"priority": 1}))
+    assert pool.complete({}, deadline_s=30) == "second try"
+    assert pool.retries == 1
+    # both failed once, so the retry round keeps the same order
+    assert [n for n, _ in calls] == ["a", "b", "a"]
+
+
+def test_stream_fails_over_only_before_the_first_delta(calls):
+    pool = _pool(calls, ("a", [[]], {"priority": 0}), ("b", [["Hel", "lo"]], {"priority": 1}))
+    assert "".join(pool.stream({}, idle_timeout=5, deadline_s=10)) == "Hello"
+    assert [n for n, _ in calls] == ["a", "b"]
+
+    calls.clear()
+    pool = _pool(calls, ("a", [["Hel", None]], {"priority": 0}), ("b", [["never"]], {"priority": 1}))
+    assert "".join(pool.stream({}, idle_timeout=5, deadline_s=10)) == "Hel"
+    assert [n for n, _ in calls] == ["a"]          # audio may already be playing: no second answer
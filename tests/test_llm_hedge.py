@@ -0,0 +1,52 @@
+# tests/test_llm_hedge.py
+import time
+import threading
+
+import pytest
+
+import llm
+
+
+@pytest.fixture
+def slow_primary(monkeypatch):
+    """Primary model answers after 0.3 s, everything else at once; records the models asked."""
+    asked = []
+
+    def fake(user_text, cancel, progress=None, **opts):
+        model = opts.get("model") or llm.cfg.GROQ_MODEL
+        asked.append(model)
+        if not opts.get("site", "").endswith("_hedge"):
+            cancel.wait(0.3)
+        return f"answer from {model}"
+
+    monkeypatch.setattr(llm, "ask_llm_cancellable", fake)
+    monkeypatch.setattr(llm, "llm_available", lambda: True)
+    monkeypatch.setattr(llm.cfg, "LLM_HEDGE", True, raising=False)
+    monkeypatch.setattr(llm.cfg, "LLM_HEDGE_MODEL", "", raising=False)
+    return asked
+
+
+def test_heavy_primary_is_hedged_on_the_light_model(slow_primary):
+    out = {}
+    text = llm.ask_llm_hedged("hi", gate_s=0.05, model="big-model", outcome=out)
+    assert slow_primary == ["big-model", llm.cfg.GROQ_MODEL]
+    assert out["hedged"] and out["winner"] == "hedge"
+    assert text == f"answer from {llm.cfg.GROQ_MODEL}"
+
+
+def test_no_hedge_to_the_primary_model(slow_primary):
+    out, gated = {}, threading.Event()
+    t0 = time.perf_counter()
+    text = llm.ask_llm_hedged("hi", gate_s=0.05, on_gate=gated.set, outcome=out)
+    assert slow_primary == [llm.cfg.GROQ_MODEL]
+    assert gated.is_set() and out["gated"] and not out["hedged"]
+    assert out["winner"] == "primary" and text == f"answer from {llm.cfg.GROQ_MODEL}"
+    assert time.perf_counter() - t0 >= 0.25
+
+
+def test_explicit_hedge_model_differs_from_light_primary(slow_primary, monkeypatch):
+    monkeypatch.setattr(llm.cfg, "LLM_HEDGE_MODEL", "tiny-model", raising=False)
+    out = {}
+    llm.ask_llm_hedged("hi", gate_s=0.05, outcome=out)
+    assert slow_primary == [llm.cfg.GROQ_MODEL, "tiny-model"]
+    assert out["winner"] == "hedge" and out["model"] == "tiny-model"
@@ -0,0 +1,63 @@
+# tests/test_playback.py
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import playback
+from playback import PlaybackEngine
+
+
+def _files(tmp_path, n):
+    paths = []
+    for i in range(n):
+        p = tmp_path / f"clip{i}.mp3"
+        p.write_bytes(b"x")
+        paths.append(str(p))
+    return paths
+
+
+def test_decoded_clips_are_reused_and_evicted_lru(tmp_path, monkeypatch):
+    decoded = []
+    monkeypatch.setattr(playback, "decode_file",
+                        lambda path, rate: decoded.append(path) or np.zeros(10, dtype=np.int16))
+    eng = PlaybackEngine(decode_cache_items=2)
+    a, b, c = _files(tmp_path, 3)
+    first = eng._decode_cached(a)
+    eng._decode_cached(b)
+    assert eng._decode_cached(a) is first             # hit; a is now the most recent
+    eng._decode_cached(c)                              # evicts b
+    eng._decode_cached(b)
+    assert decoded == [a, b, c, b]
+
+
+class _SlowLRU(OrderedDict):
+    """Widens the lookup/move window so an unguarded check-then-act race shows up."""
+
+    def move_to_end(self, key, last=True):
+        time.sleep(0.0001)
+        super().move_to_end(key, last)
+
+
+def test_decode_cache_is_safe_across_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(playback, "decode_file", lambda path, rate: np.zeros(10, dtype=np.int16))
+    eng = PlaybackEngine(decode_cache_items=4)
+    eng._decoded = _SlowLRU()
+    paths = _files(tmp_path, 12)
+    errors, start = [], threading.Barrier(8)
+
+    def hammer(k):
+        start.wait()
+        try:
+            for i in range(300):
+                eng._decode_cached(paths[(i * (k + 1)) % len(paths)])
+        except Exception as e:                         # e.g. KeyError from a concurrent eviction
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and len(eng._decoded) <= 4
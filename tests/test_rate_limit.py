@@ -0,0 +1,96 @@
+# tests/test_rate_limit.py
+import time
+import asyncio
+import threading
+
+import pytest
+
+from infra.rate_limit import RateGovernor, parse_duration
+
+
+def _drain(gov: RateGovernor):
+    gov.requests.adjust(-gov.requests.capacity)
+
+
+def _admit_in_background(gov, order, label, priority, deadline_s=2.0):
+    def run():
+        if gov.acquire(priority=priority, deadline_s=deadline_s):
+            order.append(label)
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    return t
+
+
+def test_interactive_jumps_the_queue():
+    gov = RateGovernor(rpm=600, reserve=0.0)        # one request every 0.1 s once drained
+    _drain(gov)
+    order = []
+    bg = _admit_in_background(gov, order, "bg", "background")
+    time.sleep(0.03)                                 # background is queued first...
+    fg = _admit_in_background(gov, order, "fg", "interactive")
+    for t in (bg, fg):
+        t.join(3)
+    assert order == ["fg", "bg"]                     # ...but the voice turn gets the next slot
+    assert gov.admitted == {"interactive": 1, "background": 1}
+
+
+def test_background_leaves_the_reserve_for_interactive():
+    gov = RateGovernor(rpm=4, reserve=0.25)          # 1 of 4 requests held back from background
+    for _ in range(3):
+        assert gov.acquire(priority="background", deadline_s=0.05)
+    assert not gov.acquire(priority="background", deadline_s=0.05)
+    assert gov.acquire(priority="interactive", deadline_s=0.05)
+    assert gov.timeouts == {"interactive": 0, "background": 1}
+
+
+def test_give_up_early_when_the_wait_exceeds_the_deadline():
+    gov = RateGovernor(rpm=6, reserve=0.0)           # next slot in 10 s
+    _drain(gov)
+    t0 = time.monotonic()
+    assert not gov.acquire(priority="interactive", deadline_s=2.0)
+    assert time.monotonic() - t0 < 0.5               # fails over now instead of sleeping out the deadline
+    assert gov.stats()["queued"] == {"interactive": 0, "background": 0}
+
+
+def test_retry_after_pauses_admission():
+    gov = RateGovernor(rpm=600)
+    gov.observe(429, {"retry-after": "0.3"})
+    assert gov.throttled == 1
+    assert not gov.acquire(deadline_s=0.1)
+    t0 = time.monotonic()
+    assert gov.acquire(deadline_s=1.0)
+    assert time.monotonic() - t0 >= 0.15
+
+
+def test_remaining_headers_and_usage_settle_the_budget():
+    gov = RateGovernor(rpm=60, tpm=6000)
+    gov.observe(200, {"x-ratelimit-remaining-requests": "5", "x-ratelimit-remaining-tokens": "1000"})
+    assert gov.requests.tokens <= 5.1 and gov.tokens.tokens <= 1001
+    assert gov.acquire(800, deadline_s=0.05)
+    before = gov.tokens.tokens
+    gov.observe(200, {}, est_tokens=800, used_tokens=300)
+    assert gov.tokens.tokens == pytest.approx(before + 500, abs=5)
+
+
+def test_async_acquire_respects_priority():
+    gov = RateGovernor(rpm=600, reserve=0.0)
+    _drain(gov)
+    order = []
+
+    async def take(label, priority, delay):
+        await asyncio.sleep(delay)
+        if await gov.aacquire(priority=priority, deadline_s=2.0):
+            order.append(label)
+
+    async def main():
+        await asyncio.gather(take("bg", "background", 0.0), take("fg", "interactive", 0.03))
+
+    asyncio.run(main())
+    assert order == ["fg", "bg"]
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("12", 12.0), ("7.66s", 7.66), ("2m59.5s", 179.5), ("250ms", 0.25), ("1h", 3600.0), (None, None),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == (pytest.approx(seconds) if seconds is not None else None)
@@ -0,0 +1,110 @@
+# tests/test_reminder_audio.py
+from datetime import datetime, timedelta
+
+import pytest
+
+import reminder_audio
+from reminder_audio import ReminderScheduler, reminder_id
+from tts_cache import TTSCache
+
+NOW = datetime(2026, 3, 1, 9, 0, 0)
+
+
+def _rem(text: str, minutes: float) -> dict:
+    return {"message": text, "time": (NOW + timedelta(minutes=minutes)).isoformat(), "done": False}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    seen = {"announced": [], "prepared": []}
+    monkeypatch.setattr(reminder_audio, "announce_reminder",
+                        lambda r, stop_flag=None: seen["announced"].append(r["message"]))
+    monkeypatch.setattr(reminder_audio, "prepare_reminder",
+                        lambda text, when: seen["prepared"].append(text))
+    return seen
+
+
+def test_due_reminder_fires_once_and_upcoming_ones_are_prepared(calls):
+    rems = [_rem("take medicine", -1), _rem("call mom", 30)]
+    sched = ReminderScheduler(lambda: rems, grace_s=600)
+    sched.poll_once(NOW)
+    sched.poll_once(NOW)
+    assert calls["announced"] == ["take medicine"]
+    assert calls["prepared"] == ["call mom"]
+
+
+def test_busy_assistant_defers_the_announcement(calls):
+    busy = [True]
+    sched = ReminderScheduler(lambda: [_rem("stretch", 0)], busy=lambda: busy[0])
+    sched.poll_once(NOW)
+    assert calls["announced"] == []
+    busy[0] = False
+    sched.poll_once(NOW)
+    assert calls["announced"] == ["stretch"]
+
+
+def test_long_missed_and_done_reminders_are_skipped(calls):
+    rems = [_rem("yesterday", -24 * 60), {**_rem("finished", -1), "done": True}, {"message": "no time"}]
+    ReminderScheduler(lambda: rems, grace_s=600).poll_once(NOW)
+    assert calls["announced"] == []
+
+
+def test_pinned_reminder_clip_survives_eviction(tmp_path):
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=250)
+    key = "reminder-" + reminder_id("take medicine", "2026-03-01T09:00:00")
+    cache.pin(key)
+
+    def put(k):
+        src = tmp_path / k
+        src.write_bytes(b"\0" * 100)
+        cache.put(k, str(src))
+
+    put(key)
+    for k in ("reply1", "reply2", "reply3"):
+        put(k)
+    assert cache.get(key)
+    assert cache.stats()["pinned"] == 1
+
+    cache.unpin(key)                       # fired: plain LRU again
+    put("reply4")
+    put("reply5")
+    assert cache.get(key) is None
+    assert cache.stats()["bytes"] <= 250
+
+
+@pytest.fixture
+def pinned_cache(tmp_path, monkeypatch):
+    import tts_cache
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=10_000)
+    monkeypatch.setattr(tts_cache, "get_cache", lambda: cache)
+    return cache
+
+
+def test_announced_clip_stays_pinned_until_playback_ends(pinned_cache, tmp_path, monkeypatch):
+    import sys
+    from types import SimpleNamespace
+    rem = _rem("take medicine", 0)
+    key = "reminder-" + reminder_id(rem["message"], rem["time"])
+    pinned_cache.pin(key)
+    src = tmp_path / "clip"
+    src.write_bytes(b"\0" * 100)
+    pinned_cache.put(key, str(src))
+
+    queued = []
+    monkeypatch.setitem(sys.modules, "tts", SimpleNamespace(
+        speak=lambda text, stop_flag=None, audio_path=None, on_done=None: queued.append((audio_path, on_done))))
+    reminder_audio.announce_reminder(rem)
+
+    (path, on_done), = queued
+    assert path == pinned_cache.path_for(key)
+    assert pinned_cache.stats()["pinned"] == 1          # only queued: still protected from eviction
+    on_done()                                           # player thread: playback finished
+    assert pinned_cache.stats()["pinned"] == 0
+
+
+def test_missed_reminder_releases_its_pin(pinned_cache, calls):
+    rem = _rem("yesterday", -24 * 60)
+    key = "reminder-" + reminder_id(rem["message"], rem["time"])
+    pinned_cache.pin(key)
+    ReminderScheduler(lambda: [rem], grace_s=600).poll_once(NOW)
+    assert key not in pinned_cache._pinned
@@ -0,0 +1,111 @@
+# tests/test_reply_budget.py
+import pytest
+
+from thinker import budget
+from thinker.budget import ReplyBudget, reply_budget
+
+
+@pytest.fixture(autouse=True)
+def fresh_totals(monkeypatch):
+    monkeypatch.setattr(budget, "_totals", dict.fromkeys(budget._totals, 0))
+    monkeypatch.setattr(budget, "log_event", lambda *a, **kw: None)
+
+
+class Deltas:
+    """An upstream stream that records how far it was read and whether it was closed."""
+
+    def __init__(self, parts):
+        self.parts = list(parts)
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.read >= len(self.parts):
+            raise StopIteration
+        self.read += 1
+        return self.parts[self.read - 1]
+
+    def close(self):
+        self.closed = True
+
+
+B = ReplyBudget(intent="chitchat", tokens=5, max_tokens=10)      # target 20 chars, hard stop at 40
+
+
+def test_clip_keeps_short_text_and_cuts_at_the_first_sentence_end_past_the_target():
+    assert B.clip("  Short answer.  ") == "Short answer."
+    assert B.clip("First part is long. Second one. Third.") == "First part is long. Second one."
+
+
+def test_clip_without_a_sentence_end_stops_hard_at_max_chars():
+    text = "a run on sentence that never seems to stop for breath at all"
+    assert B.clip(text) == text[:40].rstrip() + "..."
+    assert B.clip(text[:36]) == text[:36]                 # between target and cap: kept whole
+
+
+def test_stream_stops_at_the_sentence_end_inside_the_delta_that_crosses_the_target():
+    d = Deltas(["Here is a quick ", "answer for you. And then", " more text", " nobody hears."])
+    out = list(B.clip_stream(d))
+    assert "".join(out) == "Here is a quick answer for you."
+    assert out[0] == "Here is a quick "                  # passed through untouched below the target
+    assert d.read == 2 and d.closed                      # the rest was never pulled
+    stats = budget.reply_budget_stats()
+    assert stats["replies"] == 1 and stats["early_stops"] == 1
+
+
+def test_stream_without_a_sentence_end_stops_at_max_chars():
+    d = Deltas(["word " * 3, "word " * 3, "word " * 3, "word " * 3])
+    spoken = "".join(B.clip_stream(d))
+    assert len(spoken) == B.max_chars and d.closed and d.read == 3
+
+
+def test_short_stream_is_passed_through_and_closed():
+    d = Deltas(["Hi ", "there."])
+    assert list(B.clip_stream(d)) == ["Hi ", "there."]
+    assert d.closed
+    stats = budget.reply_budget_stats()
+    assert stats["early_stops"] == 0 and stats["clipped"] == 0
+
+
+def test_consumer_stopping_early_still_closes_upstream():
+    d = Deltas(["one ", "two ", "three."])
+    gen = B.clip_stream(d)
+    next(gen)
+    gen.close()
+    assert d.closed and budget.reply_budget_stats()["replies"] == 1
+
+
+def test_generated_vs_spoken_tokens_are_recorded():
+    d = Deltas(["Exactly twenty chars", ". Then forty more characters of unspoken text."])
+    list(B.clip_stream(d))
+    stats = budget.reply_budget_stats()
+    assert stats["spoken_tokens"] == (21 + 3) // 4
+    assert stats["generated_tokens"] > stats["spoken_tokens"] and stats["unspoken_share"] > 0
+
+
+@pytest.mark.parametrize("intent, affect, channel, tokens", [
+    ("greeting", None, "voice", 40),
+    ("complex", None, "voice", 130),
+    ("complex", "angry", "voice", 104),
+    ("task", None, "text", 225),
+    ("emo_sad", None, "voice", 70),
+])
+def test_reply_budget_follows_intent_affect_and_channel(monkeypatch, intent, affect, channel, tokens):
+    monkeypatch.setattr(budget, "classify_intent", lambda text: intent)
+    monkeypatch.setattr(budget.cfg, "LLM_MAX_TOKENS", 512, raising=False)
+    monkeypatch.setattr(budget.cfg, "REPLY_BUDGET", True, raising=False)
+    monkeypatch.setattr(budget.cfg, "REPLY_BUDGET_SCALE", 1.0, raising=False)
+    b = reply_budget("anything", affect, channel)
+    assert (b.intent, b.tokens, b.max_tokens) == (intent, tokens, int(tokens * 1.3) + 8)
+
+
+def test_reply_budget_respects_the_global_cap_and_the_off_switch(monkeypatch):
+    monkeypatch.setattr(budget, "classify_intent", lambda text: "complex")
+    monkeypatch.setattr(budget.cfg, "LLM_MAX_TOKENS", 100, raising=False)
+    monkeypatch.setattr(budget.cfg, "REPLY_BUDGET", True, raising=False)
+    assert reply_budget("x", channel="text").max_tokens == 100
+    monkeypatch.setattr(budget.cfg, "REPLY_BUDGET", False, raising=False)
+    assert reply_budget("x") == ReplyBudget(intent="complex", tokens=100, max_tokens=100)
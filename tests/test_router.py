@@ -0,0 +1,44 @@
+# tests/test_router.py
+import pytest
+
+from orchestrator import router
+
+HEAVY_QUERY = "Explain how a heat pump works in winter"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(router, "_stats", {})
+    monkeypatch.setattr(router.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(router.cfg, "ROUTER_PROBE_EVERY", 4, raising=False)
+    monkeypatch.setattr(router.cfg, "ROUTER_STATS_MAX_AGE_S", 600, raising=False)
+    return now
+
+
+def _fail_heavy(n: int = 10):
+    st = router.model_stats(router.HEAVY_MODEL)
+    for _ in range(n):
+        st.record(0.5, ok=False)
+    for _ in range(router._MIN_SAMPLES):
+        st.record(0.5, ok=True)
+
+
+def test_failing_heavy_model_still_gets_one_probe_in_n(clock):
+    _fail_heavy()
+    picks = [router.pick_style(HEAVY_QUERY)["model"] for _ in range(8)]
+    assert picks.count(router.HEAVY_MODEL) == 2
+    assert picks[3] == picks[7] == router.HEAVY_MODEL
+
+
+def test_bad_spell_ages_out(clock):
+    _fail_heavy()
+    assert router.pick_style(HEAVY_QUERY)["model"] == router.cfg.GROQ_MODEL
+    clock[0] += 601
+    st = router.model_stats(router.HEAVY_MODEL)
+    assert st.error_rate() == 0.0 and st.n() == 0
+    assert router.pick_style(HEAVY_QUERY)["model"] == router.HEAVY_MODEL     # warming stats again
+
+
+def test_simple_query_stays_on_the_light_model(clock):
+    assert router.pick_style("hi there")["model"] == router.cfg.GROQ_MODEL
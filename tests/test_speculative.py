@@ -0,0 +1,118 @@
+# tests/test_speculative.py
+import time
+
+import pytest
+
+from agent.schemas import Plan
+from orchestrator import speculative
+
+
+def _wait_for(cond, timeout: float = 2.0):
+    t_end = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > t_end:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def world(monkeypatch):
+    """Stubbed plan_and_answer / handle_turn; records what each was called with."""
+    w = {"planned": [], "turns": [], "cancels": [], "bound": True}
+
+    def fake_plan_and_answer(state, grounding, cancel=None, progress=None, site=None, **kw):
+        w["planned"].append((state.user_text, site))
+        w["cancels"].append(cancel)
+        progress["prompt_tokens"] = 100
+        progress["chars"] = 40
+        if cancel.wait(0.1):
+            return None
+        return Plan(intent="respond", confidence=0.8, response_hint=f"answer to {state.user_text}")
+
+    def fake_handle_turn(text, history, on_filler=None, channel="voice", plan=None):
+        w["turns"].append((text, plan))
+        return plan
+
+    monkeypatch.setattr(speculative.cfg, "SPECULATIVE", True, raising=False)
+    monkeypatch.setattr(speculative, "_stats", speculative._Stats())
+    monkeypatch.setattr(speculative, "_llm_bound", lambda text: w["bound"])
+    monkeypatch.setattr(speculative, "build_grounding", lambda: {})
+    monkeypatch.setattr(speculative, "detect_affect", lambda text: {})
+    monkeypatch.setattr(speculative, "fast_plan", lambda *a: None)
+    monkeypatch.setattr(speculative, "plan_and_answer", fake_plan_and_answer)
+    monkeypatch.setattr(speculative, "handle_turn", fake_handle_turn)
+    return w
+
+
+def _speculator():
+    return speculative.Speculator([], stable_ms=20)
+
+
+def test_hit_reuses_the_speculative_plan(world):
+    spec = _speculator()
+    spec.on_partial("what's the tallest mountain")
+    _wait_for(lambda: world["planned"])
+    time.sleep(0.05)                                 # the user is still finishing the sentence
+    plan = spec.finalize("What's the, um, tallest mountain?")
+
+    assert world["planned"] == [("what's the tallest mountain", "speculative")]
+    assert plan.response_hint == "answer to what's the tallest mountain"
+    assert world["turns"] == [("What's the, um, tallest mountain?", plan)]
+    stats = speculative.speculation_stats()
+    assert stats["started"] == 1 and stats["hits"] == 1 and stats["misses"] == 0
+    assert stats["saved_ms"] >= 40 and stats["wasted_tokens"] == 0 and stats["hit_rate"] == 1.0
+
+
+def test_miss_cancels_and_counts_wasted_tokens(world):
+    spec = _speculator()
+    spec.on_partial("what's the tallest mountain")
+    _wait_for(lambda: world["planned"])
+    spec.finalize("what's the tallest mountain in Africa")
+
+    assert world["cancels"][0].is_set()
+    assert world["turns"] == [("what's the tallest mountain in Africa", None)]     # turn runs from scratch
+    stats = speculative.speculation_stats()
+    assert stats["hits"] == 0 and stats["misses"] == 1
+    assert stats["wasted_tokens"] == 100 + (40 + 3) // 4 and stats["hit_rate"] == 0.0
+
+
+def test_changed_partial_drops_and_respeculates(world):
+    spec = _speculator()
+    spec.on_partial("play some")
+    _wait_for(lambda: world["planned"])
+    spec.on_partial("play some jazz")
+    assert world["cancels"][0].is_set()
+    _wait_for(lambda: len(world["planned"]) == 2)
+    plan = spec.finalize("play some jazz")
+
+    assert plan.response_hint == "answer to play some jazz"
+    stats = speculative.speculation_stats()
+    assert (stats["started"], stats["hits"], stats["misses"]) == (2, 1, 1)
+
+
+def test_unstable_partials_never_start(world):
+    spec = speculative.Speculator([], stable_ms=200)
+    for text in ("tell", "tell me", "tell me a", "tell me a joke"):
+        spec.on_partial(text)
+        time.sleep(0.02)
+    spec.finalize("tell me a joke")
+    assert world["planned"] == [] and world["turns"] == [("tell me a joke", None)]
+    assert speculative.speculation_stats()["started"] == 0
+
+
+def test_turns_that_skip_the_llm_are_not_speculated(world):
+    world["bound"] = False
+    spec = _speculator()
+    spec.on_partial("remind me to call mom at 6pm")
+    time.sleep(0.1)
+    spec.finalize("remind me to call mom at 6pm")
+    assert world["planned"] == []
+
+
+def test_reset_counts_a_miss(world):
+    spec = _speculator()
+    spec.on_partial("what's the tallest mountain")
+    _wait_for(lambda: world["planned"])
+    spec.reset()
+    assert world["cancels"][0].is_set()
+    assert speculative.speculation_stats()["misses"] == 1
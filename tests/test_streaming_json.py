@@ -0,0 +1,56 @@
+# tests/test_streaming_json.py
+import pytest
+
+from agent.utils import StreamingJSON, extract_first_json
+
+PLAN = '{"intent": "get_time", "tool_call": {"name": "get_time", "args": {}}, "response_hint": "It is \\"late\\", {really}."}'
+
+
+def _feed(text: str, step: int = 3) -> tuple:
+    p, fields = StreamingJSON(), []
+    for i in range(0, len(text), step):
+        fields += p.feed(text[i:i + step])
+    return p, fields
+
+
+@pytest.mark.parametrize("step", [1, 2, 7, len(PLAN)])
+def test_fields_complete_in_order_for_any_chunking(step):
+    p, fields = _feed("Sure! ```json\n" + PLAN + "\n``` trailing", step)
+    assert p.done and p.obj == extract_first_json(PLAN)
+    assert [k for k, _ in fields] == ["intent", "tool_call", "response_hint"]
+    assert fields[2][1] == 'It is "late", {really}.'
+
+
+@pytest.mark.parametrize("cut", range(1, len(PLAN)))
+def test_truncated_stream_never_invents_a_value(cut):
+    p, fields = _feed(PLAN[:cut])
+    assert not p.done and p.obj is None
+    full = dict(extract_first_json(PLAN))
+    for key, value in fields:
+        assert full[key] == value                    # only fields that really completed
+    assert extract_first_json(PLAN[:cut]) == {}
+
+
+def test_tool_call_is_available_before_the_hint_finishes():
+    cut = PLAN.index('"response_hint"') + len('"response_hint": "It is')
+    p, fields = _feed(PLAN[:cut])
+    assert dict(fields)["tool_call"] == {"name": "get_time", "args": {}}
+    assert p.partial("response_hint") == "It is"
+    assert p.partial("intent") is None
+
+
+def test_partial_keeps_escapes_raw_mid_string():
+    p, _ = _feed('{"reply": "say \\"hi')
+    assert p.partial("reply") == 'say \\"hi'
+
+
+def test_trailing_literal_and_stray_brace_in_prefix():
+    p, fields = _feed('note {not json} {"tool_call": null, "n": 3}')
+    assert p.obj == {"tool_call": None, "n": 3}
+    assert fields == [("tool_call", None), ("n", 3)]
+
+
+def test_nothing_after_done_is_parsed():
+    p = StreamingJSON()
+    p.feed('{"a": 1}')
+    assert p.feed('{"b": 2}') == [] and p.obj == {"a": 1}
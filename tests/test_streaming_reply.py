@@ -0,0 +1,89 @@
+# tests/test_streaming_reply.py
+"""The streamed reply path end to end against the offline SSE stub (eval/sse_stub.py)."""
+import json
+
+import pytest
+
+import llm
+import llm_backends
+from eval.sse_stub import start_stub
+from text_utils import StreamingSanitizer
+from thinker import controller
+from thinker.state import TurnState
+
+ANSWER = "Sure. Paris is lovely in spring, and the cafes stay open late. Bring a light coat."
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    servers = []
+
+    def run(reply: str):
+        srv, url = start_stub(reply=reply, delay_ms=2, first_delay_ms=0)
+        servers.append(srv)
+        monkeypatch.setattr(llm_backends, "_pool",
+                            llm_backends.BackendPool([llm_backends.OpenAIBackend("stub", url)]))
+
+    yield run
+    for srv in servers:
+        srv.shutdown()
+
+
+def test_sse_deltas_rebuild_the_reply(stub):
+    stub(ANSWER)
+    deltas = list(llm.stream_llm("hi", site="test"))
+    assert len(deltas) > 5
+    assert "".join(deltas) == ANSWER
+
+
+def test_first_sentence_is_ready_before_the_stream_ends(stub):
+    stub(ANSWER)
+    san = StreamingSanitizer(first_clause_chars=40)
+    deltas = list(llm.stream_llm("hi", site="test"))
+    segments, first_at = [], None
+    for i, d in enumerate(deltas):
+        out = san.feed(d)
+        if out and first_at is None:
+            first_at = i
+        segments += out
+    segments += san.flush()
+    assert first_at is not None and first_at < len(deltas) - 1
+    assert " ".join(segments) == ANSWER
+
+
+def test_single_pass_reply_is_spoken_while_it_streams(stub):
+    stub(json.dumps({"tool_call": None, "reply": ANSWER}))
+    heard = []
+
+    def on_stream(deltas):
+        for d in deltas:
+            heard.append(d)
+        return "".join(heard)
+
+    plan = controller.plan_and_answer(TurnState(user_text="tell me about paris in spring"), on_stream=on_stream)
+    assert plan.spoken and plan.tool_call is None
+    assert plan.response_hint == ANSWER
+    assert len(heard) > 1
+
+
+def test_single_pass_tool_call_is_not_spoken(stub):
+    stub(json.dumps({"tool_call": {"name": "add_reminder",
+                                   "args": {"text": "call mom", "when_iso": "2026-03-01T18:00:00"}},
+                     "reply": "Okay, I will remind you."}))
+    heard = []
+
+    def on_stream(deltas):
+        heard.extend(deltas)
+        return "".join(heard)
+
+    plan = controller.plan_and_answer(TurnState(user_text="remind me to call mom at six"), on_stream=on_stream)
+    assert heard == []
+    assert not plan.spoken and plan.tool_call.name == "add_reminder"
+
+
+def test_reply_deltas_decode_escapes_split_across_chunks():
+    chunks = ['{"tool_call": null, "reply": "He said \\', '"hi\\" ', 'then \\u00', 'e9t\\u00e9."}']
+    raw = []
+    out = list(controller._reply_deltas(iter(chunks), raw))
+    assert "".join(out) == 'He said "hi" then été.'
+    assert "".join(raw) == "".join(chunks)
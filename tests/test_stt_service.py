@@ -0,0 +1,94 @@
+# tests/test_stt_service.py
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from stt_service import BatchedSTTService, SAMPLE_RATE, _WINDOW_S
+
+WORDS = ["zero", "one", "two", "three", "four", "five", "six", "seven"]
+
+
+def _utt(i: int) -> np.ndarray:
+    """One second of audio whose first sample says which utterance it is."""
+    a = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    a[0] = i
+    return a
+
+
+class FakeModel:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def transcribe(self, audio, **_):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [SimpleNamespace(start=0.0, text=WORDS[int(audio[0])])], None
+
+
+class FakePipeline:
+    """BatchedInferencePipeline stand-in: one segment per clip, optionally slow."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batch_sizes = []
+
+    def transcribe(self, buf, batch_size, clip_timestamps, **_):
+        self.batch_sizes.append(batch_size)
+        time.sleep(self.delay)
+        win = int(_WINDOW_S * SAMPLE_RATE)
+        segs = []
+        for i, c in enumerate(clip_timestamps):
+            # faster-whisper 1.1 takes sample offsets here and times segments in seconds
+            assert isinstance(c["start"], int) and isinstance(c["end"], int)
+            assert c["start"] == i * win and c["end"] == i * win + SAMPLE_RATE
+            segs.append(SimpleNamespace(start=c["start"] / SAMPLE_RATE + 0.4, text=WORDS[int(buf[c["start"]])]))
+        return segs, None
+
+
+def _service(pipeline, delay: float = 0.0, **kw) -> BatchedSTTService:
+    svc = BatchedSTTService(model_size="tiny", **kw)
+    svc._model, svc._pipeline = FakeModel(delay), pipeline     # _load_model() keeps an existing model
+    return svc
+
+
+def test_batches_are_capped_and_results_map_back():
+    pipe = FakePipeline()
+    svc = _service(pipe, max_batch=3, max_wait_ms=300)
+    try:
+        futs = [svc.submit(_utt(i)) for i in range(5)]
+        assert [f.result(timeout=5) for f in futs] == WORDS[:5]
+    finally:
+        svc.shutdown()
+    assert max(pipe.batch_sizes) <= 3
+    stats = svc.stats()
+    assert sum(n * c for n, c in stats["batch_size_hist"].items()) == 5
+    # no silent sequential fallback: the plain model only ran for single-request batches
+    assert svc._model.calls == stats["batch_size_hist"].get(1, 0)
+    assert stats["completed"] == 5
+
+
+def test_request_past_its_deadline_is_not_decoded():
+    svc = _service(FakePipeline(), delay=0.3, max_batch=2, max_wait_ms=0)
+    try:
+        busy = svc.submit(_utt(1))
+        time.sleep(0.05)                              # worker is now inside the slow decode
+        late = svc.submit(_utt(2), deadline_s=0.05)
+        assert busy.result(timeout=5) == "one"
+        with pytest.raises(TimeoutError):
+            late.result(timeout=5)
+    finally:
+        svc.shutdown()
+    assert svc.stats()["expired"] == 1
+
+
+def test_single_request_uses_the_plain_model():
+    pipe = FakePipeline()
+    svc = _service(pipe, max_batch=4, max_wait_ms=0)
+    try:
+        assert svc.transcribe(_utt(3), timeout=5) == "three"
+    finally:
+        svc.shutdown()
+    assert pipe.batch_sizes == []
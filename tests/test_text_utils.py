@@ -0,0 +1,63 @@
+# tests/test_text_utils.py
+import pytest
+
+from text_utils import StreamingSanitizer, sanitize_stream, tts_sanitize
+
+FENCED = "Here you go. ```assistant\nsecret role text\n``` The rest is spoken aloud."
+HEADER = "assistant: The weather is mild today.\nuser\nBring a light coat anyway."
+MARKDOWN = "Use the `ls` command, then ``` pipe it ``` somewhere useful."
+ENTITY = "Tom &amp; Jerry said &quot;hi&quot; &#8212; then left. Fish &chips stay."
+
+
+def _spoken(fragments, **kw) -> str:
+    return " ".join(sanitize_stream(fragments, **kw))
+
+
+def _splits(text: str):
+    """Every way of cutting `text` into two deltas."""
+    return [[text[:i], text[i:]] for i in range(1, len(text))]
+
+
+@pytest.mark.parametrize("text", [FENCED, HEADER, MARKDOWN, ENTITY], ids=["fence", "role", "markdown", "entity"])
+def test_split_anywhere_matches_the_batch_sanitizer(text):
+    want = tts_sanitize(text)
+    for parts in _splits(text):
+        assert _spoken(parts) == want, parts
+    assert _spoken(list(text)) == want                  # one character per delta
+
+
+def test_role_fence_split_inside_the_label_is_dropped():
+    spoken = _spoken(["Here you go. ``", "`assi", "stant\nsecret role", " text\n`", "`` The rest."])
+    assert "secret" not in spoken and "assistant" not in spoken
+    assert spoken == "Here you go. The rest."
+
+
+def test_role_header_split_mid_word_is_dropped():
+    assert _spoken(["assi", "stant", ":", " Hello there, friend."]) == "Hello there, friend."
+    assert _spoken(["assistance", " is on the way."]) == "assistance is on the way."
+
+
+def test_entity_split_mid_name_is_unescaped():
+    assert _spoken(["Tom &a", "mp", "; Jerry"]) == "Tom & Jerry"
+    assert _spoken(["a &", "#82", "12; b"]) == "a — b"
+
+
+def test_ssml_characters_never_reach_the_speaker():
+    assert _spoken(["<spe", "ak>Hi {the", "re}</speak>"]) == "speakHi there/speak"
+
+
+@pytest.mark.parametrize("step", [1, 3, 17])
+def test_cap_is_applied_mid_stream(step):
+    text = "This sentence is long enough to be spoken. " * 10
+    san, out, fed_after_done = StreamingSanitizer(max_chars=100), [], 0
+    for i in range(0, len(text), step):
+        if san.done:
+            fed_after_done += 1
+        out += san.feed(text[i:i + step])
+    out += san.flush()
+
+    assert san.done and fed_after_done > 0               # capped before the stream ended
+    spoken = " ".join(out)
+    assert len(spoken) <= 100 + len("...") and spoken.endswith("...")
+    assert set(spoken[:-3].split()) <= set(text.split())     # cut on a word boundary
+    assert san.feed("more text") == [] and san.flush() == []
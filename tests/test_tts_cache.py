@@ -0,0 +1,108 @@
+# tests/test_tts_cache.py
+import os
+import time
+
+import pytest
+
+import tts_stream
+from tts_cache import TTSCache, cache_key
+from tts_stream import StreamMetrics
+
+try:
+    import tts
+except (ImportError, OSError):          # sounddevice without PortAudio raises OSError
+    tts = None
+
+
+def _file(tmp_path, name: str, size: int) -> str:
+    p = tmp_path / name
+    p.write_bytes(b"\0" * size)
+    return str(p)
+
+
+def test_key_depends_on_text_voice_and_rate():
+    k = cache_key("hello", "en-US-AriaNeural", "+0%")
+    assert k == cache_key("hello", "en-US-AriaNeural", "+0%")
+    assert k != cache_key("hello", "en-US-GuyNeural", "+0%")
+    assert k != cache_key("hello", "en-US-AriaNeural", "+10%")
+    assert k != cache_key("hello!", "en-US-AriaNeural", "+0%")
+
+
+def test_put_get_and_lru_eviction(tmp_path):
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=250)
+    for k in ("a", "b"):
+        cache.put(k, _file(tmp_path, k, 100))
+    assert cache.get("a")                    # "a" is now the most recently used
+    cache.put("c", _file(tmp_path, "c", 100))
+    assert cache.get("b") is None            # least recently used went first
+    assert cache.get("a") and cache.get("c")
+    s = cache.stats()
+    assert s["entries"] == 2 and s["bytes"] == 200
+    assert not os.path.exists(cache.path_for("b"))
+
+
+def test_index_survives_restart_in_mtime_order(tmp_path):
+    root = str(tmp_path / "cache")
+    cache = TTSCache(root, max_bytes=1000)
+    cache.put("old", _file(tmp_path, "old", 100))
+    time.sleep(0.02)
+    cache.put("new", _file(tmp_path, "new", 100))
+    os.utime(cache.path_for("old"), (1, 1))
+    again = TTSCache(root, max_bytes=150)     # smaller quota: the oldest file is evicted on scan
+    assert again.get("old") is None
+    assert again.get("new")
+
+
+# ----------------------------
+# Streaming path: only complete streams are cached
+# ----------------------------
+class _FakeSynth:
+    fmt = "mp3"
+
+    def cached(self, text):
+        return None
+
+
+def _fake_stream(complete: bool):
+    def stream_speak(text, backend, stop_flag=None, tee=None, sink=None):
+        tee.write(b"ID3partial-mp3")
+        return StreamMetrics(backend="fake", chunks=1, ttfa_s=0.01, synth_s=0.02, audio_s=0.5,
+                             complete=complete)
+    return stream_speak
+
+
+@pytest.mark.skipif(tts is None, reason="tts needs sounddevice/PortAudio")
+@pytest.mark.parametrize("complete, cached", [(True, True), (False, False)])
+def test_streamed_audio_is_cached_only_when_complete(tmp_path, monkeypatch, complete, cached):
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=10_000)
+    monkeypatch.setattr(tts, "get_synthesizer", lambda *a: _FakeSynth())
+    monkeypatch.setattr(tts, "get_cache", lambda: cache)
+    monkeypatch.setattr(tts_stream, "stream_speak", _fake_stream(complete))
+    monkeypatch.setattr(tts_stream, "ffmpeg_available", lambda: True)
+
+    assert tts._play_streaming("A reply that broke off.") is True
+    key = cache_key("A reply that broke off.", tts.cfg.VOICE, getattr(tts.cfg, "TTS_RATE", "+0%"))
+    assert (cache.get(key) is not None) is cached
+    assert not [n for n in os.listdir(cache.root) if n.endswith(".part")]
+
+
+class _BreaksAfter(tts_stream.StreamingBackend):
+    def __init__(self, n: int):
+        self.n = n
+
+    def stream(self, text):
+        for _ in range(self.n):
+            yield b"\0\0" * 240
+        raise ConnectionError("socket closed")
+
+
+def test_stream_error_after_first_audio_is_not_complete():
+    m = tts_stream.stream_speak("hi there", _BreaksAfter(2), sink=tts_stream.NullSink())
+    assert m.chunks == 2 and not m.interrupted
+    assert m.complete is False
+
+
+def test_stream_to_the_end_is_complete():
+    backend = tts_stream.ToneStreamBackend(chunk_delay_s=0)
+    m = tts_stream.stream_speak("one two three", backend, sink=tts_stream.NullSink())
+    assert m.chunks == 3 and m.complete
@@ -0,0 +1,119 @@
+# tests/test_tts_pipeline.py
+import threading
+import time
+
+import pytest
+
+try:
+    import tts
+except (ImportError, OSError):          # sounddevice without PortAudio raises OSError
+    tts = None
+
+pytestmark = pytest.mark.skipif(tts is None, reason="tts needs sounddevice/PortAudio")
+
+
+@pytest.fixture
+def stage(monkeypatch):
+    """Fake synthesis and playback that log (event, sentence, time) and honour should_stop."""
+    log, lock = [], threading.Lock()
+    timing = {"synth_s": 0.05, "play_s": 0.1}
+
+    def note(event, what):
+        with lock:
+            log.append((event, what, time.perf_counter()))
+
+    def fake_render(txt):
+        note("synth_start", txt)
+        time.sleep(timing["synth_s"])
+        note("synth_end", txt)
+        return tts.Clip(backend="fake", path=txt, cached=True)
+
+    def fake_play(clip, should_stop=None):
+        note("play_start", clip.path)
+        t_end = time.perf_counter() + timing["play_s"]
+        while time.perf_counter() < t_end:
+            if should_stop and should_stop():
+                note("play_cut", clip.path)
+                return False
+            time.sleep(0.005)
+        note("play_end", clip.path)
+        return True
+
+    stops = []
+    monkeypatch.setattr(tts, "_render", fake_render)
+    monkeypatch.setattr(tts, "_play_clip", fake_play)
+    monkeypatch.setattr(tts, "stop_speaking", lambda: stops.append(1))
+    return {"log": log, "timing": timing, "stops": stops}
+
+
+def _at(log, event, what):
+    return next(t for e, w, t in log if e == event and w == what)
+
+
+def test_next_sentence_is_synthesized_while_the_previous_one_plays(stage):
+    pipe = tts.SpeechPipeline()
+    for s in ("one", "two", "three"):
+        pipe.push(s)
+    pipe.close()
+    m = pipe.wait(5)
+
+    log = stage["log"]
+    assert (m.sentences, m.played, m.dropped) == (3, 3, 0)
+    assert _at(log, "synth_start", "two") < _at(log, "play_end", "one")
+    assert _at(log, "synth_end", "two") <= _at(log, "play_start", "two")
+    assert [w for e, w, _ in log if e == "play_start"] == ["one", "two", "three"]
+    # synthesis (50 ms) hides behind playback (100 ms): no gap waits on the synthesizer
+    assert len(m.gaps_s) == 2 and max(m.gaps_s) < 0.05
+    assert m.ttfa_s is not None and m.ttfa_s >= 0.05
+
+
+def test_cancel_cuts_only_this_pipeline(stage):
+    other = tts.SpeechJob(gen=-1)
+    with tts._speech_lock:
+        tts._active_jobs[other.gen] = other
+    try:
+        stage["timing"]["play_s"] = 5.0
+        pipe = tts.SpeechPipeline()
+        for s in ("one", "two", "three"):
+            pipe.push(s)
+        deadline = time.monotonic() + 2
+        while not any(e == "play_start" for e, _, _ in stage["log"]) and time.monotonic() < deadline:
+            time.sleep(0.005)
+        pipe.cancel()
+        m = pipe.wait(2)
+    finally:
+        with tts._speech_lock:
+            tts._active_jobs.pop(other.gen, None)
+
+    assert any(e == "play_cut" and w == "one" for e, w, _ in stage["log"])     # cut mid-clip
+    assert m.played == 0 and m.dropped >= 1
+    assert stage["stops"] == [] and not other.is_set()     # nobody else's speech was stopped
+    pipe.push("four")                                      # a cancelled pipeline takes no more text
+    assert m.sentences == 3
+
+
+def test_caller_stop_flag_drops_queued_sentences(stage):
+    stop = threading.Event()
+    stop.set()
+    pipe = tts.SpeechPipeline(stop)
+    pipe.push("never spoken")
+    pipe.close()
+    m = pipe.wait(2)
+    assert m.sentences == 0 and m.played == 0
+    assert not any(e == "synth_start" for e, _, _ in stage["log"])
+
+
+def test_handover_waits_for_the_previous_utterance_without_polling(monkeypatch):
+    monkeypatch.setattr(tts, "stop_speaking", lambda: None)
+    monkeypatch.setattr(tts, "_HANDOVER_S", 2.0)
+    first = tts._begin_speech()
+    threading.Timer(0.05, tts._end_speech, args=(first,)).start()
+    t = time.monotonic()
+    second = tts._begin_speech()
+    try:
+        waited = time.monotonic() - t
+        assert 0.03 <= waited < 1.0                       # woke on _end_speech, not on the deadline
+        assert tts._audio_system_busy.is_set() and not tts._audio_system_idle.is_set()
+    finally:
+        tts._end_speech(second)
+    assert tts._audio_system_idle.is_set() and not tts.is_speaking()
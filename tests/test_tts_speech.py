@@ -0,0 +1,66 @@
+# tests/test_tts_speech.py
+import pytest
+
+try:
+    import tts
+except (ImportError, OSError):          # sounddevice without PortAudio raises OSError
+    tts = None
+
+pytestmark = pytest.mark.skipif(tts is None, reason="tts needs sounddevice/PortAudio")
+
+
+class _Engine:
+    def __init__(self):
+        self.stops = 0
+
+    def stop(self):
+        self.stops += 1
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    eng = _Engine()
+    monkeypatch.setattr(tts, "get_engine", lambda: eng)
+    monkeypatch.setattr(tts, "_HANDOVER_S", 0.05)
+    yield eng
+    with tts._speech_lock:
+        jobs = list(tts._active_jobs.values())
+    for job in jobs:
+        tts._end_speech(job)
+
+
+def test_stale_job_cannot_end_the_next_utterance(engine):
+    first = tts._begin_speech()
+    second = tts._begin_speech()            # first never finished: handover times out
+    assert first.is_set() and not second.is_set()
+    assert engine.stops == 1
+
+    tts._end_speech(first)                  # late cleanup of the superseded job
+    assert not tts.mic_enabled.is_set()
+    assert tts._audio_system_busy.is_set() and tts.is_speaking()
+
+    tts._end_speech(second)
+    assert tts.mic_enabled.is_set()
+    assert not tts._audio_system_busy.is_set() and not tts.is_speaking()
+
+
+def test_stop_cancels_a_job_before_it_synthesizes(engine, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(tts, "_render", lambda txt: rendered.append(txt))
+    job = tts._begin_speech()
+    tts.stop_speaking()
+    assert job.is_set()
+
+    tts._speak_job("Too late to say this.", job)
+    assert rendered == []
+    assert tts.mic_enabled.is_set() and not tts._audio_system_busy.is_set()
+
+
+def test_caller_stop_flag_still_stops_the_job(engine):
+    import threading
+    flag = threading.Event()
+    job = tts._begin_speech(flag)
+    assert not job.is_set()
+    flag.set()
+    assert job.is_set()
+    tts._end_speech(job)
@@ -0,0 +1,90 @@
+# tests/test_tts_stream.py
+import threading
+
+import numpy as np
+import pytest
+
+import tts_stream
+from tts_stream import NullSink, StreamingBackend, ToneStreamBackend, stream_speak
+
+
+class FakeDecoder:
+    """Records how stream_speak() ends the decoder."""
+    instances = []
+
+    def __init__(self, *_):
+        self.closed = self.aborted = False
+        FakeDecoder.instances.append(self)
+
+    def feed(self, data):
+        return [np.frombuffer(data, dtype=np.int16)]
+
+    def close(self):
+        self.closed = True
+        return []
+
+    def abort(self):
+        self.aborted = True
+
+
+class Failing(StreamingBackend):
+    name = "failing"
+
+    def stream(self, text):
+        raise ConnectionError("handshake failed")
+        yield b""                                   # pragma: no cover
+
+
+@pytest.fixture
+def decoder(monkeypatch):
+    FakeDecoder.instances.clear()
+    monkeypatch.setattr(tts_stream, "make_decoder", FakeDecoder)
+    yield FakeDecoder.instances
+
+
+def test_backend_failing_before_audio_aborts_the_decoder(decoder):
+    with pytest.raises(ConnectionError):
+        stream_speak("hello", Failing(), sink=NullSink())
+    assert decoder[0].aborted and not decoder[0].closed
+
+
+def test_stop_aborts_the_decoder(decoder):
+    stop = threading.Event()
+    stop.set()
+    m = stream_speak("one two three", ToneStreamBackend(chunk_delay_s=0), sink=NullSink(), stop_flag=stop)
+    assert m.interrupted and not m.complete
+    assert decoder[0].aborted
+
+
+def test_finished_stream_closes_the_decoder(decoder):
+    sink = NullSink()
+    m = stream_speak("one two three", ToneStreamBackend(chunk_delay_s=0), sink=sink)
+    assert decoder[0].closed and not decoder[0].aborted
+    assert m.complete and sink.frames > 0 and m.ttfa_s is not None
+
+
+def test_decoder_unavailable_starts_no_synthesis(monkeypatch):
+    started = []
+
+    class Tracking(ToneStreamBackend):
+        def stream(self, text):
+            started.append(text)
+            yield from super().stream(text)
+
+    def no_ffmpeg(_):
+        raise RuntimeError("ffmpeg not found")
+
+    monkeypatch.setattr(tts_stream, "make_decoder", no_ffmpeg)
+    with pytest.raises(RuntimeError):
+        stream_speak("hello", Tracking(chunk_delay_s=0), sink=NullSink())
+    assert started == []
+
+
+@pytest.mark.skipif(not tts_stream.ffmpeg_available(), reason="ffmpeg not installed")
+def test_ffmpeg_abort_reaps_the_process():
+    dec = tts_stream.FFmpegMP3Decoder(24000)
+    dec.feed(b"\xff\xfb\x90\x00" * 8)
+    dec.abort()
+    assert dec._proc.poll() is not None
+    dec._reader.join(timeout=2)
+    assert not dec._reader.is_alive()
@@ -0,0 +1,162 @@
+# tests/test_tts_synth.py
+import sys
+import threading
+import time
+from types import ModuleType, SimpleNamespace
+
+import numpy as np
+import pytest
+
+try:
+    import tts
+except (ImportError, OSError):          # sounddevice without PortAudio raises OSError
+    tts = None
+
+pytestmark = pytest.mark.skipif(tts is None, reason="tts needs sounddevice/PortAudio")
+
+
+def _pcm(seconds: float, rate: int = 16000) -> np.ndarray:
+    return np.zeros(int(seconds * rate), dtype=np.int16)
+
+
+if tts is not None:
+    class FakeSynth(tts.Synthesizer):
+        """Scripted synthesizer: `reply` is a Clip, None (failed) or an exception; `delay_s` per render."""
+
+        def __init__(self, name, remote=False, reply="clip", delay_s=0.0, up=True):
+            self.name, self.remote, self.reply, self.delay_s, self.up = name, remote, reply, delay_s, up
+            self.rendered = []
+            self.done = threading.Event()
+
+        def available(self):
+            return self.up
+
+        def render(self, text):
+            self.rendered.append(text)
+            time.sleep(self.delay_s)
+            self.done.set()
+            if isinstance(self.reply, Exception):
+                raise self.reply
+            if self.reply == "clip":
+                return tts.Clip(backend=self.name, pcm=_pcm(1.0), sample_rate=16000)
+            return self.reply
+
+
+@pytest.fixture
+def synths(monkeypatch):
+    """Install an edge (remote) / local pair as the configured synthesizers."""
+    installed = {}
+
+    def install(edge, local):
+        installed.update(edge=edge, local=local)
+        monkeypatch.setattr(tts, "_synths", dict(installed))
+
+    monkeypatch.setattr(tts, "_rtf", {})
+    monkeypatch.setattr(tts.cfg, "TTS_BACKEND", "edge", raising=False)
+    monkeypatch.setattr(tts.cfg, "TTS_LOCAL_FALLBACK", True, raising=False)
+    monkeypatch.setattr(tts.cfg, "TTS_REMOTE_BUDGET_S", 0.2, raising=False)
+    return install
+
+
+@pytest.mark.parametrize("reply", [None, ConnectionError("edge handshake failed")], ids=["empty", "raises"])
+def test_failed_edge_render_falls_back_to_the_local_voice(synths, reply):
+    edge, local = FakeSynth("edge", remote=True, reply=reply), FakeSynth("local")
+    synths(edge, local)
+    clip = tts._render("hello there")
+    assert clip.backend == "local"
+    assert edge.rendered == ["hello there"] and local.rendered == ["hello there"]
+
+
+def test_slow_edge_render_misses_its_budget_and_is_discarded(synths, monkeypatch):
+    discarded = []
+    monkeypatch.setattr(tts, "_discard", discarded.append)
+    edge, local = FakeSynth("edge", remote=True, delay_s=0.5), FakeSynth("local")
+    synths(edge, local)
+    t = time.perf_counter()
+    clip = tts._render("hello there")
+    assert clip.backend == "local" and time.perf_counter() - t < 0.45
+    assert edge.done.wait(2)
+    deadline = time.monotonic() + 2
+    while not discarded and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [c.backend for c in discarded] == ["edge"]      # the late clip is not leaked
+
+
+def test_no_fallback_without_a_local_voice(synths):
+    edge, local = FakeSynth("edge", remote=True, reply=None), FakeSynth("local", up=False)
+    synths(edge, local)
+    assert tts._render("hello there") is None
+    assert local.rendered == []
+
+
+def test_cache_hit_skips_synthesis(synths, monkeypatch):
+    edge, local = FakeSynth("edge", remote=True), FakeSynth("local")
+    hit = tts.Clip(backend="edge", path="cached.mp3", cached=True, hit=True)
+    monkeypatch.setattr(edge, "cached", lambda text: hit)
+    synths(edge, local)
+    assert tts._render("hello there") is hit and edge.rendered == local.rendered == []
+
+
+def test_real_time_factor_is_tracked_per_backend(synths):
+    edge, local = FakeSynth("edge", remote=True, reply=None), FakeSynth("local", delay_s=0.05)
+    synths(edge, local)
+    for _ in range(3):
+        tts._render("hello there")
+    stats = tts.synth_stats()
+    assert list(stats) == ["local"]                        # failed renders record nothing
+    assert stats["local"]["n"] == 3 and 0.04 <= stats["local"]["rtf_p50"] < 0.5
+    clip = tts._timed_render(local, "again")
+    assert clip.synth_s >= 0.05
+
+
+@pytest.fixture
+def piper(monkeypatch):
+    """A fake piper-tts package; `api` picks the 1.2 (stream_raw) or 1.3 (synthesize) interface."""
+    loaded = []
+
+    def install(api="1.2", fail=False):
+        class Voice:
+            config = SimpleNamespace(sample_rate=22050)
+
+            @staticmethod
+            def load(path):
+                loaded.append(path)
+                if fail:
+                    raise FileNotFoundError(path)
+                return Voice()
+
+        raw = [b"\x01\x00" * 100, b"\x02\x00" * 50]
+        if api == "1.2":
+            Voice.synthesize_stream_raw = lambda self, text: iter(raw)
+        else:
+            Voice.synthesize = lambda self, text: iter(SimpleNamespace(audio_int16_bytes=r) for r in raw)
+        pkg, mod = ModuleType("piper"), ModuleType("piper.voice")
+        mod.PiperVoice = Voice
+        pkg.voice = mod
+        monkeypatch.setitem(sys.modules, "piper", pkg)
+        monkeypatch.setitem(sys.modules, "piper.voice", mod)
+        return loaded
+
+    return install
+
+
+@pytest.mark.parametrize("api", ["1.2", "1.3"])
+def test_local_piper_voice_renders_in_memory_pcm(piper, api):
+    loaded = piper(api)
+    synth = tts.LocalSynthesizer("voices/en_US.onnx")
+    assert synth.available()
+    clip = synth.render("hello")
+    assert clip.backend == "local" and clip.path is None
+    assert clip.sample_rate == 22050 and len(clip.pcm) == 150 and clip.pcm[0] == 1
+    synth.render("again")
+    assert loaded == ["voices/en_US.onnx"]                 # loaded once, reused
+
+
+def test_missing_piper_voice_is_reported_once(piper):
+    loaded = piper(fail=True)
+    synth = tts.LocalSynthesizer("voices/missing.onnx")
+    assert not synth.available() and not synth.available()
+    assert loaded == ["voices/missing.onnx"]
+    with pytest.raises(RuntimeError):
+        synth.render("hello")
+    assert not tts.LocalSynthesizer("").available()        # no model configured
@@ -0,0 +1,116 @@
+# tests/test_tts_worker.py
+import asyncio
+import sys
+import threading
+import time
+from types import ModuleType
+
+import pytest
+
+import tts_worker
+from tts_worker import TTSWorker
+
+
+class FakeCommunicate:
+    """edge_tts.Communicate stand-in: `chunks` audio chunks, optionally failing after them."""
+    chunks = 3
+    fail = None
+    made: list = []
+
+    def __init__(self, text, voice, rate="+0%", connector=None):
+        self.text, self.connector = text, connector
+        self.produced = 0
+        self.closed = False
+        FakeCommunicate.made.append(self)
+
+    async def stream(self):
+        try:
+            yield {"type": "WordBoundary", "offset": 0}
+            for i in range(self.chunks):
+                self.produced += 1
+                yield {"type": "audio", "data": bytes([i % 256]) * 4}
+                await asyncio.sleep(0)
+            if self.fail:
+                raise self.fail
+        finally:
+            self.closed = True                  # the websocket would be closed here
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    mod = ModuleType("edge_tts")
+    mod.Communicate = FakeCommunicate
+    monkeypatch.setitem(sys.modules, "edge_tts", mod)
+    monkeypatch.setattr(FakeCommunicate, "made", [])
+    w = TTSWorker()
+    yield w
+    w.shutdown()
+
+
+def _wait_for(cond, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_one_loop_and_connector_serve_every_job(worker, tmp_path):
+    assert worker.save("one", "voice", str(tmp_path / "1.mp3")).result(2)
+    thread, loop = worker._thread, worker._loop
+    assert worker.save("two", "voice", str(tmp_path / "2.mp3")).result(2)
+    assert list(worker.stream("three", "voice")) == [b"\x00" * 4, b"\x01" * 4, b"\x02" * 4]
+
+    assert worker._thread is thread and worker._loop is loop and thread.is_alive()
+    assert worker.stats()["shared_connector"]
+    first = FakeCommunicate.made[0].connector
+    assert first is not None and all(c.connector is first for c in FakeCommunicate.made)
+    assert (tmp_path / "1.mp3").read_bytes() == b"\x00" * 4 + b"\x01" * 4 + b"\x02" * 4
+    assert worker.stats()["worker"]["n"] == 3 and worker.stats()["worker"]["ttfb_ms_p50"] is not None
+
+
+def test_save_without_audio_reports_failure(worker, tmp_path, monkeypatch):
+    monkeypatch.setattr(FakeCommunicate, "chunks", 0)
+    assert worker.save("silence", "voice", str(tmp_path / "x.mp3")).result(2) is False
+
+
+def test_stream_error_reaches_the_consumer(worker, monkeypatch):
+    monkeypatch.setattr(FakeCommunicate, "fail", ConnectionError("socket closed"))
+    got = []
+    with pytest.raises(ConnectionError):
+        for chunk in worker.stream("hello", "voice"):
+            got.append(chunk)
+    assert len(got) == 3
+
+
+def test_stream_is_bounded_while_the_consumer_is_busy(worker, monkeypatch):
+    monkeypatch.setattr(FakeCommunicate, "chunks", 1000)
+    it = worker.stream("a long answer", "voice", max_chunks=4)
+    next(it)
+    time.sleep(0.1)                              # the speaker is still playing the first chunk
+    comm = FakeCommunicate.made[0]
+    assert comm.produced <= 1 + 4 + 1            # one taken, four queued, one waiting to be put
+    assert len(list(it)) == 999                  # and nothing is lost once the consumer catches up
+
+
+def test_stopping_the_consumer_stops_synthesis(worker, monkeypatch):
+    monkeypatch.setattr(FakeCommunicate, "chunks", 100_000)
+    it = worker.stream("a long answer", "voice", max_chunks=8)
+    for _ in range(3):
+        next(it)
+    it.close()                                   # barge-in: the consumer is gone
+    comm = FakeCommunicate.made[0]
+    _wait_for(lambda: comm.closed)
+    produced = comm.produced
+    time.sleep(0.05)
+    assert comm.produced == produced <= 3 + 8 + 1
+
+    # the loop is free for the next utterance
+    monkeypatch.setattr(FakeCommunicate, "chunks", 2)
+    assert len(list(worker.stream("next", "voice"))) == 2
+
+
+def test_worker_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(tts_worker.cfg, "TTS_WORKER", False, raising=False)
+    assert tts_worker.get_worker() is None
+    monkeypatch.setattr(tts_worker.cfg, "TTS_WORKER", True, raising=False)
+    assert tts_worker.get_worker() is tts_worker.get_worker()
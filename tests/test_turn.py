@@ -0,0 +1,59 @@
+# tests/test_turn.py
+import pytest
+
+from agent.schemas import Plan, ToolCall
+from orchestrator import turn
+
+TEXT = "please remind me to call mom friday evening"      # nothing for the memory catcher
+
+
+@pytest.fixture
+def single_pass(monkeypatch):
+    """handle_turn on the single-pass path with the LLM, tools and Thinker stubbed."""
+    w = {"plan": None, "result": {"ok": True}, "dispatched": [], "thought": []}
+
+    def fake_dispatch(tc):
+        w["dispatched"].append(tc.name)
+        return w["result"]
+
+    def fake_think(state, grounding, on_gate=None, on_stream=None):
+        w["thought"].append(state.user_text)
+        return "thinker reply"
+
+    monkeypatch.setattr(turn.cfg, "TURN_SINGLE_PASS", True, raising=False)
+    monkeypatch.setattr(turn.cfg, "FAST_PLANNER", "off", raising=False)
+    monkeypatch.setattr(turn, "build_grounding", lambda: {})
+    monkeypatch.setattr(turn, "llm_available", lambda: True)
+    monkeypatch.setattr(turn, "plan_and_answer", lambda *a, **kw: w["plan"])
+    monkeypatch.setattr(turn, "_dispatch_tool", fake_dispatch)
+    monkeypatch.setattr(turn, "think_and_act", fake_think)
+    return w
+
+
+@pytest.mark.parametrize("name, args", [
+    ("add_reminder", {"text": "call mom", "when_iso": "2026-10-23T18:00:00"}),
+    ("save_fact", {"key": "mom_phone", "value": "555"}),
+])
+def test_failed_tool_is_not_confirmed_by_the_plans_reply(single_pass, name, args):
+    single_pass["plan"] = Plan(intent="tool", confidence=0.8, tool_call=ToolCall(name=name, args=args),
+                               response_hint="Done! All set.")
+    single_pass["result"] = {"ok": False, "error": "firestore unavailable"}
+    result = turn.handle_turn(TEXT, [])
+    assert single_pass["dispatched"] == [name]
+    assert result.reply == turn._TOOL_FAILED[name] and "Done" not in result.reply
+    assert result.used_tool == name and result.tool_result["ok"] is False
+    assert single_pass["thought"] == []
+
+
+def test_successful_tool_uses_the_canned_confirmation(single_pass):
+    args = {"text": "call mom", "when_iso": "2026-10-23T18:00:00"}
+    single_pass["plan"] = Plan(intent="tool", confidence=0.8, tool_call=ToolCall(name="add_reminder", args=args),
+                               response_hint="Sure thing!")
+    result = turn.handle_turn(TEXT, [])
+    assert result.reply == "Reminder set: call mom at 2026-10-23T18:00:00."
+
+
+def test_plain_reply_is_spoken_as_is(single_pass):
+    single_pass["plan"] = Plan(intent="respond", confidence=0.8, response_hint="Friday it is.")
+    result = turn.handle_turn(TEXT, [])
+    assert result.reply == "Friday it is." and single_pass["dispatched"] == []
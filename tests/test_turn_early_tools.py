@@ -0,0 +1,109 @@
+# tests/test_turn_early_tools.py
+import threading
+
+import pytest
+
+from agent import planner
+from agent.schemas import ToolCall
+from orchestrator import turn
+
+
+@pytest.fixture(autouse=True)
+def fresh_llm_cache(monkeypatch):
+    import llm
+    monkeypatch.setattr(llm, "response_cache", llm.ResponseCache())
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    calls, gate = [], threading.Event()
+
+    def fake_dispatch(tc):
+        calls.append((tc.name, dict(tc.args)))
+        gate.wait(1)
+        return {"ok": True}
+
+    monkeypatch.setattr(turn, "_dispatch_tool", fake_dispatch)
+    yield calls
+    gate.set()
+
+
+def test_read_only_tool_starts_once(dispatched):
+    early = {}
+    tc = ToolCall(name="get_time", args={})
+    turn._dispatch_early(early, tc)
+    first = early["get_time"]
+    turn._dispatch_early(early, tc)                 # a repeated call must not submit again
+    assert early["get_time"] is first
+    first.result(2)
+    assert dispatched == [("get_time", {})]
+
+
+@pytest.mark.parametrize("name, args", [
+    ("save_fact", {"key": "wifi", "value": "tiger"}),
+    ("add_reminder", {"text": "call mom", "when_iso": "2026-10-19T18:00:00"}),
+    ("set_assistant_name", {"name": "Ivy"}),
+])
+def test_writing_tools_wait_for_the_final_plan(dispatched, name, args):
+    early = {}
+    turn._dispatch_early(early, ToolCall(name=name, args=args))
+    assert early == {} and dispatched == []
+
+
+def test_planner_hands_over_the_tool_call_mid_stream(monkeypatch):
+    chunks = ['{"intent": "get_time", "tool_call": {"name": "get_time", "args": {}}', ', "response_hint": "It is', ' noon."}']
+    seen = []
+
+    def fake_stream(prompt, **opts):
+        for i, c in enumerate(chunks):
+            seen.append(("chunk", i))
+            yield c
+
+    monkeypatch.setattr(planner, "stream_llm", fake_stream)
+    monkeypatch.setattr(planner, "render_grounding", lambda g, t: "")
+    plan = planner.plan_turn("what time is it", {}, on_tool_call=lambda tc: seen.append(("tool", tc.name)))
+    assert seen == [("chunk", 0), ("tool", "get_time"), ("chunk", 1), ("chunk", 2)]
+    assert plan.tool_call.name == "get_time" and plan.response_hint == "It is noon."
+
+
+def test_cached_plan_is_replayed_instead_of_streamed(monkeypatch):
+    import llm
+    monkeypatch.setattr(llm.cfg, "LLM_CACHE", "auto", raising=False)
+    monkeypatch.setattr(planner, "render_grounding", lambda g, t: "")
+    streams = []
+
+    def fake_stream(prompt, **opts):
+        streams.append(opts)
+        yield '{"intent": "get_time", "tool_call": {"name": "get_time", "args": {}}, "response_hint": "Noon."}'
+        yield " trailing text the plan does not need"
+
+    monkeypatch.setattr(planner, "stream_llm", fake_stream)
+    tools = []
+    first = planner.plan_turn("what time is it", {}, on_tool_call=lambda tc: tools.append(tc.name))
+    second = planner.plan_turn("what time is it", {}, on_tool_call=lambda tc: tools.append(tc.name))
+    assert len(streams) == 1 and streams[0]["temperature"] == 0.0
+    assert tools == ["get_time", "get_time"]                 # early dispatch still fires on a hit
+    assert first == second and llm.response_cache.stats()["hits"] == 1
+
+
+def test_two_pass_time_answer_uses_the_early_result(monkeypatch):
+    calls = []
+
+    def fake_dispatch(tc):
+        calls.append(tc.name)
+        return {"ok": True, "now_human": "Monday, 19 October 2026, 12:00 PM", "tz": "UTC"}
+
+    def fake_plan_turn(text, grounding, affect, on_tool_call=None):
+        tc = ToolCall(name="get_time", args={})
+        on_tool_call(tc)
+        return planner.Plan(intent="get_time", confidence=0.9, tool_call=tc, response_hint="It is noon, I think.")
+
+    monkeypatch.setattr(turn.cfg, "TURN_SINGLE_PASS", False, raising=False)
+    monkeypatch.setattr(turn.cfg, "FAST_PLANNER", "off", raising=False)
+    monkeypatch.setattr(turn, "build_grounding", lambda: {})
+    monkeypatch.setattr(turn, "_maybe_local_answer", lambda text: None)
+    monkeypatch.setattr(turn, "_dispatch_tool", fake_dispatch)
+    monkeypatch.setattr(turn, "plan_turn", fake_plan_turn)
+    result = turn.handle_turn("clock check please", [])
+    assert calls == ["get_time"]                             # dispatched early, not again
+    assert result.reply == "The current time is Monday, 19 October 2026, 12:00 PM."
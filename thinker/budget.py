@@ -0,0 +1,139 @@
+# thinker/budget.py
+"""
+Reply-length governor: ask for as many tokens as we will actually speak.
+
+    b = reply_budget(user_text, affect, channel="voice")
+    style["max_tokens"] = b.max_tokens
+    reply = b.clip(call_llm_with_style(prompt, style))
+    # streaming: speak_while_generating(b.clip_stream(stream_llm(prompt, max_tokens=b.max_tokens)))
+
+The spoken target comes from the utterance's intent (greetings and
+feelings get a sentence or two, "explain/plan" questions a paragraph),
+shortened for an upset user and lengthened for the text channel.
+max_tokens leaves a little headroom so the last sentence can finish; past
+the target, text is cut (or a stream stopped) at the first sentence end.
+Generated vs spoken tokens are recorded (reply_budget_stats()).
+"""
+from __future__ import annotations
+import re
+import threading
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from config import cfg
+from intent import (classify_intent, INT_GREETING, INT_CHITCHAT, INT_TASK, INT_COMPLEX, INT_HAPPY)
+from telemetry.logger import log_event
+from thinker.prompt import estimate_tokens
+
+# spoken tokens per intent on the voice channel (~4 chars each; 100 tokens ≈ 20 s of speech)
+_VOICE_TOKENS = {INT_GREETING: 40, INT_CHITCHAT: 60, INT_HAPPY: 50, INT_TASK: 90, INT_COMPLEX: 130}
+_EMOTION_TOKENS = 70                 # emo_* intents: a short, warm answer
+_TEXT_SCALE = 2.5                    # screens can take longer answers than ears
+_UPSET = {"angry", "sad"}            # agent.affect labels: get to the point
+
+_SENTENCE_END = re.compile(r"[.!?…][\"')\]]*(?=\s)")
+
+
+@dataclass
+class ReplyBudget:
+    intent: str
+    tokens: int                      # spoken target
+    max_tokens: int                  # request cap (target + headroom to finish the sentence)
+
+    @property
+    def chars(self) -> int:
+        return self.tokens * 4
+
+    @property
+    def max_chars(self) -> int:
+        return self.max_tokens * 4
+
+    def clip(self, text: str) -> str:
+        """Cut at the first sentence end past the target (hard stop at max_chars)."""
+        text = (text or "").strip()
+        if len(text) <= self.chars:
+            return text
+        m = _SENTENCE_END.search(text + " ", self.chars)
+        if m and m.end() <= self.max_chars:
+            return text[:m.end()].strip()
+        cut = text[:self.max_chars].rstrip()
+        return cut if len(text) <= self.max_chars else cut + "..."
+
+    def clip_stream(self, deltas: Iterator[str]) -> Iterator[str]:
+        """
+        Pass deltas through until the target is reached, then stop at the
+        first sentence end; the upstream generator (and its HTTP stream) is
+        closed so nothing more is generated for nothing.
+        """
+        seen, out, stopped = [], 0, False
+        pending = ""                 # text past the target, held until we know where the sentence ends
+        try:
+            for d in deltas:
+                seen.append(d)
+                if out < self.chars:
+                    take = d[:max(0, self.chars - out)]
+                    out += len(take)
+                    if take:
+                        yield take
+                    pending = d[len(take):]
+                else:
+                    pending += d
+                if not pending:
+                    continue
+                m = _SENTENCE_END.search(pending)
+                if m or out + len(pending) >= self.max_chars:
+                    end = m.end() if m else max(0, self.max_chars - out)
+                    if pending[:end]:
+                        yield pending[:end]
+                    out += end
+                    stopped = True
+                    return
+            if pending:
+                out += len(pending)
+                yield pending
+        finally:
+            close = getattr(deltas, "close", None)
+            if close:
+                close()
+            record_reply(self, estimate_tokens("".join(seen)), (out + 3) // 4, early_stop=stopped)
+
+
+def reply_budget(user_text: str, affect: Optional[str] = None, channel: str = "voice") -> ReplyBudget:
+    """Budget for this turn's reply; REPLY_BUDGET=0 falls back to LLM_MAX_TOKENS everywhere."""
+    cap = int(getattr(cfg, "LLM_MAX_TOKENS", 512))
+    intent = classify_intent(user_text)
+    if not getattr(cfg, "REPLY_BUDGET", True):
+        return ReplyBudget(intent=intent, tokens=cap, max_tokens=cap)
+    tokens = _VOICE_TOKENS.get(intent, _EMOTION_TOKENS if intent.startswith("emo_") else 90)
+    if isinstance(affect, str) and affect in _UPSET:
+        tokens = int(tokens * 0.8)
+    if channel == "text":
+        tokens = int(tokens * _TEXT_SCALE)
+    tokens = max(16, min(cap, int(tokens * float(getattr(cfg, "REPLY_BUDGET_SCALE", 1.0)))))
+    return ReplyBudget(intent=intent, tokens=tokens, max_tokens=min(cap, int(tokens * 1.3) + 8))
+
+
+# ----------------------------
+# Stats: tokens generated vs spoken
+# ----------------------------
+_lock = threading.Lock()
+_totals = {"replies": 0, "generated_tokens": 0, "spoken_tokens": 0, "early_stops": 0, "clipped": 0}
+
+
+def record_reply(budget: ReplyBudget, generated_tokens: int, spoken_tokens: int, early_stop: bool = False):
+    with _lock:
+        _totals["replies"] += 1
+        _totals["generated_tokens"] += generated_tokens
+        _totals["spoken_tokens"] += spoken_tokens
+        _totals["early_stops"] += 1 if early_stop else 0
+        _totals["clipped"] += 1 if spoken_tokens < generated_tokens else 0
+    log_event("reply_budget", {"intent": budget.intent, "target": budget.tokens, "max_tokens": budget.max_tokens,
+                               "generated": generated_tokens, "spoken": spoken_tokens, "early_stop": early_stop})
+
+
+def reply_budget_stats() -> dict:
+    with _lock:
+        t = dict(_totals)
+    gen = t["generated_tokens"]
+    t["unspoken_share"] = round(1 - t["spoken_tokens"] / gen, 3) if gen else None
+    return t
@@ -1,11 +1,21 @@
 ﻿# thinker/controller.py
+import re
+import json
+import logging
+
 from thinker.state import TurnState
-from thinker.policy import build_system_prompt
+from thinker.policy import SYSTEM_RULES
+from thinker.prompt import build_prompt, estimate_tokens
 from thinker.reflect import light_reflect
+from thinker.budget import reply_budget, record_reply
 
 from memory_catcher import catch_memory
-from llm import ask_llm_full
 from intent import classify_intent, maybe_empathy_reply, maybe_greeting_reply
+from config import cfg
+from agent.schemas import Plan, ToolCall
+from agent.utils import extract_first_json, StreamingJSON
+from llm import stream_llm
+from agent.skills.registry import SKILLS
 
 try:
     from firebase_db import load_facts
@@ -27,28 +37,169 @@ def _maybe_local_answer(text: str) -> str | None:
         return f"I don't have your {key} yet."
     return None
 
-def think_and_act(state: TurnState, grounding: dict | None = None) -> str:
-    local = _maybe_local_answer(state.user_text)
+def _canned(text: str) -> str | None:
+    local = _maybe_local_answer(text)
     if local:
         return local
+    intent = classify_intent(text)
+    return maybe_greeting_reply(text) or maybe_empathy_reply(text, intent)
+
+def _stream_opts(style: dict) -> dict:
+    return {"model": style.get("model"), "temperature": style.get("temperature"),
+            "max_tokens": style.get("max_tokens")}
 
-    # light canned replies
-    intent = classify_intent(state.user_text)
-    canned = maybe_greeting_reply(state.user_text) or maybe_empathy_reply(state.user_text, intent)
+def think_and_act(state: TurnState, grounding: dict | None = None, on_gate=None, on_stream=None) -> str:
+    """
+    Final LLM reply. With `on_stream` (deltas -> spoken text, e.g.
+    streaming.speak_while_generating) the reply is streamed into it and
+    the spoken text is returned.
+    """
+    # local answers and light canned replies
+    canned = _canned(state.user_text)
     if canned:
         return canned
 
-    gtxt = ""
-    if grounding:
-        gtxt = (
-            "GROUND TRUTH (authoritative):\n"
-            f"- Now: {grounding.get('now_human')} ({grounding.get('tz')})\n"
-            f"- Assistant name: {grounding.get('assistant_name')}\n"
-            f"- User name: {grounding.get('user_name')}\n"
-            f"- Facts: {grounding.get('facts', {})}\n"
-            f"- Reminders: {grounding.get('reminders', [])}\n"
-        )
-    sys_prompt = build_system_prompt(gtxt)
-    raw = ask_llm_full(f"{sys_prompt}\n\nUser: {state.user_text}") or ""
-    reply = raw.split("assistant\n", 1)[-1].strip() if "assistant\n" in raw else raw.strip()
-    return light_reflect(reply)
+    prompt = build_prompt(state.user_text, SYSTEM_RULES, grounding, history=state.history)
+    logging.debug(f"Thinker prompt ~{prompt.total} tokens {prompt.tokens}")
+    budget = reply_budget(state.user_text, state.affect, state.channel)
+    from orchestrator.router import pick_style, call_llm_with_style   # lazy: orchestrator/__init__ imports turn → us
+    style = {**pick_style(state.user_text), "max_tokens": budget.max_tokens}
+    if on_stream is not None:
+        return on_stream(budget.clip_stream(stream_llm(prompt.text, site="thinker", **_stream_opts(style))))
+    raw = call_llm_with_style(prompt.text, style, on_gate=on_gate)
+    reply = budget.clip(raw)
+    if raw:
+        record_reply(budget, estimate_tokens(raw), estimate_tokens(reply))
+    return light_reflect(reply, budget.max_chars)
+
+# ----------------------------
+# Single pass: plan + answer in one completion
+# ----------------------------
+SINGLE_PASS_FORMAT = (
+    'Answer with JSON only, no markdown: {"tool_call": {"name": str, "args": object} | null, "reply": str}\n'
+    'Tools: set_assistant_name {name}; save_fact {key, value}; add_reminder {text, when_iso}; get_time {}.\n'
+    '- If the user asks to rename you, store a fact about themselves, or set a reminder, fill tool_call '
+    'and leave reply empty: the confirmation is spoken once the tool has run.\n'
+    '- Otherwise tool_call is null and reply is the full spoken answer.'
+)
+
+_REPLY_FIELD = re.compile(r'"reply"\s*:\s*"((?:\\.|[^"\\])*)"', re.DOTALL)
+
+def parse_single_pass(raw: str, max_chars: int = 600) -> Plan | None:
+    """
+    Validate a single-pass completion into a Plan (response_hint = reply).
+    Tolerates prose around the JSON, salvages "reply" from broken JSON and
+    takes plain text as the reply. Unknown tools are dropped. None means
+    nothing usable came back.
+    """
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    obj = extract_first_json(raw)
+    if not isinstance(obj, dict) or not obj:
+        m = _REPLY_FIELD.search(raw)
+        if m:
+            try:
+                obj = {"reply": json.loads(f'"{m.group(1)}"')}
+            except ValueError:
+                obj = {}
+        elif "{" not in raw:
+            obj = {"reply": raw}
+        if not obj:
+            return None
+
+    tc = None
+    tool = obj.get("tool_call")
+    if isinstance(tool, dict) and tool.get("name") in SKILLS:
+        args = tool.get("args") if isinstance(tool.get("args"), dict) else {}
+        tc = ToolCall(name=tool["name"], args=args)
+    elif tool:
+        logging.info(f"Single pass: dropped invalid tool_call {str(tool)[:80]}")
+
+    reply = obj.get("reply")
+    reply = light_reflect(reply, max_chars) if isinstance(reply, str) and reply.strip() else None
+    if tc is None and reply is None:
+        return None
+    return Plan(intent="tool" if tc else "respond", confidence=0.8, tool_call=tc, response_hint=reply)
+
+def _decode_partial(raw: str) -> str:
+    """Decode a JSON string body that may end mid-escape (drops the incomplete tail)."""
+    for cut in range(0, min(6, len(raw)) + 1):
+        try:
+            return json.loads(f'"{raw[:len(raw) - cut]}"')
+        except ValueError:
+            continue
+    return ""
+
+def _reply_deltas(deltas, raw: list):
+    """
+    Text of the completion's "reply" field as it streams, once "tool_call"
+    is known to be null; nothing for a tool call. Every delta received is
+    appended to `raw`. Stops when the reply string closes.
+    """
+    p, said = StreamingJSON(), ""
+    for d in deltas:
+        raw.append(d)
+        p.feed(d)
+        if "tool_call" not in p.fields or p.fields["tool_call"]:
+            continue
+        done = isinstance(p.fields.get("reply"), str)
+        text = p.fields["reply"] if done else _decode_partial(p.partial("reply") or "")
+        if len(text) > len(said) and text.startswith(said):
+            yield text[len(said):]
+            said = text
+        if done:
+            return
+
+def _stream_single_pass(prompt_text: str, style: dict, site: str, budget, on_stream) -> tuple[str, str]:
+    """(raw completion, spoken reply); the reply is spoken while it is generated."""
+    raw: list = []
+    gen = stream_llm(prompt_text, site=site, **_stream_opts(style))
+    try:
+        spoken = on_stream(budget.clip_stream(_reply_deltas(gen, raw))) or ""
+        if not spoken:
+            raw.extend(gen)                 # tool call or malformed: read the rest to parse it
+    finally:
+        gen.close()                         # reply spoken: the closing brace is not worth waiting for
+    return "".join(raw), spoken.strip()
+
+def plan_and_answer(state: TurnState, grounding: dict | None = None, on_gate=None,
+                    cancel=None, progress: dict | None = None, site: str = "single_pass",
+                    on_stream=None) -> Plan | None:
+    """
+    One LLM round trip instead of plan_turn() + think_and_act(): the reply
+    carries either a tool call or the final answer. Canned/local answers
+    still skip the LLM. Returns None when the completion is unusable, so
+    the caller can fall back to the two-pass path. `cancel` / `progress`
+    make the call droppable (see router.call_llm_with_style). With
+    `on_stream` a plain answer is spoken while it streams; the returned
+    Plan then has `spoken` set.
+    """
+    canned = _canned(state.user_text)
+    if canned:
+        return Plan(intent="respond", confidence=1.0, response_hint=canned)
+
+    prompt = build_prompt(state.user_text, SYSTEM_RULES, grounding, history=state.history, tail=SINGLE_PASS_FORMAT)
+    logging.debug(f"Single-pass prompt ~{prompt.total} tokens {prompt.tokens}")
+    if progress is not None:
+        progress["prompt_tokens"] = prompt.total
+    budget = reply_budget(state.user_text, state.affect, state.channel)
+    # the JSON wrapper and a possible tool call cost tokens that are never spoken
+    from orchestrator.router import pick_style, call_llm_with_style
+    style = {**pick_style(state.user_text), "max_tokens": budget.max_tokens + 40,
+             "temperature": float(getattr(cfg, "SINGLE_PASS_TEMPERATURE", 0.0))}
+    if on_stream is not None and cancel is None:
+        raw, spoken = _stream_single_pass(prompt.text, style, site, budget, on_stream)
+        if spoken:
+            return Plan(intent="respond", confidence=0.8, response_hint=spoken, spoken=True)
+    else:
+        raw = call_llm_with_style(prompt.text, style, on_gate=on_gate, site=site, cancel=cancel, progress=progress)
+    if cancel is not None and cancel.is_set():
+        return None
+    plan = parse_single_pass(raw, budget.max_chars)
+    if plan is None and raw:
+        logging.warning(f"Single pass: unusable completion {raw[:120]!r}")
+    if plan is not None and plan.tool_call is None and plan.response_hint:
+        plan.response_hint = budget.clip(plan.response_hint)
+        record_reply(budget, estimate_tokens(raw), estimate_tokens(plan.response_hint))
+    return plan
@@ -1,15 +1,18 @@
 ﻿# thinker/policy.py
 
-def build_system_prompt(grounding: str) -> str:
-    return f"""You are Irish, a helpful voice assistant.
+# Static part of the system prompt (grounding is appended per turn; see thinker/prompt.py)
+_PERSONA = """You are Irish, a helpful voice assistant.
 
 Follow the GROUND TRUTH if present; otherwise reason step by step.
+"""
 
-GROUND TRUTH (authoritative):
-{grounding}
-
-Rules:
+_RULES = """Rules:
 - Use GROUND TRUTH for time, facts, reminders.
 - If unknown, admit and suggest searching.
 - Keep replies crisp and natural.
 """
+
+SYSTEM_RULES = f"{_PERSONA}\n{_RULES}"
+
+def build_system_prompt(grounding: str) -> str:
+    return f"{_PERSONA}\nGROUND TRUTH (authoritative):\n{grounding}\n\n{_RULES}"
@@ -0,0 +1,170 @@
+# thinker/prompt.py
+"""
+Token-budgeted prompt assembly for the planner and the thinker.
+
+    p = build_prompt(user_text, system=SYSTEM_RULES, grounding=g,
+                     history=state.history, tail=SINGLE_PASS_FORMAT)
+    call_llm(p.text)            # p.tokens: estimated tokens per section
+
+Each section (system, grounding, history, passages) has its own budget
+(PROMPT_BUDGET_*). Grounding items are ranked — time and names first, then
+facts and reminders by relevance to the utterance — and the lowest-value
+ones are dropped once the budget is spent; older history turns are
+shortened before they are dropped. Static sections are rendered once.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from config import cfg
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOP = {"the", "a", "an", "is", "my", "me", "i", "you", "to", "of", "and", "what", "when", "do", "it", "in", "on", "for"}
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 chars per token for English (what the Llama/OpenAI tokenizers average); no tokenizer needed."""
+    return (len(text or "") + 3) // 4
+
+
+def _budget(name: str, default: int) -> int:
+    return int(getattr(cfg, f"PROMPT_BUDGET_{name}", default))
+
+
+def _clip(text: str, max_chars: int) -> str:
+    text = " ".join(str(text or "").split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > max_chars // 2 else cut).rstrip(" ,;") + "…"
+
+
+def _words(text: str) -> set:
+    return {w for w in _WORD.findall((text or "").lower()) if w not in _STOP}
+
+
+@lru_cache(maxsize=32)
+def _static(text: str, budget: int) -> tuple:
+    """Rendered + measured static section (system rules, output format)."""
+    text = (text or "").strip()
+    if estimate_tokens(text) > budget:
+        text = _clip(text, budget * 4)
+    return text, estimate_tokens(text)
+
+
+# ----------------------------
+# Sections
+# ----------------------------
+def grounding_items(grounding: Dict[str, Any], user_text: str = "") -> List[tuple]:
+    """(value, order, line) for every grounding item; higher value survives tighter budgets."""
+    g = grounding or {}
+    q = _words(user_text)
+    items = []
+    if g.get("now_human"):
+        tz = f" ({g['tz']})" if g.get("tz") else ""
+        items.append((1.0, 0, f"- Now: {g['now_human']}{tz}"))
+    if g.get("assistant_name"):
+        items.append((0.9, 1, f"- Assistant name: {g['assistant_name']}"))
+    if g.get("user_name"):
+        items.append((0.9, 2, f"- User name: {g['user_name']}"))
+    for i, (k, v) in enumerate((g.get("facts") or {}).items()):
+        overlap = len(q & _words(f"{k} {v}"))
+        items.append((0.4 + min(0.5, 0.25 * overlap) - 0.001 * i, 3,
+                      f"- {str(k).replace('_', ' ')}: {_clip(v, 80)}"))
+    asks_reminders = bool(q & {"remind", "reminder", "reminders", "schedule", "today", "tomorrow", "plans"})
+    reminders = sorted(g.get("reminders") or [], key=lambda r: str(r.get("time") or r.get("when_iso") or ""))
+    for i, r in enumerate(reminders):
+        msg = r.get("message") or r.get("text") or ""
+        when = r.get("time") or r.get("when_iso") or ""
+        base = 0.85 if asks_reminders else 0.35
+        items.append((base - 0.02 * i, 4, f"- Reminder: {_clip(msg, 60)}" + (f" @ {when}" if when else "")))
+    return items
+
+
+def render_grounding(grounding: Dict[str, Any], user_text: str = "", budget: int = None) -> str:
+    """Highest-value grounding lines that fit `budget` tokens, in a stable order."""
+    budget = budget if budget is not None else _budget("GROUNDING", 250)
+    header = "GROUND TRUTH (authoritative):"
+    used = estimate_tokens(header)
+    keep = []
+    for value, order, line in sorted(grounding_items(grounding, user_text), key=lambda x: -x[0]):
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            continue                 # a shorter, lower-value line may still fit
+        keep.append((order, -value, line))
+        used += cost
+    if not keep:
+        return ""
+    return "\n".join([header] + [line for _, _, line in sorted(keep)])
+
+
+def render_history(history: List[Dict[str, str]], budget: int = None, full_turns: int = 2) -> str:
+    """Most recent turns within `budget`; beyond the last `full_turns` exchanges messages are shortened."""
+    budget = budget if budget is not None else _budget("HISTORY", 300)
+    lines, used = [], 0
+    recent = list(history or [])[-40:]
+    for age, m in enumerate(reversed(recent)):
+        role = "User" if (m.get("role") or "user") == "user" else "Assistant"
+        limit = 240 if age < full_turns * 2 else 90
+        line = f"{role}: {_clip(m.get('content'), limit)}"
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    if not lines:
+        return ""
+    return "Recent conversation:\n" + "\n".join(reversed(lines))
+
+
+def render_passages(passages: List[str], budget: int = None) -> str:
+    budget = budget if budget is not None else _budget("PASSAGES", 300)
+    out, used = [], 0
+    for p in passages or []:
+        line = f"- {_clip(p, 400)}"
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        out.append(line)
+        used += cost
+    return ("Relevant notes:\n" + "\n".join(out)) if out else ""
+
+
+# ----------------------------
+# Assembly
+# ----------------------------
+@dataclass
+class BuiltPrompt:
+    text: str
+    tokens: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.tokens.values())
+
+
+def build_prompt(user_text: str, system: str, grounding: Optional[Dict[str, Any]] = None,
+                 history: Optional[List[Dict[str, str]]] = None, passages: Optional[List[str]] = None,
+                 tail: str = "", user_label: str = "User", answer_label: str = "") -> BuiltPrompt:
+    """
+    system / tail are static (cached); grounding, history and passages are
+    budgeted per call. Returns the prompt and its estimated tokens per section.
+    """
+    sys_text, sys_tok = _static(system, _budget("SYSTEM", 400))
+    tail_text, tail_tok = _static(tail, _budget("SYSTEM", 400)) if tail else ("", 0)
+    sections = {
+        "system": sys_text,
+        "grounding": render_grounding(grounding, user_text) if grounding else "",
+        "passages": render_passages(passages) if passages else "",
+        "history": render_history(history) if history else "",
+        "format": tail_text,
+    }
+    user = f"{user_label}: {user_text}"
+    parts = [s for s in sections.values() if s] + [user] + ([answer_label] if answer_label else [])
+    tokens = {k: (sys_tok if k == "system" else tail_tok if k == "format" else estimate_tokens(v))
+              for k, v in sections.items() if v}
+    tokens["user"] = estimate_tokens(user)
+    return BuiltPrompt(text="\n\n".join(parts), tokens=tokens)
@@ -1,5 +1,5 @@
-﻿def light_reflect(reply: str) -> str:
+﻿def light_reflect(reply: str, max_chars: int = 600) -> str:
     txt = (reply or "").strip()
-    if len(txt) > 600:
-        txt = txt[:580].rstrip() + "..."
+    if len(txt) > max_chars:
+        txt = txt[:max_chars - 20].rstrip() + "..."
     return txt
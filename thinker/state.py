@@ -7,3 +7,4 @@ class TurnState:
     user_text: str
     history: List[Dict[str, str]] = field(default_factory=list)
     affect: Dict[str, Any] = field(default_factory=dict)
+    channel: str = "voice"           # "voice" | "text": sets the reply length budget